@@ -1,45 +1,241 @@
 from __future__ import annotations
 
-from numbers import Number
-from typing import List
+import json
+import mmap
+import os
+import platform
+import struct
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import repeat
+from math import isqrt
+from multiprocessing.shared_memory import SharedMemory
+from numbers import Integral, Number
+from operator import add, mul, sub
+from random import randint, random
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple, Union
+from weakref import WeakValueDictionary, finalize
 
+try:
+    import numpy as np
+except ImportError:
+    # numpy is optional, it is only needed by numpy_strassen_matrix_mult
+    np = None
 
-def gauss_matrix_mult(A: Matrix, B: Matrix) -> Matrix:
+__all__ = [
+    # Matrix types
+    'Matrix', 'MatrixView', 'MatrixExpression', 'StructuredMatrix',
+    'DiagonalMatrix', 'ScalarMatrix', 'IdentityMatrix', 'ZeroMatrix',
+    'TriangularMatrix', 'UpperTriangularMatrix', 'LowerTriangularMatrix',
+    'QuadtreeMatrix', 'MortonMatrix', 'SparseMatrix', 'MappedMatrix',
+    'MatrixBatch', 'PreparedMatrix', 'StrassenWorkspace',
+    # Multiplication engines
+    'gauss_matrix_mult', 'strassen_matrix_mult', 'better_strassen_matrix_mult',
+    'winograd_strassen_matrix_mult', 'workspace_strassen_matrix_mult',
+    'peeling_strassen_matrix_mult', 'rectangular_matrix_mult',
+    'recursive_matrix_mult', 'parallel_strassen_matrix_mult',
+    'numpy_strassen_matrix_mult', 'quadtree_strassen_matrix_mult',
+    'morton_strassen_matrix_mult', 'sparse_dense_mult', 'dense_sparse_mult',
+    'sparse_sparse_mult', 'stream_matrix_mult', 'stream_matrix_mult_to',
+    'out_of_core_matrix_mult', 'batch_matmul', 'gemm', 'matmul', 'prepare',
+    'matrix_power',
+    # Linear algebra
+    'lu_decomposition', 'solve_triangular', 'solve', 'inverse',
+    # Helpers
+    'get_matrix_quadrants', 'get_matrix_quadrants_uneven', 'typecode',
+    'result_dtype', 'zero_matrix', 'random_matrix', 'check_output',
+    'pad_matrix',
+    # Calibration
+    'calibrate', 'load_crossover_table', 'crossover_size',
+    'numpy_crossover_size', 'numpy_dispatch_size',
+    # Settings
+    'DTYPES', 'DTYPE_NAMES', 'DEFAULT_MIN_SIZE', 'CALIBRATION_FILE',
+    'MEMORY_EFFICIENT_SIZE', 'OUT_OF_CORE_BUDGET', 'NUMPY_MIN_SIZE',
+    'NUMPY_DISPATCH_SIZE', 'MAX_EXPRESSION_TERMS', 'POWER_CACHE_SIZE',
+]
+
+# Supported element types, mapped to the `array` typecode of the buffer
+DTYPES = {'float64': 'd', 'float32': 'f', 'int64': 'q'}
+DTYPE_NAMES = {code: name for name, code in DTYPES.items()}
+
+# Size below which gauss is used when the host hasn't been calibrated
+DEFAULT_MIN_SIZE = 64
+# File where `calibrate` stores the crossover table of this host
+CALIBRATION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'matrix-crossover.json')
+# Number of elements of the result above which `matmul` switches to the
+# memory efficient Strassen's algorithm
+MEMORY_EFFICIENT_SIZE = 1024*1024
+
+# Default memory, in bytes, for the tiles of out_of_core_matrix_mult
+OUT_OF_CORE_BUDGET = 64*1024*1024
+
+# Default size below which numpy_strassen_matrix_mult uses numpy's
+# multiplication, measured by `calibrate` for the current host
+NUMPY_MIN_SIZE = 4096
+
+# Default size from which `matmul` uses numpy, below it wrapping the
+# matrices costs more than gauss; measured by `calibrate` for the current
+# host
+NUMPY_DISPATCH_SIZE = 8
+
+# The copies still sharing each buffer, by id of the buffer and of the
+# copy, see `Matrix.copy`
+_buffer_copies: Dict[int, WeakValueDictionary] = {}
+
+# The writable rows and numpy arrays handed out over each buffer, by id of
+# the buffer and of the row or array, see `Matrix.copy`
+_exported_views: Dict[int, WeakValueDictionary] = {}
+
+# Number of terms above which the expressions built by the operators of
+# `Matrix` are evaluated, see `MatrixExpression.from_operands`
+MAX_EXPRESSION_TERMS = 16
+
+# Maximum number of squares A^(2^i) kept by `matrix_power`
+POWER_CACHE_SIZE = 32
+
+# The squares cached by `matrix_power`, by id of the matrix, from the least
+# to the most recently used: a copy of the matrix, to detect later updates,
+# and the list of its squares
+_power_cache: OrderedDict[int, Tuple[Matrix, List[Matrix]]] = OrderedDict()
+
+
+def gauss_matrix_mult(A: Matrix, B: Matrix, out: Matrix = None,
+                      block_size: int = 64, transpose_b: bool = True,
+                      alpha: Number = 1, beta: Number = 0) -> Matrix:
     ''' Multiply two matrices by using Gauss's algorithm
 
+    The computation is tiled in blocks of `block_size` columns of `B`, and
+    it runs one of two kernels: by default each block of `B` is transposed
+    and every entry of the result is a dot product between a row of `A`
+    and a row of the transposed block. Otherwise the i-k-j kernel
+    accumulates, into each row of the result, the rows of `B` scaled by
+    the entries of the matching row of `A`.
+
     Parameters
     ----------
     A: Matrix
         The first matrix to be multiplied
     B: Matrix
         The second matrix to be multiplied
+    out: Optional[Matrix]
+        A matrix, or a view, where the result is written. It must not share
+        its storage with `A` or `B`. If it is not given a new matrix is
+        allocated.
+    block_size: int
+        The number of rows or columns of `B` processed together
+    transpose_b: bool
+        If True the dot product kernel is used, otherwise the i-k-j one
+    alpha: Number
+        The factor scaling the product
+    beta: Number
+        The factor scaling the former values of `out`, see `gemm`
 
     Returns
     -------
     Matrix
-        The row-column multiplication of the matrices passed as parameters
+        The row-column multiplication of the matrices passed as parameters,
+        i.e. `alpha*A*B + beta*out`
 
     Raises
     ------
     ValueError
         If the number of columns of `A` is different from the number of
-        rows of `B`
+        rows of `B`, if `out` has the wrong shape or if `alpha` or `beta`
+        aren't valid scaling factors of the result, see `gemm`
     '''
 
     if(A.num_of_cols != B.num_of_rows):
         raise ValueError("The two matrices can't be multiplied")
-    
-    C = [[0 for j in range(B.num_of_cols)] for i in range(A.num_of_rows)]
+    _check_scalars(alpha, beta, out, A, B)
 
-    for i in range(A.num_of_rows):
-        for j in range(B.num_of_cols):
-            value = 0.
-            for k in range(A.num_of_cols):
-                value += A[i][k] * B[k][j]
-            
-            C[i][j] = value 
-                
-    return Matrix(C, clone_matrix=False)
+    C = check_output(out, A.num_of_rows, B.num_of_cols, result_dtype(A, B))
+    accumulate = out is not None and beta != 0
+    if accumulate and beta != 1:
+        C.scale(beta)
+
+    if transpose_b:
+        _dot_kernel(A, B, C, block_size, accumulate, alpha)
+    else:
+        _ikj_kernel(A, B, C, block_size, accumulate, alpha)
+
+    return C
+
+
+def _dot_kernel(A: Matrix, B: Matrix, C: Matrix, block_size: int,
+                accumulate: bool = False, alpha: Number = 1):
+    ''' Write (or add, if `accumulate` is set) in `C` the product of `A`
+        and `B`, scaled by `alpha`, as dot products between the rows of `A`
+        and the columns of `B`, one block of columns at a time
+    '''
+    rows, inner, cols = A.num_of_rows, A.num_of_cols, B.num_of_cols
+
+    # Work directly on the flat buffers to avoid building row views
+    a, b, c = A._data, B._data, C._view
+    code = C._data.typecode
+    for j0 in range(0, cols, block_size):
+        j1 = min(j0 + block_size, cols)
+
+        # The columns of the block, i.e. the rows of its transpose
+        b_cols = [_column(B, j) for j in range(j0, j1)]
+
+        for i in range(rows):
+            start = A._offset + i*A._stride
+            a_row = a[start:start + inner]
+            start = C._offset + i*C._stride
+            values = [sum(map(mul, a_row, b_col)) for b_col in b_cols]
+            if alpha != 1:
+                values = map(mul, repeat(alpha), values)
+            if accumulate:
+                values = map(add, c[start + j0:start + j1], values)
+            c[start + j0:start + j1] = array(code, values)
+
+
+def _column(B: Matrix, j: int) -> array:
+    ''' Return a copy of the `j`-th column of `B` '''
+    start = B._offset + j
+    if not B.num_of_rows:
+        return B._data[0:0]
+
+    return B._data[start:start + (B.num_of_rows - 1)*B._stride + 1:B._stride]
+
+
+def _ikj_kernel(A: Matrix, B: Matrix, C: Matrix, block_size: int,
+                accumulate: bool = False, alpha: Number = 1):
+    ''' Write (or add, if `accumulate` is set) in `C` the product of `A`
+        and `B`, scaled by `alpha`, by accumulating scaled rows of `B` into
+        the rows of `C`, one block of rows of `B` at a time
+    '''
+    rows, inner, cols = A.num_of_rows, A.num_of_cols, B.num_of_cols
+
+    # Work directly on the flat buffers to avoid building row views
+    a, b, c = A._data, B._data, C._view
+    code = C._data.typecode
+    for k0 in range(0, max(inner, 1), block_size):
+        k1 = min(k0 + block_size, inner)
+
+        # The rows of B are hoisted out of the loop over the rows of A
+        b_rows = []
+        for k in range(k0, k1):
+            start = B._offset + k*B._stride
+            b_rows.append(b[start:start + cols])
+
+        for i in range(rows):
+            start = C._offset + i*C._stride
+            if k0 or accumulate:
+                c_row = c[start:start + cols].tolist()
+            else:
+                c_row = [0]*cols
+
+            a_start = A._offset + i*A._stride
+            for a_value, b_row in zip(a[a_start + k0:a_start + k1], b_rows):
+                if a_value:
+                    c_row = list(map(add, c_row,
+                                     map(mul, repeat(alpha*a_value), b_row)))
+
+            c[start:start + cols] = array(code, c_row)
 
 
 def get_matrix_quadrants(A: Matrix) -> Tuple[Matrix, Matrix, Matrix, Matrix]:
@@ -53,18 +249,90 @@ def get_matrix_quadrants(A: Matrix) -> Tuple[Matrix, Matrix, Matrix, Matrix]:
     Returns
     -------
     Tuple(Matrix, Matrix, Matrix, Matrix)
-        Tuple made of the quadrants of the passed matrix
+        Tuple made of the quadrants of the passed matrix, they are views
+        sharing the storage of `A`
+    '''
+
+    A11 = A.view(0, A.num_of_rows//2, 0, A.num_of_cols//2)
+    A12 = A.view(0, A.num_of_rows//2, A.num_of_cols//2, A.num_of_cols//2)
+    A21 = A.view(A.num_of_rows//2, A.num_of_rows//2, 0, A.num_of_cols//2)
+    A22 = A.view(A.num_of_rows//2, A.num_of_rows//2,
+                 A.num_of_cols//2, A.num_of_cols//2)
+
+    return A11, A12, A21, A22
+
+def get_matrix_quadrants_uneven(A: Matrix
+                                ) -> Tuple[Matrix, Matrix, Matrix, Matrix]:
+    ''' Return the matrix quadrants, where the last row and column of an
+        odd-sized matrix belong to the second half
+
+    Parameters
+    ----------
+    A: Matrix
+        The matrix of which the quadrants are requested
+
+    Returns
+    -------
+    Tuple(Matrix, Matrix, Matrix, Matrix)
+        Tuple made of the quadrants of the passed matrix, they are views
+        sharing the storage of `A`
     '''
 
-    A11 = A.submatrix(0, A.num_of_rows//2, 0, A.num_of_cols//2)
-    A12 = A.submatrix(0, A.num_of_rows//2, A.num_of_cols//2, A.num_of_cols//2)
-    A21 = A.submatrix(A.num_of_rows//2, A.num_of_rows//2, 0, A.num_of_cols//2)
-    A22 = A.submatrix(A.num_of_rows//2, A.num_of_rows//2, 
-                      A.num_of_cols//2, A.num_of_cols//2)
+    rows, cols = A.num_of_rows//2, A.num_of_cols//2
+    other_rows, other_cols = A.num_of_rows - rows, A.num_of_cols - cols
+
+    A11 = A.view(0, rows, 0, cols)
+    A12 = A.view(0, rows, cols, other_cols)
+    A21 = A.view(rows, other_rows, 0, cols)
+    A22 = A.view(rows, other_rows, cols, other_cols)
 
     return A11, A12, A21, A22
 
-def zero_matrix(rows: int, cols: int) -> Matrix:
+def typecode(dtype: str) -> str:
+    """
+    Returns the `array` typecode used to store the given dtype
+
+    Parameters
+    ----------
+    dtype: str
+        Type of the matrix elements, one of the keys of `DTYPES`
+
+    Returns
+    -------
+    str
+        The typecode of the buffer
+
+    Raises
+    ------
+    ValueError
+        If `dtype` is not supported
+    """
+
+    if dtype not in DTYPES:
+        raise ValueError('{} is not a supported dtype'.format(dtype))
+
+    return DTYPES[dtype]
+
+def result_dtype(A: Matrix, B: Matrix) -> str:
+    """
+    Returns the dtype of the result of an operation between two matrices
+
+    Parameters
+    ----------
+    A: Matrix
+        The first operand
+    B: Matrix
+        The second operand
+
+    Returns
+    -------
+    str
+        The dtype shared by the two matrices, float64 if they differ
+    """
+
+    return A.dtype if A.dtype == B.dtype else 'float64'
+
+def zero_matrix(rows: int, cols: int, dtype: str = 'float64') -> Matrix:
     """
     Returns a matrix filled with zeros
 
@@ -74,6 +342,8 @@ def zero_matrix(rows: int, cols: int) -> Matrix:
         Number of rows
     cols: int
         Number of columns
+    dtype: str
+        Type of the matrix elements, one of the keys of `DTYPES`
 
     Returns
     -------
@@ -81,8 +351,44 @@ def zero_matrix(rows: int, cols: int) -> Matrix:
         Matrix filled with zeros
     """
 
-    return Matrix([[0 for j in range(cols)] for i in range(rows)], 
-                  clone_matrix=False)
+    return Matrix.from_buffer(array(typecode(dtype), [0]) * (rows*cols),
+                              rows, cols)
+
+def check_output(out: Matrix, rows: int, cols: int,
+                 dtype: str = 'float64') -> Matrix:
+    """
+    Returns the matrix where the result of an operation has to be written
+
+    Parameters
+    ----------
+    out: Optional[Matrix]
+        The matrix provided by the caller, if None a new one is allocated
+    rows: int
+        Expected number of rows
+    cols: int
+        Expected number of columns
+    dtype: str
+        Type of the elements of the matrix allocated when `out` is None
+
+    Returns
+    -------
+    Matrix
+        `out` itself or a new matrix filled with zeros
+
+    Raises
+    ------
+    ValueError
+        If `out` has the wrong shape
+    """
+
+    if out is None:
+        return zero_matrix(rows, cols, dtype=dtype)
+
+    if out.num_of_rows != rows or out.num_of_cols != cols:
+        raise ValueError('The output matrix has the wrong size')
+    out._prepare_write()
+
+    return out
 
 def pad_matrix(A: Matrix, rows_to_add: int, cols_to_add: int) -> Matrix:
     """
@@ -107,11 +413,14 @@ def pad_matrix(A: Matrix, rows_to_add: int, cols_to_add: int) -> Matrix:
     if(rows_to_add == 0 and cols_to_add == 0):
         return A
     
-    new_A = zero_matrix(A.num_of_rows + rows_to_add, A.num_of_cols + cols_to_add)
+    new_A = zero_matrix(A.num_of_rows + rows_to_add, A.num_of_cols + cols_to_add,
+                        dtype=A.dtype)
     new_A.assign_submatrix(0, 0, A)
     return new_A
 
-def strassen_matrix_mult(A: Matrix, B: Matrix, min_size: int = 64) -> Matrix:
+def strassen_matrix_mult(A: Matrix, B: Matrix, min_size: int = 64,
+                         out: Matrix = None, alpha: Number = 1,
+                         beta: Number = 0) -> Matrix:
     ''' Multiply two matrices by using Strassen's algorithm
 
     Parameters
@@ -122,25 +431,106 @@ def strassen_matrix_mult(A: Matrix, B: Matrix, min_size: int = 64) -> Matrix:
         The second matrix to be multiplied
     min_size: int
         Size below which the standard gauss multiplication is used
+    out: Optional[Matrix]
+        A matrix, or a view, where the result is written. It must not share
+        its storage with `A` or `B`. If it is not given a new matrix is
+        allocated.
+    alpha: Number
+        The factor scaling the product
+    beta: Number
+        The factor scaling the former values of `out`, see `gemm`
 
     Returns
     -------
     Matrix
-        The row-column multiplication of the matrices passed as parameters
+        The row-column multiplication of the matrices passed as parameters,
+        i.e. `alpha*A*B + beta*out`
 
     Raises
     ------
     ValueError
         If the number of columns of `A` is different from the number of
-        rows of `B`
+        rows of `B`, if `out` has the wrong shape or if `alpha` or `beta`
+        aren't valid scaling factors of the result, see `gemm`
     '''
 
     if(A.num_of_cols != B.num_of_rows):
         raise ValueError("The two matrices can't be multiplied")
+    _check_scalars(alpha, beta, out, A, B)
 
     # Base case
     if max(A.num_of_rows, B.num_of_cols, A.num_of_cols) < min_size:
-        return gauss_matrix_mult(A, B)
+        return gauss_matrix_mult(A, B, out=out, alpha=alpha, beta=beta)
+
+    operands, layout = _strassen_operands(A, B)
+
+    # Products with an all-zero factor are zero as well
+    P = [None if X is None or Y is None else
+         strassen_matrix_mult(X, Y, min_size) for X, Y in operands]
+
+    if out is None:
+        return _strassen_combine(P, layout, alpha=alpha)
+
+    C = _gemm_output(out, A.num_of_rows, B.num_of_cols, result_dtype(A, B),
+                     beta)
+    _strassen_combine(P, layout, C, alpha, accumulate=beta != 0)
+
+    return C
+
+
+def prepare(A: Matrix, min_size: int = 64) -> PreparedMatrix:
+    ''' Precompute the operands of the Strassen's algorithm that depend on
+        `A` only, to multiply `A` by many matrices
+
+    Parameters
+    ----------
+    A: Matrix
+        The first matrix of the products
+    min_size: int
+        Size below which the standard gauss multiplication is used
+
+    Returns
+    -------
+    PreparedMatrix
+        The prepared matrix, see `PreparedMatrix.multiply`
+    '''
+    return PreparedMatrix(A, min_size)
+
+
+def _zero_aware_sum(A: Matrix, B: Matrix, op) -> Matrix:
+    ''' Return `op(A, B)`, where None stands for an all-zero matrix, as an
+        expression that doesn't copy its operands
+    '''
+    if B is None:
+        return A
+
+    terms = B._linear_terms(coefficient=1 if op is add else -1)
+    if A is not None:
+        terms = A._linear_terms() + terms
+
+    return MatrixExpression(terms, B.num_of_rows, B.num_of_cols)
+
+
+def _strassen_operands(A: Matrix, B: Matrix
+                       ) -> Tuple[List[Tuple[Matrix, Matrix]], Tuple]:
+    ''' Return the operands of the seven Strassen's products of `A` and `B`
+
+    All-zero quadrants are detected and replaced by None, which is
+    propagated through the sums, so that the products known to be zero can
+    be skipped. If less than seven of the eight products of the quadrants
+    of the standard block multiplication are nonzero, their operands are
+    returned instead.
+
+    Returns
+    -------
+    Tuple[List[Tuple[Matrix, Matrix]], Tuple]
+        The pairs of factors of the products and the layout of the result
+        needed by `_strassen_combine`: its padded size, the number of
+        padding rows and columns, its dtype and, for the block
+        multiplication, the quadrant of the result of each product
+    '''
+
+    dtype = result_dtype(A, B)
 
     # A uneven
     padded_rows = A.num_of_rows % 2
@@ -150,45 +540,191 @@ def strassen_matrix_mult(A: Matrix, B: Matrix, min_size: int = 64) -> Matrix:
     padded_cols = B.num_of_cols % 2
     B = pad_matrix(B, B.num_of_rows%2, padded_cols)
         
-    A11, A12, A21, A22 = get_matrix_quadrants(A)
-    B11, B12, B21, B22 = get_matrix_quadrants(B)
-    
-    S1 = B12 - B22
-    S2 = A11 + A12
-    S3 = A21 + A22
-    S4 = B21 - B11
-    S5 = A11 + A22
-    S6 = B11 + B22
-    S7 = A12 - A22
-    S8 = B21 + B22
-    S9 = A11 - A21
-    S10 = B11 + B12
-    
-    P1 = strassen_matrix_mult(A11, S1)
-    P2 = strassen_matrix_mult(S2, B22)
-    P3 = strassen_matrix_mult(S3, B11)
-    P4 = strassen_matrix_mult(A22, S4)
-    P5 = strassen_matrix_mult(S5, S6)
-    P6 = strassen_matrix_mult(S7, S8)
-    P7 = strassen_matrix_mult(S9, S10)
-    
-    C11 = P5 + P4 - P2 + P6
-    C12 = P1 + P2 
-    C21 = P3 + P4
-    C22 = P5 + P1 - P3 - P7
-    
-    C = zero_matrix(A.num_of_rows, B.num_of_cols)
-    C.assign_submatrix(0, 0, C11)
-    C.assign_submatrix(0, C.num_of_cols//2, C12)
-    C.assign_submatrix(C.num_of_rows//2, 0, C21)
-    C.assign_submatrix(C.num_of_rows//2, C.num_of_cols//2, C22)
-    
-    return C.submatrix(0, C.num_of_rows - padded_rows, 0, C.num_of_cols - padded_cols)
+    A11, A12, A21, A22 = (None if X.is_zero() else X
+                          for X in get_matrix_quadrants(A))
+    B11, B12, B21, B22 = (None if X.is_zero() else X
+                          for X in get_matrix_quadrants(B))
+    layout = (A.num_of_rows, B.num_of_cols, padded_rows, padded_cols, dtype)
 
+    # Quadrant C_ij of the result is the sum of the products A_ik B_kj
+    blocks = [(A11, B11, 0), (A12, B21, 0), (A11, B12, 1), (A12, B22, 1),
+              (A21, B11, 2), (A22, B21, 2), (A21, B12, 3), (A22, B22, 3)]
+    blocks = [block for block in blocks
+              if block[0] is not None and block[1] is not None]
+    if len(blocks) < 7:
+        return ([(X, Y) for X, Y, quadrant in blocks],
+                layout + ([quadrant for X, Y, quadrant in blocks],))
 
-def better_strassen_matrix_mult(A: Matrix, B: Matrix, min_size: int = 64) -> Matrix:
-    ''' Multiply two matrices by using a memory efficient version
-        of the Strassen's algorithm 
+    S1 = _zero_aware_sum(B12, B22, sub)
+    S2 = _zero_aware_sum(A11, A12, add)
+    S3 = _zero_aware_sum(A21, A22, add)
+    S4 = _zero_aware_sum(B21, B11, sub)
+    S5 = _zero_aware_sum(A11, A22, add)
+    S6 = _zero_aware_sum(B11, B22, add)
+    S7 = _zero_aware_sum(A12, A22, sub)
+    S8 = _zero_aware_sum(B21, B22, add)
+    S9 = _zero_aware_sum(A11, A21, sub)
+    S10 = _zero_aware_sum(B11, B12, add)
+
+    operands = [(A11, S1), (S2, B22), (S3, B11), (A22, S4),
+                (S5, S6), (S7, S8), (S9, S10)]
+
+    return operands, layout + (None,)
+
+
+def _strassen_combine(P: List[Matrix], layout: Tuple, C: Matrix = None,
+                      alpha: Number = 1, accumulate: bool = False) -> Matrix:
+    ''' Write in `C`, or add to it if `accumulate` is set, the product
+        scaled by `alpha` whose Strassen's (or block) products are those in
+        `P` and whose layout is that returned by `_strassen_operands`;
+        products equal to None are all-zero and are skipped. If `C` is not
+        given the product is returned.
+    '''
+
+    rows, cols, padded_rows, padded_cols, dtype, targets = layout
+
+    if C is None:
+        if targets is None and all(product is not None for product in P):
+            return _dense_strassen_combine(P, layout, alpha)
+        C = zero_matrix(rows - padded_rows, cols - padded_cols, dtype=dtype)
+        accumulate = False
+    quadrants = _padded_quadrants(C, rows//2, cols//2)
+
+    if targets is not None:
+        terms = [[], [], [], []]
+        for product, quadrant in zip(P, targets):
+            terms[quadrant].append((product, add))
+    else:
+        P1, P2, P3, P4, P5, P6, P7 = P
+
+        # Each quadrant is evaluated in a single pass:
+        # C11 = P5 + P4 - P2 + P6, C12 = P1 + P2,
+        # C21 = P3 + P4 and C22 = P5 + P1 - P3 - P7
+        terms = [((P5, add), (P4, add), (P2, sub), (P6, add)),
+                 ((P1, add), (P2, add)),
+                 ((P3, add), (P4, add)),
+                 ((P5, add), (P1, add), (P3, sub), (P7, sub))]
+
+    for quadrant, products in zip(quadrants, terms):
+        _combine_products(quadrant, products, alpha, accumulate)
+
+    return C
+
+
+def _dense_strassen_combine(P: List[Matrix], layout: Tuple,
+                            alpha: Number) -> Matrix:
+    ''' Return the product scaled by `alpha` whose seven Strassen's products,
+        all nonzero, are those in `P`, building its buffer row by row in a
+        single pass
+    '''
+    rows, cols, padded_rows, padded_cols, dtype, _ = layout
+    P1, P2, P3, P4, P5, P6, P7 = P
+    half_rows, half_cols = rows//2, cols//2
+    right = half_cols - padded_cols
+
+    def scaled(values):
+        return values if alpha == 1 else map(mul, repeat(alpha), values)
+
+    data = array(typecode(dtype))
+    for y in range(half_rows):
+        p1, p2, p4, p5 = P1._row(y), P2._row(y), P4._row(y), P5._row(y)
+        # C11 = P5 + P4 - P2 + P6 and C12 = P1 + P2
+        data.extend(scaled(map(add, map(sub, map(add, p5, p4), p2),
+                               P6._row(y))))
+        data.extend(scaled(map(add, p1[:right], p2[:right])))
+    for y in range(half_rows - padded_rows):
+        p3 = P3._row(y)
+        # C21 = P3 + P4 and C22 = P5 + P1 - P3 - P7
+        data.extend(scaled(map(add, p3, P4._row(y))))
+        data.extend(scaled(map(sub, map(sub, map(add, P5._row(y)[:right],
+                                                 P1._row(y)[:right]),
+                                        p3[:right]),
+                               P7._row(y)[:right])))
+
+    return Matrix.from_buffer(data, rows - padded_rows, cols - padded_cols)
+
+
+def _padded_quadrants(C: Matrix, rows: int, cols: int
+                      ) -> Tuple[Matrix, Matrix, Matrix, Matrix]:
+    ''' Return the quadrants of `C` as if it was padded to twice
+        `rows` x `cols`, i.e. the views of the quadrants of the padded
+        matrix without their padding rows and columns
+    '''
+    other_rows, other_cols = C.num_of_rows - rows, C.num_of_cols - cols
+
+    return (C.view(0, rows, 0, cols), C.view(0, rows, cols, other_cols),
+            C.view(rows, other_rows, 0, cols),
+            C.view(rows, other_rows, cols, other_cols))
+
+
+def _combine_products(C: Matrix, products: Iterable[Tuple[Matrix, object]],
+                      alpha: Number, accumulate: bool):
+    ''' Write in `C`, or add to it if `accumulate` is set, `alpha` times the
+        sum of the products, each added or subtracted according to its
+        operator, in a single pass. Products equal to None are skipped and
+        those larger than `C` because of padding contribute with their top
+        left part. If there are no products and `accumulate` is not set,
+        `C` is assumed to be already zero.
+    '''
+    rows, cols = C.num_of_rows, C.num_of_cols
+    terms = [(1, C)] if accumulate else []
+    for product, op in products:
+        if product is None:
+            continue
+        if product.num_of_rows != rows or product.num_of_cols != cols:
+            product = product.view(0, rows, 0, cols)
+        terms.append((alpha if op is add else -alpha, product))
+
+    if rows and cols and len(terms) > accumulate:
+        MatrixExpression(terms, rows, cols).evaluate(out=C)
+
+
+def _accumulate(C: Matrix, P: Matrix, alpha: Number, op):
+    ''' Update `C` in place with `op(C, alpha*P)`, where `P` can be larger
+        than `C` because of padding and only its top left part is used
+    '''
+    _combine_products(C, [(P, op)], alpha, accumulate=True)
+
+
+def _check_scalars(alpha: Number, beta: Number, out: Matrix, A: Matrix,
+                   B: Matrix):
+    ''' Raise ValueError if `alpha` or `beta` aren't numbers, or aren't
+        integers while the result of `alpha*A*B + beta*out` is int64
+    '''
+    dtype = result_dtype(A, B) if out is None else out.dtype
+    for value in (alpha, beta):
+        if not isinstance(value, Number):
+            raise ValueError('{} is not a number'.format(value))
+        if dtype == 'int64' and not isinstance(value, Integral):
+            raise ValueError('{} is not an integer, as required by an int64 '
+                             'output matrix'.format(value))
+
+
+def _gemm_output(out: Matrix, rows: int, cols: int, dtype: str,
+                 beta: Number) -> Matrix:
+    ''' Return the matrix where `alpha*A*B + beta*out` has to be
+        accumulated, i.e. `out` scaled by `beta` or a new zero matrix
+    '''
+    C = check_output(out, rows, cols, dtype)
+    if out is not None and beta != 1:
+        if beta == 0:
+            C.fill(0)
+        else:
+            C.scale(beta)
+
+    return C
+
+
+def peeling_strassen_matrix_mult(A: Matrix, B: Matrix, min_size: int = 64,
+                                 out: Matrix = None) -> Matrix:
+    ''' Multiply two matrices by using the Strassen's algorithm with
+        dynamic peeling of odd sizes
+
+    Instead of padding the operands, the Strassen's algorithm runs on the
+    largest even-sized cores of `A` and `B`; the stripped last row of `A`,
+    column of `B` and, if the inner size is odd, column of `A` and row of
+    `B` are then accounted for with vector-matrix, matrix-vector and rank-1
+    updates of the result.
 
     Parameters
     ----------
@@ -198,6 +734,10 @@ def better_strassen_matrix_mult(A: Matrix, B: Matrix, min_size: int = 64) -> Mat
         The second matrix to be multiplied
     min_size: int
         Size below which the standard gauss multiplication is used
+    out: Optional[Matrix]
+        A matrix, or a view, where the result is written. It must not share
+        its storage with `A` or `B`. If it is not given a new matrix is
+        allocated.
 
     Returns
     -------
@@ -208,328 +748,5027 @@ def better_strassen_matrix_mult(A: Matrix, B: Matrix, min_size: int = 64) -> Mat
     ------
     ValueError
         If the number of columns of `A` is different from the number of
-        rows of `B`
+        rows of `B` or if `out` has the wrong shape
     '''
 
     if(A.num_of_cols != B.num_of_rows):
         raise ValueError("The two matrices can't be multiplied")
 
+    rows, inner, cols = A.num_of_rows, A.num_of_cols, B.num_of_cols
+    C = check_output(out, rows, cols, result_dtype(A, B))
+
     # Base case
-    if max(A.num_of_rows, B.num_of_cols, A.num_of_cols) < min_size:
-        return gauss_matrix_mult(A, B)
+    if max(rows, inner, cols) < min_size or min(rows, inner, cols) < 2:
+        return gauss_matrix_mult(A, B, out=C)
 
-    # A uneven
-    padded_rows = A.num_of_rows % 2
-    A = pad_matrix(A, padded_rows, A.num_of_cols%2)
-    
-    # B uneven
-    padded_cols = B.num_of_cols % 2
-    B = pad_matrix(B, B.num_of_rows%2, padded_cols)
-    
-    A11, A12, A21, A22 = get_matrix_quadrants(A)
-    B11, B12, B21, B22 = get_matrix_quadrants(B)
+    _peeling_strassen_step(
+        A, B, C, lambda X, Y: peeling_strassen_matrix_mult(X, Y, min_size))
 
-    P = better_strassen_matrix_mult(A11 + A22, B11 + B22)
-    C11 = P
-    C22 = P
+    return C
 
-    P = better_strassen_matrix_mult(A11 + A12, B22.copy())
-    C12 = P
-    C11 = C11 - P
 
-    P = better_strassen_matrix_mult(A11.copy(), B12 - B22)
-    C12 = C12 + P
-    C22 = C22 + P
+def _peeling_strassen_step(A: Matrix, B: Matrix, C: Matrix, multiply):
+    ''' Write in `C` the product of `A` and `B` computed by one level of
+        the Strassen's algorithm with dynamic peeling
 
-    P = better_strassen_matrix_mult(A21 + A22, B11.copy())
-    C21 = P
-    C22 = C22 - P
+    Parameters
+    ----------
+    A: Matrix
+        The first matrix to be multiplied, with at least two rows and cols
+    B: Matrix
+        The second matrix to be multiplied, with at least two cols
+    C: Matrix
+        The matrix where the result is written
+    multiply: Callable[[Matrix, Matrix], Matrix]
+        The function computing the seven products of the quadrants
+    '''
+    rows, inner, cols = A.num_of_rows, A.num_of_cols, B.num_of_cols
 
-    P = better_strassen_matrix_mult(A22.copy(), B21 - B11)
-    C11 = C11 + P
-    C21 = C21 + P
+    # Even-sized cores
+    core_rows, core_inner = rows - rows%2, inner - inner%2
+    core_cols = cols - cols%2
 
-    C22 = C22 - better_strassen_matrix_mult(A11 - A21, B11 + B12)
+    A11, A12, A21, A22 = get_matrix_quadrants(A.view(0, core_rows,
+                                                     0, core_inner))
+    B11, B12, B21, B22 = get_matrix_quadrants(B.view(0, core_inner,
+                                                     0, core_cols))
+    C11, C12, C21, C22 = get_matrix_quadrants(C.view(0, core_rows,
+                                                     0, core_cols))
 
-    C11 = C11 + better_strassen_matrix_mult(A12 - A22, B21 + B22)
+    P1 = multiply(A11, B12 - B22)
+    P2 = multiply(A11 + A12, B22)
+    P3 = multiply(A21 + A22, B11)
+    P4 = multiply(A22, B21 - B11)
+    P5 = multiply(A11 + A22, B11 + B22)
+    P6 = multiply(A12 - A22, B21 + B22)
+    P7 = multiply(A11 - A21, B11 + B12)
 
-    C = zero_matrix(A.num_of_rows, B.num_of_cols)
-    C.assign_submatrix(0, 0, C11)
-    C.assign_submatrix(0, C.num_of_cols//2, C12)
-    C.assign_submatrix(C.num_of_rows//2, 0, C21)
-    C.assign_submatrix(C.num_of_rows//2, C.num_of_cols//2, C22)
-    
-    C = C.submatrix(0, C.num_of_rows - padded_rows, 0, C.num_of_cols - padded_cols)
-    return C
+    C11.combine(P5, P4, add)
+    C11 -= P2
+    C11 += P6
+    C12.combine(P1, P2, add)
+    C21.combine(P3, P4, add)
+    C22.combine(P5, P1, add)
+    C22 -= P3
+    C22 -= P7
 
-class Matrix(object):
-    ''' A simple naive matrix class
+    # Odd inner size: rank-1 update with the last column of A and row of B
+    if inner != core_inner:
+        _rank_one_update(C.view(0, core_rows, 0, core_cols),
+                         A.view(0, core_rows, core_inner, 1),
+                         B.view(core_inner, 1, 0, core_cols))
 
-    Members
-    -------
-    _A: List[List[Number]]
-        The list of rows that store all the matrix values
+    # Odd number of columns: matrix-vector product for the last column
+    if cols != core_cols:
+        gauss_matrix_mult(A.view(0, core_rows, 0, inner),
+                          B.view(0, inner, core_cols, 1),
+                          out=C.view(0, core_rows, core_cols, 1))
+
+    # Odd number of rows: vector-matrix product for the last row
+    if rows != core_rows:
+        gauss_matrix_mult(A.view(core_rows, 1, 0, inner), B,
+                          out=C.view(core_rows, 1, 0, cols))
+
+
+def _rank_one_update(C: Matrix, a: Matrix, b: Matrix):
+    ''' Add to `C` the outer product of the column `a` and the row `b` '''
+    b_row = b._row(0)
+    for y in range(C.num_of_rows):
+        value = a._row(y)[0]
+        if value:
+            C_row = C[y]
+            C_row[:] = array(C._data.typecode,
+                             map(add, C_row, map(mul, repeat(value), b_row)))
+
+
+def rectangular_matrix_mult(A: Matrix, B: Matrix, min_size: int = 64,
+                            max_aspect: float = 2., out: Matrix = None
+                            ) -> Matrix:
+    ''' Multiply two matrices of any shape by recursively halving their
+        largest size
+
+    Blocks whose largest size is at most `max_aspect` times the smallest
+    one are multiplied with one level of the Strassen's algorithm (with
+    dynamic peeling of odd sizes). Otherwise the largest among the rows of
+    `A`, the columns of `A` and the columns of `B` is halved: halving the
+    rows or the columns splits the result in two independent products,
+    while halving the inner size sums two products.
 
     Parameters
     ----------
-    A: List[List[Number]]
-        The list of rows that store all the matrix values
-    clone_matrix: Optional[bool]
-        A flag to require a full copy of `A`'s data structure.
+    A: Matrix
+        The first matrix to be multiplied
+    B: Matrix
+        The second matrix to be multiplied
+    min_size: int
+        Size below which the standard gauss multiplication is used
+    max_aspect: float
+        The largest ratio between the sizes of a block multiplied with
+        the Strassen's algorithm
+    out: Optional[Matrix]
+        A matrix, or a view, where the result is written. It must not share
+        its storage with `A` or `B`. If it is not given a new matrix is
+        allocated.
+
+    Returns
+    -------
+    Matrix
+        The row-column multiplication of the matrices passed as parameters
 
     Raises
     ------
     ValueError
-        If there are two lists having a different number of values
+        If the number of columns of `A` is different from the number of
+        rows of `B` or if `out` has the wrong shape
     '''
-    def __init__(self, A: List[List[Number]], clone_matrix: bool = True):
-        num_of_cols = None
 
-        for i, row in enumerate(A):
-            if num_of_cols is not None:
-                if num_of_cols != len(row):
-                    raise ValueError('This is not a matrix')
-            else:
-                num_of_cols = len(row)
+    if(A.num_of_cols != B.num_of_rows):
+        raise ValueError("The two matrices can't be multiplied")
 
-        if clone_matrix:
-            self._A = [[value for value in row] for row in A]
-        else:
-            self._A = A
+    rows, inner, cols = A.num_of_rows, A.num_of_cols, B.num_of_cols
+    C = check_output(out, rows, cols, result_dtype(A, B))
 
-    @property
-    def num_of_rows(self) -> int:
-        return len(self._A)
+    # Base case
+    largest = max(rows, inner, cols)
+    if largest < min_size or min(rows, inner, cols) < 2:
+        return gauss_matrix_mult(A, B, out=C)
 
-    @property
-    def num_of_cols(self) -> int:
-        if len(self._A) == 0:
-            return 0
+    def multiply(X: Matrix, Y: Matrix, out: Matrix = None) -> Matrix:
+        return rectangular_matrix_mult(X, Y, min_size, max_aspect, out)
 
-        return len(self._A[0])
+    if largest <= max_aspect*min(rows, inner, cols):
+        _peeling_strassen_step(A, B, C, multiply)
+    elif largest == rows:
+        half = rows//2
+        multiply(A.view(0, half, 0, inner), B, C.view(0, half, 0, cols))
+        multiply(A.view(half, rows - half, 0, inner), B,
+                 C.view(half, rows - half, 0, cols))
+    elif largest == cols:
+        half = cols//2
+        multiply(A, B.view(0, inner, 0, half), C.view(0, rows, 0, half))
+        multiply(A, B.view(0, inner, half, cols - half),
+                 C.view(0, rows, half, cols - half))
+    else:
+        half = inner//2
+        multiply(A.view(0, rows, 0, half), B.view(0, half, 0, cols), C)
+        C += multiply(A.view(0, rows, half, inner - half),
+                      B.view(half, inner - half, 0, cols))
 
-    def copy(self):
-        A = [[value for value in row] for row in self._A]
+    return C
 
-        return Matrix(A, clone_matrix=False)
 
-    def __getitem__(self, y: int):
-        ''' Return one of the rows
+def parallel_strassen_matrix_mult(A: Matrix, B: Matrix, min_size: int = 64,
+                                  workers: int = None,
+                                  parallel_depth: int = 1,
+                                  executor: Executor = None) -> Matrix:
+    ''' Multiply two matrices by using the Strassen's algorithm and
+        computing the products of the first levels in parallel processes
 
-        Parameters
-        ----------
-        y: int
-            the index of the rows to be returned
+    The first `parallel_depth` levels of the recursion are expanded in
+    this process, which gives 7**parallel_depth independent products.
+    Their operands are copied in one shared memory block, the processes
+    compute the products with `strassen_matrix_mult` and write them in a
+    second shared memory block, from which the levels are combined back.
 
-        Returns
-        -------
-        List[Number]
-            The `y`-th row of the matrix
-        '''
-        return self._A[y]
+    Parameters
+    ----------
+    A: Matrix
+        The first matrix to be multiplied
+    B: Matrix
+        The second matrix to be multiplied
+    min_size: int
+        Size below which the standard gauss multiplication is used
+    workers: Optional[int]
+        The number of processes to use, all the cores by default. It is
+        ignored if `executor` is given.
+    parallel_depth: int
+        The number of levels whose products are computed in parallel
+    executor: Optional[Executor]
+        A process pool to reuse among calls, if None a new one is created
+
+    Returns
+    -------
+    Matrix
+        The row-column multiplication of the matrices passed as parameters
+
+    Raises
+    ------
+    ValueError
+        If the number of columns of `A` is different from the number of
+        rows of `B`
+    '''
+
+    if(A.num_of_cols != B.num_of_rows):
+        raise ValueError("The two matrices can't be multiplied")
+
+    # All the shared operands have the same element type
+    dtype = result_dtype(A, B)
+    if A.dtype != dtype:
+        A = A.astype(dtype)
+    if B.dtype != dtype:
+        B = B.astype(dtype)
+
+    products = []
+
+    def expand(A: Matrix, B: Matrix, depth: int):
+        # Products with an all-zero factor are zero as well
+        if A is None or B is None:
+            return None
+
+        if (depth == 0 or
+                max(A.num_of_rows, B.num_of_cols, A.num_of_cols) < min_size):
+            products.append((A, B))
+            return len(products) - 1
+
+        operands, layout = _strassen_operands(A, B)
+        return layout, [expand(X, Y, depth - 1) for X, Y in operands]
+
+    def collapse(node) -> Matrix:
+        if node is None:
+            return None
+        if isinstance(node, int):
+            return P[node]
+
+        layout, children = node
+        return _strassen_combine([collapse(child) for child in children],
+                                 layout)
+
+    tree = expand(A, B, parallel_depth)
+
+    code = typecode(dtype)
+    itemsize = array(code).itemsize
+
+    # Byte offsets of the operands and of the products in the two blocks
+    offsets, input_size, output_size = [], 0, 0
+    for X, Y in products:
+        rows, inner, cols = X.num_of_rows, X.num_of_cols, Y.num_of_cols
+        offsets.append((input_size, input_size + rows*inner*itemsize,
+                        output_size))
+        input_size += (rows*inner + inner*cols)*itemsize
+        output_size += rows*cols*itemsize
+
+    inputs = SharedMemory(create=True, size=max(input_size, 1))
+    outputs = SharedMemory(create=True, size=max(output_size, 1))
+    try:
+        tasks = []
+        for (a_offset, b_offset, c_offset), (X, Y) in zip(offsets, products):
+            _write_shared(inputs, a_offset, X)
+            _write_shared(inputs, b_offset, Y)
+            tasks.append(_StrassenTask(inputs.name, outputs.name, code,
+                                       a_offset, X.num_of_rows, X.num_of_cols,
+                                       b_offset, Y.num_of_cols, c_offset,
+                                       min_size))
+
+        if executor is None:
+            with ProcessPoolExecutor(workers) as pool:
+                list(pool.map(_shared_strassen_task, tasks))
+        else:
+            list(executor.map(_shared_strassen_task, tasks))
+
+        P = [_read_shared(outputs, task.c_offset, task.rows, task.cols, code)
+             for task in tasks]
+    finally:
+        for block in (inputs, outputs):
+            block.close()
+            block.unlink()
+
+    return collapse(tree)
+
+
+def _write_shared(block: SharedMemory, offset: int, A: Matrix):
+    ''' Copy the values of `A`, row by row, in `block` from `offset` on '''
+    for span in A._row_slices():
+        values = A._view[span].cast('B')
+        block.buf[offset:offset + len(values)] = values
+        offset += len(values)
+        values.release()
+
+
+def _read_shared(block: SharedMemory, offset: int, rows: int, cols: int,
+                 code: str) -> Matrix:
+    ''' Return a matrix with the values stored in `block` from `offset` on '''
+    data = array(code)
+    data.frombytes(block.buf[offset:offset + rows*cols*data.itemsize])
+
+    return Matrix.from_buffer(data, rows, cols)
+
+
+class _StrassenTask(NamedTuple):
+    ''' One product of `parallel_strassen_matrix_mult`, whose operands and
+        result are stored in two shared memory blocks
+
+    Members
+    -------
+    inputs: str
+        The name of the block storing the operands
+    outputs: str
+        The name of the block storing the products
+    code: str
+        The typecode of the elements
+    a_offset: int
+        The byte offset of the first operand in `inputs`
+    rows: int
+        The number of rows of the first operand
+    inner: int
+        The number of columns of the first operand
+    b_offset: int
+        The byte offset of the second operand in `inputs`
+    cols: int
+        The number of columns of the second operand
+    c_offset: int
+        The byte offset of the product in `outputs`
+    min_size: int
+        Size below which the standard gauss multiplication is used
+    '''
+    inputs: str
+    outputs: str
+    code: str
+    a_offset: int
+    rows: int
+    inner: int
+    b_offset: int
+    cols: int
+    c_offset: int
+    min_size: int
+
+
+def _shared_strassen_task(task: _StrassenTask):
+    ''' Compute in a worker process one product of
+        `parallel_strassen_matrix_mult`
+    '''
+    inputs = SharedMemory(task.inputs)
+    outputs = SharedMemory(task.outputs)
+    try:
+        A = _read_shared(inputs, task.a_offset, task.rows, task.inner,
+                         task.code)
+        B = _read_shared(inputs, task.b_offset, task.inner, task.cols,
+                         task.code)
+        _write_shared(outputs, task.c_offset,
+                      strassen_matrix_mult(A, B, task.min_size))
+    finally:
+        inputs.close()
+        outputs.close()
+
+
+def batch_matmul(As: MatrixBatch, Bs: MatrixBatch, out: MatrixBatch = None,
+                 workers: int = 1, executor: Executor = None) -> MatrixBatch:
+    ''' Multiply, one by one, the matrices of two batches
+
+    The shapes are checked once for the whole batch, then a single kernel
+    works on the flat buffers of the batches, without building a `Matrix`
+    for each product. A batch made of a single matrix is multiplied by
+    all the matrices of the other one. The batch can be split in chunks
+    computed by parallel processes, whose operands and results are passed
+    through shared memory.
+
+    Parameters
+    ----------
+    As: MatrixBatch
+        The first matrices to be multiplied
+    Bs: MatrixBatch
+        The second matrices to be multiplied
+    out: Optional[MatrixBatch]
+        The batch where the results are written. If it is not given a new
+        batch is allocated.
+    workers: Optional[int]
+        The number of processes to use, 1 to compute the batch in this
+        process and None for all the cores. It is ignored if `executor` is
+        given.
+    executor: Optional[Executor]
+        A process pool to reuse among calls
+
+    Returns
+    -------
+    MatrixBatch
+        The row-column multiplications of the matrices of the batches
+
+    Raises
+    ------
+    ValueError
+        If the number of columns of the matrices of `As` is different from
+        the number of rows of those of `Bs`, if the batches have different
+        lengths or if `out` has the wrong shape
+    '''
+
+    if(As.num_of_cols != Bs.num_of_rows):
+        raise ValueError("The two matrices can't be multiplied")
+
+    count = max(len(As), len(Bs))
+    if min(len(As), len(Bs)) != 1 and len(As) != len(Bs):
+        raise ValueError('The two batches have different lengths')
+    if not min(len(As), len(Bs)):
+        count = 0
+
+    shape = (As.num_of_rows, As.num_of_cols, Bs.num_of_cols)
+    rows, inner, cols = shape
+    dtype = result_dtype(As, Bs)
+    code = typecode(dtype)
+    a, b = As.data, Bs.data
+    if a.typecode != code:
+        a = array(code, a)
+    if b.typecode != code:
+        b = array(code, b)
+
+    if out is None:
+        out = MatrixBatch(array(code, [0])*(count*rows*cols), count, rows,
+                          cols)
+    elif (len(out), out.num_of_rows, out.num_of_cols) != (count, rows, cols):
+        raise ValueError('The output batch has the wrong size')
+
+    # Broadcast a single matrix by not moving through its batch
+    a_step = rows*inner if len(As) == count else 0
+    b_step = inner*cols if len(Bs) == count else 0
+
+    if executor is None and workers == 1:
+        _batch_kernel(a, b, out.data, count, shape, a_step, b_step)
+        return out
+
+    # Each process gets a few chunks, to balance the load
+    chunk = max(-(-count//(4*(workers or os.cpu_count() or 1))), 1)
+    itemsize = array(code).itemsize
+
+    inputs = SharedMemory(create=True,
+                          size=max((len(a) + len(b))*itemsize, 1))
+    outputs = SharedMemory(create=True, size=max(count*rows*cols*itemsize, 1))
+    try:
+        _write_shared(inputs, 0, Matrix.from_buffer(a, 1, len(a)))
+        _write_shared(inputs, len(a)*itemsize,
+                      Matrix.from_buffer(b, 1, len(b)))
+
+        tasks = [[inputs.name, outputs.name, code, shape, first,
+                  min(first + chunk, count), a_step, b_step,
+                  len(a)*itemsize] for first in range(0, count, chunk)]
+        if executor is None:
+            with ProcessPoolExecutor(workers) as pool:
+                list(pool.map(_shared_batch_task, tasks))
+        else:
+            list(executor.map(_shared_batch_task, tasks))
+
+        results = memoryview(out.data).cast('B')
+        results[:] = outputs.buf[:len(results)]
+        results.release()
+    finally:
+        for block in (inputs, outputs):
+            block.close()
+            block.unlink()
+
+    return out
+
+
+def _batch_kernel(a: array, b: array, c: array, count: int,
+                  shape: Tuple[int, int, int], a_step: int, b_step: int):
+    ''' Write in `c` the `count` products of the matrices stored in `a`
+        every `a_step` values and those stored in `b` every `b_step` values;
+        a step equal to zero broadcasts the first matrix
+    '''
+    rows, inner, cols = shape
+    size = rows*cols
+    code = c.typecode
+
+    def across(x: array, start: int, step: int) -> Iterable[Number]:
+        # The value in position `start` of all the matrices of the batch
+        if not step:
+            return repeat(x[start])
+        return x[start:start + count*step:step]
+
+    # The loops run over the positions of the matrices, while each
+    # operation works on the whole batch
+    for y in range(rows):
+        a_values = [across(a, y*inner + k, a_step) for k in range(inner)]
+        for x in range(cols):
+            values = [0]*count
+            for k, a_value in enumerate(a_values):
+                values = map(add, values,
+                             map(mul, a_value, across(b, k*cols + x, b_step)))
+
+            c[y*cols + x:count*size:size] = array(code, values)
+
+
+def _shared_batch_task(task: List):
+    ''' Compute in a worker process one chunk of `batch_matmul` '''
+    (inputs_name, outputs_name, code, shape, first, last, a_step, b_step,
+     b_offset) = task
+    rows, inner, cols = shape
+    itemsize = array(code).itemsize
+
+    inputs = SharedMemory(inputs_name)
+    outputs = SharedMemory(outputs_name)
+    try:
+        # Only the operands of the chunk are read
+        a_items = last - first if a_step else 1
+        b_items = last - first if b_step else 1
+        a = _read_shared(inputs, first*a_step*itemsize,
+                         a_items*rows, inner, code)._data
+        b = _read_shared(inputs, b_offset + first*b_step*itemsize,
+                         b_items*inner, cols, code)._data
+
+        c = array(code, [0])*((last - first)*rows*cols)
+        _batch_kernel(a, b, c, last - first, shape, a_step, b_step)
+        _write_shared(outputs, first*rows*cols*itemsize,
+                      Matrix.from_buffer(c, 1, len(c)))
+    finally:
+        inputs.close()
+        outputs.close()
+
+
+def recursive_matrix_mult(A: Matrix, B: Matrix, min_size: int = 64,
+                          out: Matrix = None,
+                          accumulate: bool = False) -> Matrix:
+    ''' Multiply two matrices by using the divide and conquer algorithm
+        with eight products of quadrants
+
+    Each product of quadrants is added in place to its quadrant of the
+    result, e.g. C11 += A11*B11 and then C11 += A12*B21, down to the base
+    case where the gauss multiplication accumulates in the result; no
+    temporary matrix is allocated. Odd sizes are split unevenly, so no
+    padding is needed either.
+
+    Parameters
+    ----------
+    A: Matrix
+        The first matrix to be multiplied
+    B: Matrix
+        The second matrix to be multiplied
+    min_size: int
+        Size below which the standard gauss multiplication is used
+    out: Optional[Matrix]
+        A matrix, or a view, where the result is written. It must not share
+        its storage with `A` or `B`. If it is not given a new matrix is
+        allocated.
+    accumulate: bool
+        If set the product is added to the values of `out`, instead of
+        overwriting them
+
+    Returns
+    -------
+    Matrix
+        The row-column multiplication of the matrices passed as parameters,
+        plus the former values of `out` if `accumulate` is set
+
+    Raises
+    ------
+    ValueError
+        If the number of columns of `A` is different from the number of
+        rows of `B` or if `out` has the wrong shape
+    '''
+
+    if(A.num_of_cols != B.num_of_rows):
+        raise ValueError("The two matrices can't be multiplied")
+
+    C = check_output(out, A.num_of_rows, B.num_of_cols, result_dtype(A, B))
+    if out is not None and not accumulate:
+        C.fill(0)
+
+    _recursive_accumulate(A, B, C, min_size)
+
+    return C
+
+
+def _recursive_accumulate(A: Matrix, B: Matrix, C: Matrix, min_size: int):
+    ''' Add to `C` the product of `A` and `B` '''
+    rows, inner, cols = A.num_of_rows, A.num_of_cols, B.num_of_cols
+
+    # Base case
+    if max(rows, inner, cols) < min_size or min(rows, inner, cols) < 2:
+        if min(rows, inner, cols) > 0:
+            _dot_kernel(A, B, C, cols, accumulate=True)
+        return
+
+    A11, A12, A21, A22 = get_matrix_quadrants_uneven(A)
+    B11, B12, B21, B22 = get_matrix_quadrants_uneven(B)
+    C11, C12, C21, C22 = get_matrix_quadrants_uneven(C)
+
+    _recursive_accumulate(A11, B11, C11, min_size)
+    _recursive_accumulate(A12, B21, C11, min_size)
+    _recursive_accumulate(A11, B12, C12, min_size)
+    _recursive_accumulate(A12, B22, C12, min_size)
+    _recursive_accumulate(A21, B11, C21, min_size)
+    _recursive_accumulate(A22, B21, C21, min_size)
+    _recursive_accumulate(A21, B12, C22, min_size)
+    _recursive_accumulate(A22, B22, C22, min_size)
+
+
+def winograd_strassen_matrix_mult(A: Matrix, B: Matrix,
+                                  min_size: int = 64) -> Matrix:
+    ''' Multiply two matrices by using the Winograd variant of the
+        Strassen's algorithm, which needs 7 products and 15 additions
+        per level instead of 18
+
+    Parameters
+    ----------
+    A: Matrix
+        The first matrix to be multiplied
+    B: Matrix
+        The second matrix to be multiplied
+    min_size: int
+        Size below which the standard gauss multiplication is used
+
+    Returns
+    -------
+    Matrix
+        The row-column multiplication of the matrices passed as parameters
+
+    Raises
+    ------
+    ValueError
+        If the number of columns of `A` is different from the number of
+        rows of `B`
+    '''
+
+    if(A.num_of_cols != B.num_of_rows):
+        raise ValueError("The two matrices can't be multiplied")
+
+    # Base case
+    if max(A.num_of_rows, B.num_of_cols, A.num_of_cols) < min_size:
+        return gauss_matrix_mult(A, B)
+
+    # A uneven
+    padded_rows = A.num_of_rows % 2
+    A = pad_matrix(A, padded_rows, A.num_of_cols%2)
+
+    # B uneven
+    padded_cols = B.num_of_cols % 2
+    B = pad_matrix(B, B.num_of_rows%2, padded_cols)
+
+    A11, A12, A21, A22 = get_matrix_quadrants(A)
+    B11, B12, B21, B22 = get_matrix_quadrants(B)
+
+    S1 = A21 + A22
+    S2 = S1 - A11
+    S3 = A11 - A21
+    S4 = A12 - S2
+    T1 = B12 - B11
+    T2 = B22 - T1
+    T3 = B22 - B12
+    T4 = T2 - B21
+
+    P1 = winograd_strassen_matrix_mult(A11, B11, min_size)
+    P2 = winograd_strassen_matrix_mult(A12, B21, min_size)
+    P3 = winograd_strassen_matrix_mult(S4, B22, min_size)
+    P4 = winograd_strassen_matrix_mult(A22, T4, min_size)
+    P5 = winograd_strassen_matrix_mult(S1, T1, min_size)
+    P6 = winograd_strassen_matrix_mult(S2, T2, min_size)
+    P7 = winograd_strassen_matrix_mult(S3, T3, min_size)
+
+    C = zero_matrix(A.num_of_rows, B.num_of_cols, dtype=P1.dtype)
+    C11, C12, C21, C22 = get_matrix_quadrants(C)
+
+    # The partial sums U2, U3 and U4 are accumulated in place in P6 and P7
+    C11.combine(P1, P2, add)
+    U2 = P6
+    U2 += P1
+    U3 = P7
+    U3 += U2
+    U4 = U2
+    U4 += P5
+    C12.combine(U4, P3, add)
+    C21.combine(U3, P4, sub)
+    C22.combine(U3, P5, add)
+
+    if padded_rows or padded_cols:
+        return C.submatrix(0, C.num_of_rows - padded_rows,
+                           0, C.num_of_cols - padded_cols)
+
+    return C
+
+
+def better_strassen_matrix_mult(A: Matrix, B: Matrix, min_size: int = 64,
+                                out: Matrix = None, alpha: Number = 1,
+                                beta: Number = 0) -> Matrix:
+    ''' Multiply two matrices by using a memory efficient version
+        of the Strassen's algorithm 
+
+    Each of the seven products is written in a buffer allocated once per
+    level of the recursion and then accumulated straight into the
+    quadrants of the result.
+
+    Parameters
+    ----------
+    A: Matrix
+        The first matrix to be multiplied
+    B: Matrix
+        The second matrix to be multiplied
+    min_size: int
+        Size below which the standard gauss multiplication is used
+    out: Optional[Matrix]
+        A matrix, or a view, where the result is written. It must not share
+        its storage with `A` or `B`. If it is not given a new matrix is
+        allocated.
+    alpha: Number
+        The factor scaling the product
+    beta: Number
+        The factor scaling the former values of `out`, see `gemm`
+
+    Returns
+    -------
+    Matrix
+        The row-column multiplication of the matrices passed as parameters,
+        i.e. `alpha*A*B + beta*out`
+
+    Raises
+    ------
+    ValueError
+        If the number of columns of `A` is different from the number of
+        rows of `B`, if `out` has the wrong shape or if `alpha` or `beta`
+        aren't valid scaling factors of the result, see `gemm`
+    '''
+
+    if(A.num_of_cols != B.num_of_rows):
+        raise ValueError("The two matrices can't be multiplied")
+    _check_scalars(alpha, beta, out, A, B)
+
+    # Base case
+    if max(A.num_of_rows, B.num_of_cols, A.num_of_cols) < min_size:
+        return gauss_matrix_mult(A, B, out=out, alpha=alpha, beta=beta)
+
+    C = _gemm_output(out, A.num_of_rows, B.num_of_cols, result_dtype(A, B),
+                     beta)
+
+    # A uneven
+    A = pad_matrix(A, A.num_of_rows % 2, A.num_of_cols%2)
+    
+    # B uneven
+    B = pad_matrix(B, B.num_of_rows%2, B.num_of_cols % 2)
+    
+    A11, A12, A21, A22 = get_matrix_quadrants(A)
+    B11, B12, B21, B22 = get_matrix_quadrants(B)
+    C11, C12, C21, C22 = _padded_quadrants(C, A11.num_of_rows,
+                                           B11.num_of_cols)
+
+    P = zero_matrix(A11.num_of_rows, B11.num_of_cols, C.dtype)
+
+    better_strassen_matrix_mult(A11 + A22, B11 + B22, min_size, out=P)
+    _accumulate(C11, P, alpha, add)
+    _accumulate(C22, P, alpha, add)
+
+    better_strassen_matrix_mult(A11 + A12, B22, min_size, out=P)
+    _accumulate(C12, P, alpha, add)
+    _accumulate(C11, P, alpha, sub)
+
+    better_strassen_matrix_mult(A11, B12 - B22, min_size, out=P)
+    _accumulate(C12, P, alpha, add)
+    _accumulate(C22, P, alpha, add)
+
+    better_strassen_matrix_mult(A21 + A22, B11, min_size, out=P)
+    _accumulate(C21, P, alpha, add)
+    _accumulate(C22, P, alpha, sub)
+
+    better_strassen_matrix_mult(A22, B21 - B11, min_size, out=P)
+    _accumulate(C11, P, alpha, add)
+    _accumulate(C21, P, alpha, add)
+
+    better_strassen_matrix_mult(A11 - A21, B11 + B12, min_size, out=P)
+    _accumulate(C22, P, alpha, sub)
+
+    better_strassen_matrix_mult(A12 - A22, B21 + B22, min_size, out=P)
+    _accumulate(C11, P, alpha, add)
+
+    return C
+
+
+def gemm(alpha: Number, A: Matrix, B: Matrix, beta: Number, C: Matrix,
+         multiply=gauss_matrix_mult, **kwargs) -> Matrix:
+    ''' Overwrite `C` with `alpha*A*B + beta*C`
+
+    The product is accumulated directly in `C`, so repeated updates of the
+    same matrix don't allocate a new result each time. As in BLAS, if
+    `beta` is zero the former values of `C` are not read.
+
+    Parameters
+    ----------
+    alpha: Number
+        The factor scaling the product
+    A: Matrix
+        The first matrix to be multiplied
+    B: Matrix
+        The second matrix to be multiplied
+    beta: Number
+        The factor scaling the former values of `C`
+    C: Matrix
+        A matrix, or a view, where the result is written. It must not share
+        its storage with `A` or `B`.
+    multiply: Callable
+        The multiplication algorithm, one of `gauss_matrix_mult`,
+        `strassen_matrix_mult` and `better_strassen_matrix_mult`
+    kwargs:
+        Further parameters of `multiply`, e.g. `min_size`
+
+    Returns
+    -------
+    Matrix
+        `C` itself
+
+    Raises
+    ------
+    ValueError
+        If the number of columns of `A` is different from the number of
+        rows of `B`, if `C` has the wrong shape or if `alpha` or `beta`
+        aren't numbers, or aren't integers while `C` is int64
+    '''
+    if C is None:
+        raise ValueError('The output matrix is required')
+    _check_scalars(alpha, beta, C, A, B)
+
+    return multiply(A, B, out=C, alpha=alpha, beta=beta, **kwargs)
+
+def workspace_strassen_matrix_mult(A: Matrix, B: Matrix, min_size: int = 64,
+                                   out: Matrix = None,
+                                   workspace: StrassenWorkspace = None
+                                   ) -> Matrix:
+    ''' Multiply two matrices by using a version of the Strassen's
+        algorithm that works in a preallocated workspace
+
+    All the scratch matrices needed by the recursion are allocated once in
+    a `StrassenWorkspace`, and the products are written straight into
+    `out`, so no matrix is allocated during the recursion.
+
+    Parameters
+    ----------
+    A: Matrix
+        The first matrix to be multiplied
+    B: Matrix
+        The second matrix to be multiplied
+    min_size: int
+        Size below which the standard gauss multiplication is used
+    out: Optional[Matrix]
+        A matrix, or a view, where the result is written. It must not share
+        its storage with `A` or `B`. If it is not given a new matrix is
+        allocated.
+    workspace: Optional[StrassenWorkspace]
+        The scratch buffers to use, they can be shared by all the calls
+        with operands of the same size. If it is not given a new workspace
+        is allocated.
+
+    Returns
+    -------
+    Matrix
+        The row-column multiplication of the matrices passed as parameters
+
+    Raises
+    ------
+    ValueError
+        If the number of columns of `A` is different from the number of
+        rows of `B`, or if `out` or `workspace` have the wrong size
+    '''
+
+    if(A.num_of_cols != B.num_of_rows):
+        raise ValueError("The two matrices can't be multiplied")
+
+    dtype = result_dtype(A, B)
+    C = check_output(out, A.num_of_rows, B.num_of_cols, dtype)
+
+    if workspace is None:
+        workspace = StrassenWorkspace(A.num_of_rows, A.num_of_cols,
+                                      B.num_of_cols, min_size, dtype)
+    elif workspace.shape != (A.num_of_rows, A.num_of_cols, B.num_of_cols):
+        raise ValueError('The workspace has the wrong size')
+
+    # Operands whose sizes aren't multiples of 2^depth are padded once,
+    # in buffers owned by the workspace
+    if workspace.padded_A is not None:
+        workspace.padded_A.assign_submatrix(0, 0, A)
+        A = workspace.padded_A
+    if workspace.padded_B is not None:
+        workspace.padded_B.assign_submatrix(0, 0, B)
+        B = workspace.padded_B
+
+    if workspace.padded_C is None:
+        _workspace_strassen(A, B, C, workspace, 0)
+    else:
+        _workspace_strassen(A, B, workspace.padded_C, workspace, 0)
+        C.assign_submatrix(0, 0, workspace.padded_C.view(
+            0, C.num_of_rows, 0, C.num_of_cols))
+
+    return C
+
+
+def _workspace_strassen(A: Matrix, B: Matrix, C: Matrix,
+                        workspace: StrassenWorkspace, level: int):
+    ''' Write in `C` the product of `A` and `B` by using the scratch
+        buffers of `workspace` from `level` on
+    '''
+
+    # Base case
+    if level == workspace.depth:
+        gauss_matrix_mult(A, B, out=C)
+        return
+
+    S, T, P = workspace.buffers[level]
+
+    A11, A12, A21, A22 = get_matrix_quadrants(A)
+    B11, B12, B21, B22 = get_matrix_quadrants(B)
+    C11, C12, C21, C22 = get_matrix_quadrants(C)
+
+    S.combine(A11, A22, add)
+    T.combine(B11, B22, add)
+    _workspace_strassen(S, T, P, workspace, level + 1)
+    C11.assign_submatrix(0, 0, P)
+    C22.assign_submatrix(0, 0, P)
+
+    S.combine(A11, A12, add)
+    _workspace_strassen(S, B22, P, workspace, level + 1)
+    C12.assign_submatrix(0, 0, P)
+    C11 -= P
+
+    T.combine(B12, B22, sub)
+    _workspace_strassen(A11, T, P, workspace, level + 1)
+    C12 += P
+    C22 += P
+
+    S.combine(A21, A22, add)
+    _workspace_strassen(S, B11, P, workspace, level + 1)
+    C21.assign_submatrix(0, 0, P)
+    C22 -= P
+
+    T.combine(B21, B11, sub)
+    _workspace_strassen(A22, T, P, workspace, level + 1)
+    C11 += P
+    C21 += P
+
+    S.combine(A11, A21, sub)
+    T.combine(B11, B12, add)
+    _workspace_strassen(S, T, P, workspace, level + 1)
+    C22 -= P
+
+    S.combine(A12, A22, sub)
+    T.combine(B21, B22, add)
+    _workspace_strassen(S, T, P, workspace, level + 1)
+    C11 += P
+
+def numpy_strassen_matrix_mult(A: Matrix, B: Matrix,
+                               min_size: int = NUMPY_MIN_SIZE,
+                               out: Matrix = None) -> Matrix:
+    ''' Multiply two matrices by using the Strassen's algorithm on top of
+        numpy's multiplication
+
+    The matrices are wrapped, without copying them, by numpy arrays; the
+    recursion stops when one of the sizes is below `min_size` and uses
+    numpy's (BLAS) multiplication there. Odd sizes are handled by dynamic
+    peeling, so any shape is supported, and the sums are written by
+    `np.add`/`np.subtract` in scratch buffers allocated once per level. The
+    result is written straight into the storage of `out`.
+
+    Parameters
+    ----------
+    A: Matrix
+        The first matrix to be multiplied
+    B: Matrix
+        The second matrix to be multiplied
+    min_size: int
+        Size below which numpy's multiplication is used, see `calibrate`
+    out: Optional[Matrix]
+        A matrix, or a view, where the result is written. It must not share
+        its storage with `A` or `B`. If it is not given a new matrix is
+        allocated.
+
+    Returns
+    -------
+    Matrix
+        The row-column multiplication of the matrices passed as parameters
+
+    Raises
+    ------
+    ValueError
+        If the number of columns of `A` is different from the number of
+        rows of `B` or if `out` has the wrong shape
+    ImportError
+        If numpy is not installed
+    '''
+
+    if np is None:
+        raise ImportError('numpy_strassen_matrix_mult requires numpy')
+
+    if(A.num_of_cols != B.num_of_rows):
+        raise ValueError("The two matrices can't be multiplied")
+
+    C = check_output(out, A.num_of_rows, B.num_of_cols, result_dtype(A, B))
+    c = _ndarray(C)
+    a = _ndarray(A).astype(c.dtype, copy=False)
+    b = _ndarray(B).astype(c.dtype, copy=False)
+
+    # Every node of a level of the recursion has the same (peeled) sizes,
+    # so the scratch buffers S, T and P can be shared by the whole level
+    buffers = []
+    m, k, n = A.num_of_rows, A.num_of_cols, B.num_of_cols
+    while min(m, k, n) >= max(min_size, 2):
+        m, k, n = m//2, k//2, n//2
+        buffers.append((np.empty((m, k), c.dtype), np.empty((k, n), c.dtype),
+                        np.empty((m, n), c.dtype)))
+
+    _numpy_strassen(a, b, c, buffers, 0)
+
+    return C
+
+
+def _ndarray(A: Matrix) -> np.ndarray:
+    ''' Return a numpy array sharing the storage of `A` '''
+    if not A.num_of_rows or not A.num_of_cols:
+        return np.zeros((A.num_of_rows, A.num_of_cols), A._data.typecode)
+
+    flat = np.frombuffer(A._data, A._data.typecode)
+    return np.lib.stride_tricks.as_strided(
+        flat[A._offset:], (A.num_of_rows, A.num_of_cols),
+        (A._stride*flat.itemsize, flat.itemsize))
+
+
+def _numpy_strassen(a: np.ndarray, b: np.ndarray, c: np.ndarray,
+                    buffers: List[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+                    level: int):
+    ''' Write in `c` the product of `a` and `b` by using the scratch
+        buffers from `level` on
+    '''
+
+    # Base case
+    if level == len(buffers):
+        np.matmul(a, b, out=c)
+        return
+
+    rows, inner, cols = a.shape[0], a.shape[1], b.shape[1]
+    m2, k2, n2 = rows - rows%2, inner - inner%2, cols - cols%2
+    S, T, P = buffers[level]
+
+    # The last column of A times the last row of B is added to the even
+    # core, whose quadrants are then accumulated instead of overwritten
+    accumulate = k2 != inner
+    if accumulate:
+        np.matmul(a[:m2, k2:], b[k2:, :n2], out=c[:m2, :n2])
+
+    def store(X, P):
+        if accumulate:
+            np.add(X, P, out=X)
+        else:
+            np.copyto(X, P)
+
+    m, k, n = m2//2, k2//2, n2//2
+    A11, A12, A21, A22 = a[:m, :k], a[:m, k:k2], a[m:m2, :k], a[m:m2, k:k2]
+    B11, B12, B21, B22 = b[:k, :n], b[:k, n:n2], b[k:k2, :n], b[k:k2, n:n2]
+    C11, C12, C21, C22 = c[:m, :n], c[:m, n:n2], c[m:m2, :n], c[m:m2, n:n2]
+
+    np.add(A11, A22, out=S)
+    np.add(B11, B22, out=T)
+    _numpy_strassen(S, T, P, buffers, level + 1)
+    store(C11, P)
+    store(C22, P)
+
+    np.add(A11, A12, out=S)
+    _numpy_strassen(S, B22, P, buffers, level + 1)
+    store(C12, P)
+    np.subtract(C11, P, out=C11)
+
+    np.subtract(B12, B22, out=T)
+    _numpy_strassen(A11, T, P, buffers, level + 1)
+    np.add(C12, P, out=C12)
+    np.add(C22, P, out=C22)
+
+    np.add(A21, A22, out=S)
+    _numpy_strassen(S, B11, P, buffers, level + 1)
+    store(C21, P)
+    np.subtract(C22, P, out=C22)
+
+    np.subtract(B21, B11, out=T)
+    _numpy_strassen(A22, T, P, buffers, level + 1)
+    np.add(C11, P, out=C11)
+    np.add(C21, P, out=C21)
+
+    np.subtract(A11, A21, out=S)
+    np.add(B11, B12, out=T)
+    _numpy_strassen(S, T, P, buffers, level + 1)
+    np.subtract(C22, P, out=C22)
+
+    np.subtract(A12, A22, out=S)
+    np.add(B21, B22, out=T)
+    _numpy_strassen(S, T, P, buffers, level + 1)
+    np.add(C11, P, out=C11)
+
+    # Odd column and row of the result
+    if n2 != cols:
+        np.matmul(a, b[:, n2:], out=c[:, n2:])
+    if m2 != rows:
+        np.matmul(a[m2:], b[:, :n2], out=c[m2:, :n2])
+
+
+def stream_matrix_mult(A_rows: Iterable[Iterable[Number]], B: Matrix,
+                       dtype: str = 'float64') -> Iterator[array]:
+    ''' Multiply the rows of a matrix, given one at a time, by a matrix
+
+    This is a generator: each row of the result is computed, as dot
+    products with the columns of `B`, only when the matching row of `A` is
+    read, so `A` can be read lazily, e.g. from a file or a `MappedMatrix`,
+    and the memory used doesn't depend on its number of rows. See
+    `stream_matrix_mult_to` to write the result to a sink.
+
+    Parameters
+    ----------
+    A_rows: Iterable[Iterable[Number]]
+        The rows of the first matrix to be multiplied, sequences of values
+        or iterators over them (e.g. lazily parsed lines of a file), which
+        are read once
+    B: Matrix
+        The second matrix to be multiplied, it must not change while the
+        rows are being yielded
+    dtype: str
+        Type of the values of the result, one of the keys of `DTYPES`
+
+    Yields
+    ------
+    array
+        The rows of the row-column multiplication of the matrices passed as
+        parameters
+
+    Raises
+    ------
+    ValueError
+        If the length of a row of `A` is different from the number of
+        rows of `B`
+    '''
+    code = typecode(dtype)
+    inner = B.num_of_rows
+    b_cols = [_column(B, j) for j in range(B.num_of_cols)]
+
+    for row in A_rows:
+        # Each value is read once per column of B
+        if not hasattr(row, '__len__'):
+            row = list(row)
+        if len(row) != inner:
+            raise ValueError("The two matrices can't be multiplied")
+
+        yield array(code, [sum(map(mul, row, b_col)) for b_col in b_cols])
+
+
+def stream_matrix_mult_to(A_rows: Iterable[Iterable[Number]], B: Matrix,
+                          sink, dtype: str = 'float64') -> int:
+    ''' Multiply the rows of a matrix, given one at a time, by a matrix
+        and send each row of the result to a sink, see `stream_matrix_mult`
+
+    Parameters
+    ----------
+    A_rows: Iterable[Iterable[Number]]
+        The rows of the first matrix to be multiplied, sequences of values
+        or iterators over them
+    B: Matrix
+        The second matrix to be multiplied
+    sink: Union[Callable[[array], None], BinaryIO]
+        A function called with each row of the result, or a binary file
+        (e.g. a file open in 'wb' mode or `socket.makefile('wb')`) where
+        the values of the rows are written
+    dtype: str
+        Type of the values of the result, one of the keys of `DTYPES`
+
+    Returns
+    -------
+    int
+        The number of rows of the result
+
+    Raises
+    ------
+    ValueError
+        If the length of a row of `A` is different from the number of
+        rows of `B`
+    '''
+    write = sink if callable(sink) else lambda row: sink.write(row.tobytes())
+
+    count = 0
+    for row in stream_matrix_mult(A_rows, B, dtype):
+        write(row)
+        count += 1
+
+    return count
+
+
+def out_of_core_matrix_mult(A: Union[Matrix, MappedMatrix],
+                            B: Union[Matrix, MappedMatrix],
+                            out: Union[str, MappedMatrix],
+                            memory_budget: int = OUT_OF_CORE_BUDGET,
+                            multiply=gauss_matrix_mult,
+                            **kwargs) -> MappedMatrix:
+    ''' Multiply two matrices, possibly larger than the memory, tile by
+        tile
+
+    The result is a memory-mapped file; each of its tiles is computed in
+    memory by accumulating the products of the tiles of a row of `A` and
+    of a column of `B`, read in buffers allocated once. The tiles are
+    square, as large as allowed by `memory_budget` for the three buffers:
+    with tile size t, `A` is read ceil(n/t) times, `B` ceil(m/t) times and
+    the result is written once.
+
+    Parameters
+    ----------
+    A: Union[Matrix, MappedMatrix]
+        The first matrix to be multiplied
+    B: Union[Matrix, MappedMatrix]
+        The second matrix to be multiplied
+    out: Union[str, MappedMatrix]
+        The path of the file where the result is written, or a mapped
+        matrix of the right size
+    memory_budget: int
+        The memory, in bytes, for the tiles of `A`, `B` and the result.
+        The temporary values of `multiply` are not included.
+    multiply: Callable
+        The multiplication algorithm used on the tiles, one of
+        `gauss_matrix_mult`, `strassen_matrix_mult` and
+        `better_strassen_matrix_mult`
+    kwargs:
+        Further parameters of `multiply`, e.g. `min_size`
+
+    Returns
+    -------
+    MappedMatrix
+        The row-column multiplication of the matrices passed as parameters
+
+    Raises
+    ------
+    ValueError
+        If the number of columns of `A` is different from the number of
+        rows of `B`, if `out` has the wrong shape or if the budget can't
+        hold three 1 x 1 tiles
+    '''
+
+    if(A.num_of_cols != B.num_of_rows):
+        raise ValueError("The two matrices can't be multiplied")
+
+    rows, inner, cols = A.num_of_rows, A.num_of_cols, B.num_of_cols
+    dtype = result_dtype(A, B)
+    if isinstance(out, str):
+        out = MappedMatrix.create(out, rows, cols, dtype)
+    elif out.num_of_rows != rows or out.num_of_cols != cols:
+        raise ValueError('The output matrix has the wrong size')
+
+    itemsize = array(typecode(dtype)).itemsize
+    tile = min(isqrt(memory_budget//(3*itemsize)), max(rows, inner, cols))
+    if tile < 1:
+        raise ValueError('The memory budget is too small')
+
+    A_tile = zero_matrix(tile, tile, A.dtype)
+    B_tile = zero_matrix(tile, tile, B.dtype)
+    C_tile = zero_matrix(tile, tile, out.dtype)
+
+    for i in range(0, rows, tile):
+        tile_rows = min(tile, rows - i)
+        for j in range(0, cols, tile):
+            tile_cols = min(tile, cols - j)
+            C = C_tile.view(0, tile_rows, 0, tile_cols)
+            C.fill(0)
+
+            for k in range(0, inner, tile):
+                tile_inner = min(tile, inner - k)
+                X = _read_tile(A, i, tile_rows, k, tile_inner, A_tile)
+                Y = _read_tile(B, k, tile_inner, j, tile_cols, B_tile)
+                multiply(X, Y, out=C, beta=1, **kwargs)
+
+            out.write_tile(i, j, C)
+
+    out.flush()
+
+    return out
+
+
+def _read_tile(A: Union[Matrix, MappedMatrix], from_row: int,
+               num_of_rows: int, from_col: int, num_of_cols: int,
+               buffer: Matrix) -> Matrix:
+    ''' Return a tile of `A`, read in `buffer` if `A` is mapped '''
+    if isinstance(A, Matrix):
+        return A.view(from_row, num_of_rows, from_col, num_of_cols)
+
+    return A.read_tile(from_row, num_of_rows, from_col, num_of_cols,
+                       out=buffer.view(0, num_of_rows, 0, num_of_cols))
+
+
+def random_matrix(rows: int, cols: int, dtype: str = 'float64') -> Matrix:
+    """
+    Returns a matrix filled with uniformly distributed random values
+
+    Parameters
+    ----------
+    rows: int
+        Number of rows
+    cols: int
+        Number of columns
+    dtype: str
+        Type of the matrix elements, one of the keys of `DTYPES`. Integer
+        matrices are filled with values in [-100, 100].
+
+    Returns
+    -------
+    Matrix
+        Matrix filled with random values
+    """
+
+    if dtype == 'int64':
+        data = array(typecode(dtype),
+                     [randint(-100, 100) for i in range(rows*cols)])
+    else:
+        data = array(typecode(dtype), [random() for i in range(rows*cols)])
+
+    return Matrix.from_buffer(data, rows, cols)
+
+def _best_time(f, *args, repetitions: int = 3) -> float:
+    best = float('inf')
+    for i in range(repetitions):
+        start = time.perf_counter()
+        f(*args)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+def _aspect(rows: int, inner: int, cols: int) -> int:
+    """
+    Returns the ratio between the largest and the smallest size of a
+    product, rounded down to a power of two
+    """
+
+    ratio = max(rows, inner, cols) // max(min(rows, inner, cols), 1)
+
+    return 1 << (ratio.bit_length() - 1)
+
+def calibrate(sizes: Tuple[int, ...] = (16, 32, 64, 128, 256),
+              aspects: Tuple[int, ...] = (1, 2, 4),
+              dtypes: Tuple[str, ...] = ('float64',),
+              path: str = CALIBRATION_FILE,
+              repetitions: int = 3,
+              numpy_sizes: Tuple[int, ...] = (256, 512, 1024, 2048),
+              numpy_dispatch_sizes: Tuple[int, ...] = (2, 4, 8, 16, 32)
+              ) -> Dict[str, Dict[str, int]]:
+    """
+    Measures on this host the size at which one level of the Strassen's
+    algorithm becomes faster than the gauss multiplication, and stores the
+    crossover table in `path`
+
+    For every dtype and aspect ratio `a` the products of an n x n/a matrix
+    by an n/a x n matrix are timed, for each n in `sizes`. The crossover is
+    the smallest n for which one Strassen level on top of gauss beats plain
+    gauss, or twice the largest size if that never happens. If numpy is
+    installed, the crossover of `numpy_strassen_matrix_mult` over numpy's
+    multiplication is measured in the same way on square products, one for
+    each dtype, together with the smallest size for which numpy's
+    multiplication beats gauss, from which `matmul` uses numpy.
+
+    Parameters
+    ----------
+    sizes: Tuple[int, ...]
+        The largest size of the products to time
+    aspects: Tuple[int, ...]
+        The ratios between the largest and the smallest size of the
+        products to time, powers of two
+    dtypes: Tuple[str, ...]
+        The element types to calibrate
+    path: Optional[str]
+        The file where the table is stored, if None it isn't stored
+    repetitions: int
+        The number of times each product is timed, the best time is kept
+    numpy_sizes: Tuple[int, ...]
+        The sizes of the products to time with numpy
+    numpy_dispatch_sizes: Tuple[int, ...]
+        The sizes of the products to time with numpy and with gauss
+
+    Returns
+    -------
+    Dict[str, Dict[str, int]]
+        The crossover sizes indexed by dtype and by aspect ratio
+    """
+
+    global _crossover_table, _numpy_crossover_table, _numpy_dispatch_table
+
+    table = {}
+    for dtype in dtypes:
+        table[dtype] = {}
+        for aspect in aspects:
+            crossover = 2*max(sizes)
+            for n in sorted(sizes):
+                A = random_matrix(n, max(n // aspect, 1), dtype)
+                B = random_matrix(max(n // aspect, 1), n, dtype)
+
+                gauss_time = _best_time(gauss_matrix_mult, A, B,
+                                        repetitions=repetitions)
+                # With min_size equal to n exactly one level is performed
+                strassen_time = _best_time(strassen_matrix_mult, A, B, n,
+                                           repetitions=repetitions)
+                if strassen_time < gauss_time:
+                    crossover = n
+                    break
+
+            table[dtype][str(aspect)] = crossover
+
+    numpy_table, dispatch_table = {}, {}
+    if np is not None:
+        for dtype in dtypes:
+            dispatch_table[dtype] = 2*max(numpy_dispatch_sizes)
+            for n in sorted(numpy_dispatch_sizes):
+                A = random_matrix(n, n, dtype)
+                B = random_matrix(n, n, dtype)
+
+                gauss_time = _best_time(gauss_matrix_mult, A, B,
+                                        repetitions=repetitions)
+                numpy_time = _best_time(numpy_strassen_matrix_mult, A, B,
+                                        n + 1, repetitions=repetitions)
+                if numpy_time < gauss_time:
+                    dispatch_table[dtype] = n
+                    break
+
+            numpy_table[dtype] = 2*max(numpy_sizes)
+            for n in sorted(numpy_sizes):
+                A = random_matrix(n, n, dtype)
+                B = random_matrix(n, n, dtype)
+
+                # With min_size above n no level is performed, with n one
+                numpy_time = _best_time(numpy_strassen_matrix_mult, A, B,
+                                        n + 1, repetitions=repetitions)
+                strassen_time = _best_time(numpy_strassen_matrix_mult, A, B,
+                                           n, repetitions=repetitions)
+                if strassen_time < numpy_time:
+                    numpy_table[dtype] = n
+                    break
+
+    if path is not None:
+        with open(path, 'w') as f:
+            json.dump({'host': platform.node(), 'crossover': table,
+                       'numpy_crossover': numpy_table,
+                       'numpy_dispatch': dispatch_table}, f, indent=2)
+
+    _crossover_table = table
+    _numpy_crossover_table = numpy_table
+    _numpy_dispatch_table = dispatch_table
+
+    return table
+
+def load_crossover_table(path: str = CALIBRATION_FILE,
+                         key: str = 'crossover') -> Dict[str, Dict[str, int]]:
+    """
+    Returns the crossover table stored by `calibrate`
+
+    Parameters
+    ----------
+    path: str
+        The file where the table is stored
+    key: str
+        'crossover' for the table of the Strassen's algorithm over gauss,
+        'numpy_crossover' for the table of numpy's multiplication,
+        'numpy_dispatch' for the table of numpy over gauss
+
+    Returns
+    -------
+    Dict[str, Dict[str, int]]
+        The crossover sizes indexed by dtype and by aspect ratio (only by
+        dtype for numpy), empty if the host hasn't been calibrated yet
+    """
+
+    if not os.path.exists(path):
+        return {}
+
+    with open(path) as f:
+        return json.load(f).get(key, {})
+
+# The tables used by `matmul`, loaded on first use
+_crossover_table = None
+_numpy_crossover_table = None
+_numpy_dispatch_table = None
+
+def crossover_size(A: Matrix, B: Matrix) -> int:
+    """
+    Returns the size below which gauss is faster than Strassen for the
+    product of `A` and `B`, according to the calibration of this host
+
+    Parameters
+    ----------
+    A: Matrix
+        The first matrix to be multiplied
+    B: Matrix
+        The second matrix to be multiplied
+
+    Returns
+    -------
+    int
+        The crossover size, `DEFAULT_MIN_SIZE` if it is unknown
+    """
+
+    global _crossover_table
+
+    if _crossover_table is None:
+        _crossover_table = load_crossover_table()
+
+    table = _crossover_table.get(result_dtype(A, B))
+    if not table:
+        return DEFAULT_MIN_SIZE
+
+    # Use the largest calibrated aspect ratio not above that of the product
+    aspect = _aspect(A.num_of_rows, A.num_of_cols, B.num_of_cols)
+    calibrated = [int(key) for key in table if int(key) <= aspect]
+    if not calibrated:
+        return table[min(table, key=int)]
+
+    return table[str(max(calibrated))]
+
+def numpy_crossover_size(A: Matrix, B: Matrix) -> int:
+    """
+    Returns the size below which numpy's multiplication is faster than
+    `numpy_strassen_matrix_mult` for the product of `A` and `B`, according
+    to the calibration of this host
+
+    Parameters
+    ----------
+    A: Matrix
+        The first matrix to be multiplied
+    B: Matrix
+        The second matrix to be multiplied
+
+    Returns
+    -------
+    int
+        The crossover size, `NUMPY_MIN_SIZE` if it is unknown
+    """
+
+    global _numpy_crossover_table
+
+    if _numpy_crossover_table is None:
+        _numpy_crossover_table = load_crossover_table(key='numpy_crossover')
+
+    return _numpy_crossover_table.get(result_dtype(A, B), NUMPY_MIN_SIZE)
+
+def numpy_dispatch_size(A: Matrix, B: Matrix) -> int:
+    """
+    Returns the size from which numpy's multiplication is faster than gauss
+    for the product of `A` and `B`, according to the calibration of this
+    host
+
+    Parameters
+    ----------
+    A: Matrix
+        The first matrix to be multiplied
+    B: Matrix
+        The second matrix to be multiplied
+
+    Returns
+    -------
+    int
+        The crossover size, `NUMPY_DISPATCH_SIZE` if it is unknown
+    """
+
+    global _numpy_dispatch_table
+
+    if _numpy_dispatch_table is None:
+        _numpy_dispatch_table = load_crossover_table(key='numpy_dispatch')
+
+    return _numpy_dispatch_table.get(result_dtype(A, B), NUMPY_DISPATCH_SIZE)
+
+def matmul(A: Matrix, B: Matrix) -> Matrix:
+    ''' Multiply two matrices by using the algorithm that is expected to
+        be the fastest on this host
+
+    If numpy is installed, products with a size at least equal to
+    `numpy_dispatch_size` use `numpy_strassen_matrix_mult`, with the numpy
+    crossover measured by `calibrate` as `min_size`. Otherwise products
+    whose sizes are all below the calibrated crossover use gauss,
+    the others use the Strassen's algorithm with the crossover as
+    `min_size`: products whose largest size is more than twice the
+    smallest one use `rectangular_matrix_mult`, the others use the memory
+    efficient version if the result has more than `MEMORY_EFFICIENT_SIZE`
+    elements.
+
+    Parameters
+    ----------
+    A: Matrix
+        The first matrix to be multiplied
+    B: Matrix
+        The second matrix to be multiplied
+
+    Returns
+    -------
+    Matrix
+        The row-column multiplication of the matrices passed as parameters
+
+    Raises
+    ------
+    ValueError
+        If the number of columns of `A` is different from the number of
+        rows of `B`
+    '''
+
+    largest = max(A.num_of_rows, A.num_of_cols, B.num_of_cols)
+
+    # Wrapping the matrices in numpy arrays has a fixed cost, which the
+    # smallest products don't make up for
+    if np is not None and largest >= numpy_dispatch_size(A, B):
+        return numpy_strassen_matrix_mult(A, B, numpy_crossover_size(A, B))
+
+    min_size = crossover_size(A, B)
+    if largest < min_size:
+        return gauss_matrix_mult(A, B)
+
+    if _aspect(A.num_of_rows, A.num_of_cols, B.num_of_cols) > 2:
+        return rectangular_matrix_mult(A, B, min_size)
+
+    # The workspace engine allocates all its scratch matrices once, about a
+    # third of the memory of the operands and of the result, while the
+    # other engines allocate new sums and products at every level of the
+    # recursion
+    if A.num_of_rows*B.num_of_cols > MEMORY_EFFICIENT_SIZE:
+        return workspace_strassen_matrix_mult(A, B, min_size)
+
+    return strassen_matrix_mult(A, B, min_size)
+
+def matrix_power(A: Matrix, k: int, cache: bool = True) -> Matrix:
+    ''' Raise a square matrix to a non-negative integer power
+
+    The power is computed by binary exponentiation with `matmul`, by
+    multiplying the squares A^(2^i) that correspond to the bits of `k`,
+    i.e. with O(log k) multiplications. The squares are kept in a cache
+    shared by the calls, so that later powers of the same matrix reuse
+    them; the squares of the least recently used matrices are dropped when
+    there are more than `POWER_CACHE_SIZE` of them, and those of a matrix
+    are discarded when it is modified.
+
+    Parameters
+    ----------
+    A: Matrix
+        The matrix to be raised to the power
+    k: int
+        The exponent
+    cache: bool
+        Whether to use, and update, the cache of the squares
+
+    Returns
+    -------
+    Matrix
+        The matrix A^k, the identity matrix if `k` is 0
+
+    Raises
+    ------
+    ValueError
+        If `A` isn't square or `k` is negative
+    '''
+    if A.num_of_rows != A.num_of_cols:
+        raise ValueError('Only square matrices can be raised to a power')
+    if k < 0:
+        raise ValueError('The exponent must be non-negative')
+
+    if k == 0:
+        I = zero_matrix(A.num_of_rows, A.num_of_rows, A.dtype)
+        for i in range(A.num_of_rows):
+            I._row(i)[i] = 1
+        return I
+
+    # Only plain matrices can be checked for updates by sharing a copy
+    cache = cache and type(A) in (Matrix, MatrixView)
+    squares = _cached_squares(A) if cache else [A]
+
+    C = None
+    for i in range(k.bit_length()):
+        if i == len(squares):
+            squares.append(matmul(squares[-1], squares[-1]))
+        if k >> i & 1:
+            C = squares[i] if C is None else matmul(C, squares[i])
+
+    if cache:
+        _evict_squares()
+
+    # The result may be a cached square (or `A` itself)
+    return C.copy() if C is squares[k.bit_length() - 1] else C
+
+
+def _cached_squares(A: Matrix) -> List[Matrix]:
+    ''' Return the list of the cached squares of `A`, which `matrix_power`
+        extends in place, creating it if `A` isn't cached or has been
+        modified since
+    '''
+    entry = _power_cache.pop(id(A), None)
+    if entry is not None:
+        snapshot, squares = entry
+        # A copy is cloned as soon as the matrix it shares is modified
+        if (snapshot._data is not A._data or snapshot._offset != A._offset
+                or snapshot._stride != A._stride
+                or snapshot.num_of_rows != A.num_of_rows):
+            entry = None
+
+    if entry is None:
+        snapshot = A.copy()
+        squares = [snapshot]
+
+    _power_cache[id(A)] = snapshot, squares
+    return squares
+
+
+def _evict_squares():
+    ''' Drop the squares of the least recently used matrices while the
+        cache holds more than `POWER_CACHE_SIZE` of them, the matrix used
+        last is always kept
+    '''
+    total = sum(len(squares) for _, squares in _power_cache.values())
+    while total > POWER_CACHE_SIZE and len(_power_cache) > 1:
+        _, squares = _power_cache.popitem(last=False)[1]
+        total -= len(squares)
+
+
+def lu_decomposition(A: Matrix, min_size: int = 64
+                     ) -> Tuple[List[int], Matrix, Matrix]:
+    ''' Compute the LU decomposition with partial pivoting of a square
+        matrix
+
+    The decomposition is recursive on the columns: the left half is
+    decomposed first, then the top right block is solved against the
+    unit lower triangular factor and the bottom right block is updated with
+    a product computed by `strassen_matrix_mult`, before decomposing it,
+    so that it takes O(n^2.81) operations. The rows are swapped, choosing
+    the pivot with the largest magnitude, only in the columns narrower
+    than `min_size`, where the standard elimination is used.
+
+    Parameters
+    ----------
+    A: Matrix
+        The matrix to be decomposed
+    min_size: int
+        Size below which the standard algorithms are used
+
+    Returns
+    -------
+    Tuple[List[int], Matrix, Matrix]
+        The permutation `p` of the rows, the unit lower triangular matrix
+        `L` and the upper triangular matrix `U`, such that the i-th row of
+        `L * U` is the `p[i]`-th row of `A`. The matrices are float32 if
+        `A` is, float64 otherwise
+
+    Raises
+    ------
+    ValueError
+        If `A` isn't square or it is singular
+    '''
+    perm, W = _lu_factor(A, _solution_dtype(A, A), min_size)
+    n = A.num_of_rows
+
+    L, U = zero_matrix(n, n, W.dtype), zero_matrix(n, n, W.dtype)
+    for i in range(n):
+        row = W._row(i)
+        L._row(i)[:i] = row[:i]
+        L._row(i)[i] = 1
+        U._row(i)[i:] = row[i:]
+
+    return perm, L, U
+
+
+def solve_triangular(T: Matrix, B: Matrix, lower: bool = True,
+                     unit_diagonal: bool = False,
+                     min_size: int = 64) -> Matrix:
+    ''' Solve the system T * X = B, where `T` is a triangular matrix
+
+    The system is split in two halves: the first one is solved, its
+    solution multiplied by the off-diagonal block of `T` with
+    `strassen_matrix_mult` is subtracted from the second one, which is then
+    solved, so that it takes O(n^2.81) operations for n right-hand sides.
+    Only the triangle of `T` given by `lower` is read.
+
+    Parameters
+    ----------
+    T: Matrix
+        The triangular matrix of the system
+    B: Matrix
+        The matrix of the right-hand sides, one per column
+    lower: bool
+        Whether `T` is lower triangular, otherwise it is upper triangular
+    unit_diagonal: bool
+        Whether the elements on the diagonal of `T` are assumed to be one,
+        then they aren't read
+    min_size: int
+        Size below which the substitution is used
+
+    Returns
+    -------
+    Matrix
+        The solution `X`, float32 if both `T` and `B` are, float64 otherwise
+
+    Raises
+    ------
+    ValueError
+        If `T` isn't square, its size is different from the number of rows
+        of `B` or it is singular
+    '''
+    if T.num_of_rows != T.num_of_cols:
+        raise ValueError('The matrix of the system must be square')
+    if T.num_of_cols != B.num_of_rows:
+        raise ValueError('The sizes of the system do not match')
+
+    X = B.astype(_solution_dtype(T, B))
+    X._prepare_write()
+    _triangular_solve(T, X, lower, unit_diagonal, max(min_size, 2))
+
+    return X
+
+
+def solve(A: Matrix, B: Matrix, min_size: int = 64) -> Matrix:
+    ''' Solve the system A * X = B, by using the LU decomposition of `A`
+
+    Parameters
+    ----------
+    A: Matrix
+        The square matrix of the system
+    B: Matrix
+        The matrix of the right-hand sides, one per column
+    min_size: int
+        Size below which the standard algorithms are used
+
+    Returns
+    -------
+    Matrix
+        The solution `X`, float32 if both `A` and `B` are, float64 otherwise
+
+    Raises
+    ------
+    ValueError
+        If `A` isn't square, its size is different from the number of rows
+        of `B` or it is singular
+    '''
+    if A.num_of_cols != B.num_of_rows:
+        raise ValueError('The sizes of the system do not match')
+
+    # The Strassen's algorithm needs `min_size` to be at least 2
+    min_size = max(min_size, 2)
+    dtype = _solution_dtype(A, B)
+    perm, W = _lu_factor(A, dtype, min_size)
+
+    X = zero_matrix(B.num_of_rows, B.num_of_cols, dtype)
+    for i, p in enumerate(perm):
+        X._row(i)[:] = array(X._data.typecode, B._row(p))
+
+    # W holds both L, below the diagonal, and U
+    _triangular_solve(W, X, True, True, min_size)
+    _triangular_solve(W, X, False, False, min_size)
+
+    return X
+
+
+def inverse(A: Matrix, min_size: int = 64) -> Matrix:
+    ''' Return the inverse of a square matrix
+
+    Parameters
+    ----------
+    A: Matrix
+        The matrix to be inverted
+    min_size: int
+        Size below which the standard algorithms are used
+
+    Returns
+    -------
+    Matrix
+        The inverse of `A`, float32 if `A` is, float64 otherwise
+
+    Raises
+    ------
+    ValueError
+        If `A` isn't square or it is singular
+    '''
+    return solve(A, IdentityMatrix(A.num_of_rows, A.dtype), min_size)
+
+
+def _solution_dtype(A: Matrix, B: Matrix) -> str:
+    ''' Return the type of the solutions of the systems with `A` and `B` '''
+    return 'float32' if A.dtype == B.dtype == 'float32' else 'float64'
+
+
+def _lu_factor(A: Matrix, dtype: str,
+               min_size: int) -> Tuple[List[int], Matrix]:
+    ''' Return the permutation of the LU decomposition of `A` and a new
+        matrix of type `dtype` holding `L`, without its diagonal, and `U`
+    '''
+    if A.num_of_rows != A.num_of_cols:
+        raise ValueError('Only square matrices can be decomposed')
+
+    W = A.astype(dtype)
+    W._prepare_write()
+    perm = list(range(A.num_of_rows))
+    _recursive_lu(W, 0, A.num_of_cols, perm, max(min_size, 2))
+
+    return perm, W
+
+
+def _recursive_lu(W: Matrix, col: int, width: int, perm: List[int],
+                  min_size: int):
+    ''' Decompose in place the panel of `W` made of the `width` columns
+        from `col` and of the rows from `col`, swapping whole rows of `W`
+    '''
+    if width < min_size:
+        _unblocked_lu(W, col, width, perm)
+        return
+
+    n, half = W.num_of_rows, width//2
+    _recursive_lu(W, col, half, perm, min_size)
+
+    L11 = W.view(col, half, col, half)
+    A12 = W.view(col, half, col + half, width - half)
+    A21 = W.view(col + half, n - col - half, col, half)
+    A22 = W.view(col + half, n - col - half, col + half, width - half)
+
+    _triangular_solve(L11, A12, True, True, min_size)
+    strassen_matrix_mult(A21, A12, min_size, out=A22, alpha=-1, beta=1)
+
+    _recursive_lu(W, col + half, width - half, perm, min_size)
+
+
+def _unblocked_lu(W: Matrix, col: int, width: int, perm: List[int]):
+    ''' Decompose in place a panel of `W` with the standard elimination,
+        see `_recursive_lu`
+    '''
+    code = W._data.typecode
+    end = col + width
+    for j in range(col, end):
+        p = max(range(j, W.num_of_rows), key=lambda i: abs(W._row(i)[j]))
+        pivot = W._row(p)[j]
+        if pivot == 0:
+            raise ValueError('The matrix is singular')
+
+        if p != j:
+            row = array(code, W._row(j))
+            W._row(j)[:] = W._row(p)
+            W._row(p)[:] = row
+            perm[j], perm[p] = perm[p], perm[j]
+
+        row = W._row(j)[j + 1:end]
+        for i in range(j + 1, W.num_of_rows):
+            target = W._row(i)
+            factor = target[j] / pivot
+            target[j] = factor
+            if factor:
+                target[j + 1:end] = array(code, map(sub, target[j + 1:end],
+                                                    map(mul, repeat(factor),
+                                                        row)))
+
+
+def _triangular_solve(T: Matrix, B: Matrix, lower: bool, unit: bool,
+                      min_size: int):
+    ''' Overwrite `B` with the solution of T * X = B, see
+        `solve_triangular`
+    '''
+    n = T.num_of_rows
+    if B.num_of_cols == 0 or n == 0:
+        return
+
+    if n < min_size:
+        _substitution(T, B, lower, unit)
+        return
+
+    half, cols = n//2, B.num_of_cols
+    B1, B2 = B.view(0, half, 0, cols), B.view(half, n - half, 0, cols)
+    T11, T22 = T.view(0, half, 0, half), T.view(half, n - half, half, n - half)
+
+    if lower:
+        _triangular_solve(T11, B1, lower, unit, min_size)
+        strassen_matrix_mult(T.view(half, n - half, 0, half), B1, min_size,
+                             out=B2, alpha=-1, beta=1)
+        _triangular_solve(T22, B2, lower, unit, min_size)
+    else:
+        _triangular_solve(T22, B2, lower, unit, min_size)
+        strassen_matrix_mult(T.view(0, half, half, n - half), B2, min_size,
+                             out=B1, alpha=-1, beta=1)
+        _triangular_solve(T11, B1, lower, unit, min_size)
+
+
+def _substitution(T: Matrix, B: Matrix, lower: bool, unit: bool):
+    ''' Overwrite `B` with the solution of T * X = B by forward or
+        backward substitution
+    '''
+    code = B._data.typecode
+    n = T.num_of_rows
+    order = range(n) if lower else range(n - 1, -1, -1)
+    for i in order:
+        coefficients = T._row(i)
+        target = B._row(i)
+        for j in (range(i) if lower else range(i + 1, n)):
+            if coefficients[j]:
+                target[:] = array(code, map(sub, target,
+                                            map(mul, repeat(coefficients[j]),
+                                                B._row(j))))
+        if not unit:
+            if coefficients[i] == 0:
+                raise ValueError('The matrix is singular')
+            target[:] = array(code, map(mul, repeat(1/coefficients[i]),
+                                        target))
+
+
+def sparse_dense_mult(A: SparseMatrix, B: Matrix) -> Matrix:
+    ''' Multiply a sparse matrix by a dense one
+
+    Every row of the result is the sum of the rows of `B` selected by the
+    nonzero values of the matching row of `A`, scaled by them.
+
+    Parameters
+    ----------
+    A: SparseMatrix
+        The first matrix to be multiplied
+    B: Matrix
+        The second matrix to be multiplied
+
+    Returns
+    -------
+    Matrix
+        The row-column multiplication of the matrices passed as parameters
+
+    Raises
+    ------
+    ValueError
+        If the number of columns of `A` is different from the number of
+        rows of `B`
+    '''
+
+    if(A.num_of_cols != B.num_of_rows):
+        raise ValueError("The two matrices can't be multiplied")
+
+    cols = B.num_of_cols
+    C = zero_matrix(A.num_of_rows, cols, dtype=result_dtype(A, B))
+    code = C._data.typecode
+
+    pointers, indices, values = A.row_pointers, A.col_indices, A.values
+    for i in range(A.num_of_rows):
+        if pointers[i] == pointers[i + 1]:
+            continue
+
+        c_row = [0]*cols
+        for p in range(pointers[i], pointers[i + 1]):
+            c_row = list(map(add, c_row,
+                             map(mul, repeat(values[p]), B._row(indices[p]))))
+
+        C[i][:] = array(code, c_row)
+
+    return C
+
+
+def dense_sparse_mult(A: Matrix, B: SparseMatrix) -> Matrix:
+    ''' Multiply a dense matrix by a sparse one
+
+    Every nonzero value of `A` scatters the matching row of `B`, scaled by
+    it, into the result.
+
+    Parameters
+    ----------
+    A: Matrix
+        The first matrix to be multiplied
+    B: SparseMatrix
+        The second matrix to be multiplied
+
+    Returns
+    -------
+    Matrix
+        The row-column multiplication of the matrices passed as parameters
+
+    Raises
+    ------
+    ValueError
+        If the number of columns of `A` is different from the number of
+        rows of `B`
+    '''
+
+    if(A.num_of_cols != B.num_of_rows):
+        raise ValueError("The two matrices can't be multiplied")
+
+    C = zero_matrix(A.num_of_rows, B.num_of_cols, dtype=result_dtype(A, B))
+    code = C._data.typecode
+
+    pointers, indices, values = B.row_pointers, B.col_indices, B.values
+    for i in range(A.num_of_rows):
+        c_row = [0]*B.num_of_cols
+        for k, a_value in enumerate(A._row(i)):
+            if a_value:
+                for p in range(pointers[k], pointers[k + 1]):
+                    c_row[indices[p]] += a_value*values[p]
+
+        C[i][:] = array(code, c_row)
+
+    return C
+
+
+def sparse_sparse_mult(A: SparseMatrix, B: SparseMatrix) -> SparseMatrix:
+    ''' Multiply two sparse matrices by using the Gustavson's algorithm
+
+    Parameters
+    ----------
+    A: SparseMatrix
+        The first matrix to be multiplied
+    B: SparseMatrix
+        The second matrix to be multiplied
+
+    Returns
+    -------
+    SparseMatrix
+        The row-column multiplication of the matrices passed as parameters
+
+    Raises
+    ------
+    ValueError
+        If the number of columns of `A` is different from the number of
+        rows of `B`
+    '''
+
+    if(A.num_of_cols != B.num_of_rows):
+        raise ValueError("The two matrices can't be multiplied")
+
+    values = array(typecode(result_dtype(A, B)))
+    indices, pointers = array('q'), array('q', [0])
+
+    for i in range(A.num_of_rows):
+        # Accumulator of the nonzero values of the i-th row of the result
+        row = {}
+        for p in range(A.row_pointers[i], A.row_pointers[i + 1]):
+            a_value = A.values[p]
+            for q in range(B.row_pointers[A.col_indices[p]],
+                           B.row_pointers[A.col_indices[p] + 1]):
+                j = B.col_indices[q]
+                row[j] = row.get(j, 0) + a_value*B.values[q]
+
+        for j in sorted(row):
+            if row[j]:
+                indices.append(j)
+                values.append(row[j])
+        pointers.append(len(values))
+
+    return SparseMatrix.from_csr(values, indices, pointers, B.num_of_cols)
+
+def quadtree_strassen_matrix_mult(A: QuadtreeMatrix, B: QuadtreeMatrix
+                                  ) -> QuadtreeMatrix:
+    ''' Multiply two quadtree matrices by using the Strassen's algorithm
+
+    The recursion follows the trees, so splitting a matrix in quadrants is
+    free; leaves are multiplied with the gauss multiplication and products
+    involving all-zero subtrees are skipped.
+
+    Parameters
+    ----------
+    A: QuadtreeMatrix
+        The first matrix to be multiplied
+    B: QuadtreeMatrix
+        The second matrix to be multiplied
+
+    Returns
+    -------
+    QuadtreeMatrix
+        The row-column multiplication of the matrices passed as parameters
+
+    Raises
+    ------
+    ValueError
+        If the number of columns of `A` is different from the number of
+        rows of `B`, or if the two trees have different leaf sizes
+    '''
+
+    if(A.num_of_cols != B.num_of_rows):
+        raise ValueError("The two matrices can't be multiplied")
+    if A.leaf_size != B.leaf_size:
+        raise ValueError('The two matrices have different leaf sizes')
+
+    # Bring the two trees to the same height
+    side = max(A.side, B.side)
+    root = _quadtree_strassen(A._grow(side), B._grow(side))
+
+    return QuadtreeMatrix._from_root(root, side, A.num_of_rows,
+                                     B.num_of_cols, A.leaf_size,
+                                     result_dtype(A, B))
+
+
+def _quadtree_sum(X, Y, op):
+    ''' Return `op(X, Y)` for two quadtree nodes of the same size '''
+    if Y is None:
+        return X
+    if X is None:
+        return Y if op is add else _quadtree_negate(Y)
+    if isinstance(X, Matrix):
+        return _quadtree_leaf(op(X, Y))
+
+    return _quadtree_node(_quadtree_sum(x, y, op) for x, y in zip(X, Y))
+
+
+def _quadtree_negate(X):
+    if X is None:
+        return None
+    if isinstance(X, Matrix):
+        return _quadtree_leaf(-1*X)
+
+    return tuple(_quadtree_negate(x) for x in X)
+
+
+def _quadtree_leaf(X: Matrix) -> Matrix:
+    ''' Return the evaluated leaf `X`, or None if it is all-zero '''
+    X = X.evaluate() if isinstance(X, MatrixExpression) else X
+
+    return None if X.is_zero() else X
+
+
+def _quadtree_node(children: Iterable):
+    ''' Return the node made of `children`, or None if they are all None '''
+    node = tuple(children)
+
+    return None if all(child is None for child in node) else node
+
+
+def _quadtree_strassen(X, Y):
+    ''' Return the product of two quadtree nodes of the same size '''
+    if X is None or Y is None:
+        return None
+
+    # Base case
+    if isinstance(X, Matrix):
+        return _quadtree_leaf(gauss_matrix_mult(X, Y))
+
+    A11, A12, A21, A22 = X
+    B11, B12, B21, B22 = Y
+
+    # Quadrant C_ij of the result is the sum of the products A_ik B_kj, if
+    # less than seven of them are nonzero they are cheaper than Strassen's
+    blocks = [(A11, B11), (A12, B21), (A11, B12), (A12, B22),
+              (A21, B11), (A22, B21), (A21, B12), (A22, B22)]
+    if sum(1 for U, V in blocks if U is not None and V is not None) < 7:
+        P = [_quadtree_strassen(U, V) for U, V in blocks]
+        return _quadtree_node(_quadtree_sum(P[2*i], P[2*i + 1], add)
+                              for i in range(4))
+
+    P1 = _quadtree_strassen(A11, _quadtree_sum(B12, B22, sub))
+    P2 = _quadtree_strassen(_quadtree_sum(A11, A12, add), B22)
+    P3 = _quadtree_strassen(_quadtree_sum(A21, A22, add), B11)
+    P4 = _quadtree_strassen(A22, _quadtree_sum(B21, B11, sub))
+    P5 = _quadtree_strassen(_quadtree_sum(A11, A22, add),
+                            _quadtree_sum(B11, B22, add))
+    P6 = _quadtree_strassen(_quadtree_sum(A12, A22, sub),
+                            _quadtree_sum(B21, B22, add))
+    P7 = _quadtree_strassen(_quadtree_sum(A11, A21, sub),
+                            _quadtree_sum(B11, B12, add))
+
+    C11 = _quadtree_sum(_quadtree_sum(_quadtree_sum(P5, P4, add), P2, sub),
+                        P6, add)
+    C12 = _quadtree_sum(P1, P2, add)
+    C21 = _quadtree_sum(P3, P4, add)
+    C22 = _quadtree_sum(_quadtree_sum(_quadtree_sum(P5, P1, add), P3, sub),
+                        P7, sub)
+
+    return _quadtree_node((C11, C12, C21, C22))
+
+def _morton_index(tile_row: int, tile_col: int) -> int:
+    ''' Return the position in Morton order of a tile, by interleaving the
+        bits of its row (odd bits) and column (even bits)
+    '''
+    index, bit = 0, 0
+    while tile_row >> bit or tile_col >> bit:
+        index |= ((tile_col >> bit) & 1) << (2*bit)
+        index |= ((tile_row >> bit) & 1) << (2*bit + 1)
+        bit += 1
+
+    return index
+
+
+def morton_strassen_matrix_mult(A: MortonMatrix, B: MortonMatrix
+                                ) -> MortonMatrix:
+    ''' Multiply two Morton-ordered matrices by using the Strassen's
+        algorithm
+
+    Every quadrant, at every level of the recursion, is a contiguous span
+    of the buffer, so the sums of quadrants are single passes over two
+    spans and the quadrants of the result are just concatenated. Tiles are
+    multiplied with the gauss multiplication.
+
+    Parameters
+    ----------
+    A: MortonMatrix
+        The first matrix to be multiplied
+    B: MortonMatrix
+        The second matrix to be multiplied
+
+    Returns
+    -------
+    MortonMatrix
+        The row-column multiplication of the matrices passed as parameters
+
+    Raises
+    ------
+    ValueError
+        If the number of columns of `A` is different from the number of
+        rows of `B`, or if the two matrices have different tile sizes
+    '''
+
+    if(A.num_of_cols != B.num_of_rows):
+        raise ValueError("The two matrices can't be multiplied")
+    if A.tile_size != B.tile_size:
+        raise ValueError('The two matrices have different tile sizes')
+
+    side = max(A.side, B.side)
+    code = typecode(result_dtype(A, B))
+    data = _morton_strassen(A._grow(side), B._grow(side), side, A.tile_size,
+                            code)
+
+    return MortonMatrix._from_buffer(data, side, A.num_of_rows,
+                                     B.num_of_cols, A.tile_size)
+
+
+def _morton_strassen(a, b, side: int, tile_size: int, code: str) -> array:
+    ''' Return the Morton-ordered product of two Morton-ordered blocks '''
+
+    # Base case
+    if side == tile_size:
+        A = Matrix.from_buffer(array(code, a), side, side)
+        B = Matrix.from_buffer(array(code, b), side, side)
+        return gauss_matrix_mult(A, B)._data
+
+    n = len(a)//4
+    a = memoryview(a)
+    b = memoryview(b)
+    A11, A12, A21, A22 = a[:n], a[n:2*n], a[2*n:3*n], a[3*n:]
+    B11, B12, B21, B22 = b[:n], b[n:2*n], b[2*n:3*n], b[3*n:]
+
+    def strassen(X, Y) -> array:
+        return _morton_strassen(X, Y, side//2, tile_size, code)
+
+    def combine(X, Y, op) -> array:
+        return array(code, map(op, X, Y))
+
+    P1 = strassen(A11, combine(B12, B22, sub))
+    P2 = strassen(combine(A11, A12, add), B22)
+    P3 = strassen(combine(A21, A22, add), B11)
+    P4 = strassen(A22, combine(B21, B11, sub))
+    P5 = strassen(combine(A11, A22, add), combine(B11, B22, add))
+    P6 = strassen(combine(A12, A22, sub), combine(B21, B22, add))
+    P7 = strassen(combine(A11, A21, sub), combine(B11, B12, add))
+
+    # Each quadrant of the result is computed in one pass
+    C = array(code, map(add, map(sub, map(add, P5, P4), P2), P6))
+    C.extend(map(add, P1, P2))
+    C.extend(map(add, P3, P4))
+    C.extend(map(sub, map(sub, map(add, P5, P1), P3), P7))
+
+    return C
+
+class Matrix(object):
+    ''' A simple naive matrix class
+
+    The sums, the differences and the products by a scalar built with `+`,
+    `-` and `*` return a lazy `MatrixExpression` rather than a `Matrix`.
+    It is a subclass of `Matrix`, evaluated when its values are first
+    needed, and it holds copies of its operands, so later updates of the
+    operands don't change it. Products of two matrices still return a
+    `Matrix`.
+
+    `A[y]` returns the `y`-th row as a memoryview over the storage of the
+    matrix rather than as a list: writes to it update the matrix, and
+    `list(A[y])` or iterating over the matrix give lists. Since a row is
+    writable, taking it from a copy clones the copy; `A[y, x]` reads or
+    sets a single value, and reading it never clones.
+
+    Members
+    -------
+    _data: array
+        A contiguous row-major buffer that stores all the matrix values
+    _view: memoryview
+        A memoryview over `_data` used to hand out rows without copying
+    _offset: int
+        The position in `_data` of the first element of the matrix
+    _stride: int
+        The distance in `_data` between two consecutive rows
+    _rows: int
+        The number of rows of the matrix
+    _cols: int
+        The number of columns of the matrix
+    _root: Optional[Matrix]
+        For a view of a copy sharing its storage (see `copy`), that copy
+    _views: WeakValueDictionary
+        For a copy, its views, by id
+    _read_only: bool
+        Whether the values can't be modified, e.g. for the views of the
+        structured matrices
+
+    Parameters
+    ----------
+    A: List[List[Number]]
+        The list of rows that store all the matrix values
+    clone_matrix: Optional[bool]
+        A flag to require a full copy of `A`'s data structure. The values
+        are always packed into a new buffer, so it is kept only for
+        backward compatibility.
+    dtype: Optional[str]
+        The type of the matrix elements, one of the keys of `DTYPES`
+
+    Raises
+    ------
+    ValueError
+        If there are two lists having a different number of values or if
+        `dtype` is not supported
+    '''
+    _root = None
+    _read_only = False
+
+    def __init__(self, A: List[List[Number]], clone_matrix: bool = True,
+                 dtype: str = 'float64'):
+        num_of_cols = None
+
+        for i, row in enumerate(A):
+            if num_of_cols is not None:
+                if num_of_cols != len(row):
+                    raise ValueError('This is not a matrix')
+            else:
+                num_of_cols = len(row)
+
+        data = array(typecode(dtype))
+        for row in A:
+            data.extend(row)
+
+        self._set_buffer(data, len(A), num_of_cols or 0)
+
+    @classmethod
+    def from_buffer(cls, data: array, rows: int, cols: int) -> Matrix:
+        ''' Build a matrix on top of an existing row-major buffer
+
+        Parameters
+        ----------
+        data: array
+            The buffer storing the values, it is used without copying it
+        rows: int
+            The number of rows of the matrix
+        cols: int
+            The number of columns of the matrix
+
+        Returns
+        -------
+        Matrix
+            A matrix sharing its storage with `data`
+
+        Raises
+        ------
+        ValueError
+            If the buffer size doesn't match the requested shape
+        '''
+        if len(data) != rows*cols:
+            raise ValueError('The buffer size does not match the shape')
+
+        M = cls.__new__(cls)
+        M._set_buffer(data, rows, cols)
+
+        return M
+
+    def _set_buffer(self, data: array, rows: int, cols: int,
+                    offset: int = 0, stride: int = None):
+        self._data = data
+        self._view = memoryview(data)
+        self._offset = offset
+        self._stride = cols if stride is None else stride
+        self._rows = rows
+        self._cols = cols
+
+    def _is_contiguous(self) -> bool:
+        return self._stride == self._cols or self._rows <= 1
+
+    def _row_slices(self, merge: bool = True) -> Iterator[slice]:
+        ''' Iterate over the slices of `_data` holding the matrix values
+
+        If `merge` is set a contiguous matrix is covered by a single slice,
+        otherwise one slice per row is returned.
+        '''
+        if merge and self._is_contiguous():
+            yield slice(self._offset, self._offset + self._rows*self._cols)
+            return
+
+        for y in range(self._rows):
+            start = self._offset + y*self._stride
+            yield slice(start, start + self._cols)
+
+    @property
+    def num_of_rows(self) -> int:
+        return self._rows
+
+    @property
+    def num_of_cols(self) -> int:
+        return self._cols
+
+    @property
+    def dtype(self) -> str:
+        return DTYPE_NAMES[self._data.typecode]
+
+    def copy(self) -> Matrix:
+        ''' Return a copy of this matrix
+
+        The copy shares the storage of this matrix until one of the two is
+        modified: the first in-place update (e.g. `+=`, `assign_submatrix`
+        or the rows returned by `[]`, which are writable) of either of them,
+        or of their views, clones the values of the copy. The rows returned
+        by `[]` and the arrays returned by `to_numpy` write straight to the
+        storage, so while any of them is alive the values are copied at
+        once instead.
+
+        Returns
+        -------
+        Matrix
+            A matrix with the same values of this one
+        '''
+        if _exported_views.get(id(self._data)):
+            data = array(self._data.typecode)
+            for span in self._row_slices():
+                data += self._data[span]
+
+            return Matrix.from_buffer(data, self._rows, self._cols)
+
+        C = Matrix.__new__(Matrix)
+        C._set_buffer(self._data, self._rows, self._cols, self._offset,
+                      self._stride)
+        C._views = WeakValueDictionary()
+        copies = _buffer_copies.setdefault(id(self._data),
+                                           WeakValueDictionary())
+        copies[id(C)] = C
+
+        return C
+
+    def _clone_buffer(self):
+        ''' Move the values of this matrix, and its views, to a new
+            contiguous buffer
+        '''
+        data = array(self._data.typecode)
+        for span in self._row_slices():
+            data += self._data[span]
+
+        offset, stride = self._offset, self._stride
+        self._set_buffer(data, self._rows, self._cols)
+        for V in list(getattr(self, '_views', {}).values()):
+            row, col = divmod(V._offset - offset, stride or 1)
+            V._set_buffer(data, V._rows, V._cols, row*self._cols + col,
+                          self._cols)
+
+    def _own(self):
+        ''' Clone the values of this matrix if it is (or it is a view of)
+            a copy still sharing its storage
+        '''
+        if self._root is not None:
+            self._root._own()
+            return
+
+        copies = _buffer_copies.get(id(self._data))
+        if copies is not None and copies.pop(id(self), None) is not None:
+            if not copies:
+                del _buffer_copies[id(self._data)]
+            self._clone_buffer()
+
+    def _prepare_write(self):
+        ''' Make sure that writing to the storage of this matrix doesn't
+            change any copy, by cloning this matrix if it is a copy and the
+            copies sharing its storage otherwise
+
+        Raises
+        ------
+        TypeError
+            If the matrix is read only
+        '''
+        if self._read_only:
+            raise TypeError('The matrix is read only')
+
+        self._own()
+
+        copies = _buffer_copies.pop(id(self._data), None)
+        if copies is not None:
+            for C in list(copies.values()):
+                C._clone_buffer()
+
+    def __getitem__(self, index: Union[int, Tuple[int, int]]):
+        ''' Return one of the rows, or one of the values
+
+        A row is writable, so taking it from a copy clones the copy (see
+        `copy`); `A[y, x]` only reads the value, without cloning.
+
+        Parameters
+        ----------
+        index: Union[int, Tuple[int, int]]
+            the index `y` of the row, or the indices `(y, x)` of the value,
+            to be returned
+
+        Returns
+        -------
+        Union[memoryview, Number]
+            The `y`-th row of the matrix, writes to it update the matrix
+            unless it is read only, or the value in row `y` and column `x`
+
+        Raises
+        ------
+        IndexError
+            If the index is out of range
+        '''
+        if isinstance(index, tuple):
+            return self._data[self._position(*index)]
+
+        if self._read_only:
+            return self._row(index).toreadonly()
+
+        self._prepare_write()
+
+        return self._export(self._row(index))
+
+    def __setitem__(self, index: Tuple[int, int], value: Number):
+        ''' Set one of the values, i.e. `A[y, x] = value`
+
+        Parameters
+        ----------
+        index: Tuple[int, int]
+            the indices `(y, x)` of the value to be set
+        value: Number
+            The value to be written
+
+        Raises
+        ------
+        IndexError
+            If the index is out of range
+        TypeError
+            If the index isn't a pair or if the matrix is read only
+        '''
+        if not isinstance(index, tuple):
+            raise TypeError('Matrix values are set with A[y, x] = value')
+
+        self._position(*index)
+        self._prepare_write()
+        self._data[self._position(*index)] = value
+
+    def _position(self, y: int, x: int) -> int:
+        ''' Return the position in `_data` of the value in row `y` and
+            column `x`
+        '''
+        if y < 0:
+            y += self._rows
+        if x < 0:
+            x += self._cols
+        if not (0 <= y < self._rows and 0 <= x < self._cols):
+            raise IndexError('Index out of range')
+
+        return self._offset + y*self._stride + x
+
+    def _export(self, V):
+        ''' Record that the writable row or array `V` over the storage of
+            this matrix has been handed out, see `copy`, and return it
+        '''
+        key = id(self._data)
+        exported = _exported_views.get(key)
+        if exported is None:
+            exported = _exported_views[key] = WeakValueDictionary()
+            # Forget the buffer when it is released
+            finalize(self._data, _exported_views.pop, key, None)
+        exported[id(V)] = V
+
+        return V
+
+    def _row(self, y: int):
+        ''' Return one of the rows, which must not be written '''
+        if y < 0:
+            y += self._rows
+        if not 0 <= y < self._rows:
+            raise IndexError('Row index out of range')
+
+        start = self._offset + y*self._stride
+        return self._view[start:start + self._cols]
+
+    def __iter__(self) -> Iterator[List[Number]]:
+        ''' Iterate over the rows of the matrix as lists of values '''
+        for y in range(self._rows):
+            yield self._row(y).tolist()
+
+    def is_zero(self) -> bool:
+        ''' Return True if all the values of the matrix are zero '''
+        return not any(any(self._view[span]) for span in self._row_slices())
+
+    def to_numpy(self) -> np.ndarray:
+        ''' Return a numpy array sharing the storage of this matrix
+
+        Returns
+        -------
+        np.ndarray
+            An array with the shape and the values of this matrix, writes
+            to it update the matrix
+
+        Raises
+        ------
+        ImportError
+            If numpy is not installed
+        '''
+        if np is None:
+            raise ImportError('Matrix.to_numpy requires numpy')
+
+        self._prepare_write()
+
+        return self._export(_ndarray(self))
+
+    def fill(self, value: Number):
+        ''' Set all the values of the matrix to `value`
+
+        Parameters
+        ----------
+        value: Number
+            The value to be written
+        '''
+        self._prepare_write()
+        code = self._data.typecode
+        for span in self._row_slices():
+            self._view[span] = array(code, [value])*(span.stop - span.start)
+
+    def scale(self, value: Number):
+        ''' Multiply in place all the values of the matrix by `value`
+
+        Parameters
+        ----------
+        value: Number
+            The scaling factor
+        '''
+        self._prepare_write()
+        code = self._data.typecode
+        for span in self._row_slices():
+            self._view[span] = array(code, map(mul, repeat(value),
+                                               self._view[span]))
+
+    def _apply(self, A: Matrix, op):
+        ''' Combine, element by element, a matrix into this matrix
+
+        Parameters
+        ----------
+        A: Matrix
+            The matrix to be combined into this matrix
+        op: Callable[[Number, Number], Number]
+            The binary operation to apply, e.g. `operator.add`
+
+        Raises
+        ------
+        ValueError
+            If the two matrices have different sizes
+        '''
+        self.combine(self, A, op)
+
+    def combine(self, A: Matrix, B: Matrix, op):
+        ''' Overwrite this matrix with `op` applied element by element
+            to two matrices
+
+        The result is written row by row, so `A` or `B` may be this matrix
+        itself but must not otherwise overlap with it.
+
+        Parameters
+        ----------
+        A: Matrix
+            The first operand
+        B: Matrix
+            The second operand
+        op: Callable[[Number, Number], Number]
+            The binary operation to apply, e.g. `operator.add`
+
+        Raises
+        ------
+        ValueError
+            If the three matrices have different sizes
+        TypeError
+            If this matrix is read only
+        '''
+
+        for M in (A, B):
+            if (self.num_of_cols != M.num_of_cols or
+                    self.num_of_rows != M.num_of_rows):
+                raise ValueError('The two matrices have different sizes')
+
+        self._prepare_write()
+        code = self._data.typecode
+        merge = (self._is_contiguous() and A._is_contiguous() and
+                 B._is_contiguous())
+        for dst, a, b in zip(self._row_slices(merge), A._row_slices(merge),
+                             B._row_slices(merge)):
+            self._view[dst] = array(code, map(op, A._view[a], B._view[b]))
+
+    def __iadd__(self, A: Matrix) -> Matrix:
+        ''' Sum a matrix to this matrix and update it
+
+        Parameters
+        ----------
+        A: Matrix
+            The matrix to be summed up
+
+        Returns
+        -------
+        Matrix
+            The matrix corresponding to the sum between this matrix and
+            that passed as parameter
+
+        Raises
+        ------
+        ValueError
+            If the two matrices have different sizes
+        '''
+
+        self._apply(A, add)
+
+        return self
+
+    def __add__(self, A: Matrix) -> Matrix:
+        ''' Sum a matrix to this matrix
+
+        Parameters
+        ----------
+        A: Matrix
+            The matrix to be summed up
+
+        Returns
+        -------
+        MatrixExpression
+            The matrix corresponding to the sum between this matrix and
+            that passed as parameter, evaluated when its values are first
+            needed
+
+        Raises
+        ------
+        ValueError
+            If the two matrices have different sizes
+        '''
+        if not isinstance(A, Matrix):
+            return NotImplemented
+        self._check_sum(A)
+
+        return MatrixExpression.from_operands(
+            self._linear_terms() + A._linear_terms(), self._rows, self._cols)
+
+    def __isub__(self, A: Matrix) -> Matrix:
+        ''' Subtract a matrix to this matrix and update it
+
+        Parameters
+        ----------
+        A: Matrix
+            The matrix to be subtracted up
+
+        Returns
+        -------
+        Matrix
+            The matrix corresponding to the subtraction between this matrix and
+            that passed as parameter
+
+        Raises
+        ------
+        ValueError
+            If the two matrices have different sizes
+        '''
+
+        self._apply(A, sub)
+
+        return self
+
+    def __sub__(self, A: Matrix) -> Matrix:
+        ''' Subtract a matrix to this matrix
+
+        Parameters
+        ----------
+        A: Matrix
+            The matrix to be subtracted up
+
+        Returns
+        -------
+        MatrixExpression
+            The matrix corresponding to the subtraction between this matrix and
+            that passed as parameter, evaluated when its values are first
+            needed
+
+        Raises
+        ------
+        ValueError
+            If the two matrices have different sizes
+        '''
+        if not isinstance(A, Matrix):
+            return NotImplemented
+        self._check_sum(A)
+
+        return MatrixExpression.from_operands(
+            self._linear_terms() + A._linear_terms(coefficient=-1),
+            self._rows, self._cols)
+
+    def __mul__(self, A: Matrix) -> Matrix:
+        ''' Multiply one matrix to this matrix
+
+        Parameters
+        ----------
+        A: Matrix
+            The matrix which multiplies this matrix
+
+        Returns
+        -------
+        Matrix
+            The row-column multiplication between this matrix and that passed
+            as parameter
+
+        Raises
+        ------
+        ValueError
+            If the number of columns of this matrix is different from the
+            number of rows of `A`
+        '''
+        # Let SparseMatrix.__rmul__ handle dense-sparse products
+        if isinstance(A, SparseMatrix):
+            return NotImplemented
+
+        return gauss_matrix_mult(self, A)
+
+    def __rmul__(self, value: Number) -> Matrix:
+        ''' Multiply one matrix by a numeric value
+
+        Parameters
+        ----------
+        value: Number
+            The numeric value which multiplies this matrix
+
+        Returns
+        -------
+        MatrixExpression
+            The multiplication between `value` and this matrix, evaluated
+            when its values are first needed
+
+        Raises
+        ------
+        ValueError
+            If `value` is not a number
+        '''
+
+        if not isinstance(value, Number):
+            raise ValueError('{} is not a number'.format(value))
+
+        return MatrixExpression.from_operands(
+            self._linear_terms(coefficient=value), self._rows, self._cols)
+
+    def _linear_terms(self, coefficient: Number = 1
+                      ) -> List[Tuple[Number, Matrix]]:
+        ''' Return this matrix, scaled by `coefficient`, as a list of
+            (coefficient, matrix) terms of a `MatrixExpression`
+        '''
+        return [(coefficient, self)]
+
+    def _check_sum(self, A: Matrix):
+        if (self.num_of_cols != A.num_of_cols or
+                self.num_of_rows != A.num_of_rows):
+            raise ValueError('The two matrices have different sizes')
+
+    def astype(self, dtype: str) -> Matrix:
+        ''' Return a copy of this matrix with the given element type
+
+        Parameters
+        ----------
+        dtype: str
+            The type of the elements of the copy, one of the keys of `DTYPES`
+
+        Returns
+        -------
+        Matrix
+            A copy of this matrix stored with the requested dtype
+        '''
+        if dtype == self.dtype:
+            return self.copy()
+
+        data = array(typecode(dtype))
+        for span in self._row_slices():
+            data.extend(self._view[span])
+
+        return Matrix.from_buffer(data, self._rows, self._cols)
+
+    def submatrix(self, from_row: int, num_of_rows: int,
+                  from_col: int, num_of_cols: int) -> Matrix:
+        ''' Return a submatrix of this matrix
+
+        Parameters
+        ----------
+        from_row: int
+            The first row to be included in the submatrix to be returned
+        num_of_rows: int
+            The number of rows to be included in the submatrix to be returned
+        from_col: int
+            The first col to be included in the submatrix to be returned
+        num_of_cols: int
+            The number of cols to be included in the submatrix to be returned
+
+        Returns
+        -------
+        Matrix
+            A submatrix of this matrix
+        '''
+        # Clip the requested region to the matrix, as list slicing would do
+        to_row = min(from_row + num_of_rows, self._rows)
+        to_col = min(from_col + num_of_cols, self._cols)
+
+        return self.view(from_row, max(to_row - from_row, 0),
+                         from_col, max(to_col - from_col, 0)).copy()
+
+    def view(self, from_row: int, num_of_rows: int,
+             from_col: int, num_of_cols: int) -> MatrixView:
+        ''' Return a submatrix of this matrix without copying its values
+
+        Parameters
+        ----------
+        from_row: int
+            The first row to be included in the view
+        num_of_rows: int
+            The number of rows to be included in the view
+        from_col: int
+            The first col to be included in the view
+        num_of_cols: int
+            The number of cols to be included in the view
+
+        Returns
+        -------
+        MatrixView
+            A view sharing its storage with this matrix
+
+        Raises
+        ------
+        ValueError
+            If the requested region exceeds the matrix boundaries
+        '''
+        return MatrixView(self, from_row, num_of_rows, from_col, num_of_cols)
+
+    def assign_submatrix(self, from_row: int, from_col: int, A: Matrix):
+        if not isinstance(A, Matrix):
+            A = Matrix(A, dtype=self.dtype)
+
+        self._prepare_write()
+        same_type = A._data.typecode == self._data.typecode
+        for y in range(A.num_of_rows):
+            start = self._offset + (y + from_row)*self._stride + from_col
+            row = A._row(y)
+            if not same_type:
+                row = array(self._data.typecode, row)
+            self._view[start:start + A.num_of_cols] = row
+
+    def __repr__(self):
+        return '\n'.join('{}'.format(row) for row in self)
+
+
+class MatrixView(Matrix):
+    ''' A rectangular region of a matrix sharing its storage
+
+    Writes to a view, e.g. through `+=` or `assign_submatrix`, update the
+    parent matrix, while operations that build a new matrix, e.g. `+`,
+    return a contiguous `Matrix`.
+
+    Parameters
+    ----------
+    parent: Matrix
+        The matrix (or view) whose storage is shared
+    from_row: int
+        The first row of `parent` included in the view
+    num_of_rows: int
+        The number of rows included in the view
+    from_col: int
+        The first col of `parent` included in the view
+    num_of_cols: int
+        The number of cols included in the view
+
+    Raises
+    ------
+    ValueError
+        If the requested region exceeds the boundaries of `parent`
+    '''
+    def __init__(self, parent: Matrix, from_row: int, num_of_rows: int,
+                 from_col: int, num_of_cols: int):
+        if (min(from_row, num_of_rows, from_col, num_of_cols) < 0 or
+                from_row + num_of_rows > parent.num_of_rows or
+                from_col + num_of_cols > parent.num_of_cols):
+            raise ValueError('The view exceeds the matrix boundaries')
+
+        offset = parent._offset + from_row*parent._stride + from_col
+        self._set_buffer(parent._data, num_of_rows, num_of_cols,
+                         offset, parent._stride)
+        self._read_only = parent._read_only
+
+        # The views of a copy follow it when its values are cloned
+        root = parent if parent._root is None else parent._root
+        views = getattr(root, '_views', None)
+        if views is not None:
+            self._root = root
+            views[id(self)] = self
+
+
+class MatrixExpression(Matrix):
+    ''' A linear combination of matrices, evaluated lazily
+
+    Sums, subtractions and products by a scalar of matrices build
+    expressions, e.g. `P5 + P1 - P3 - P7` is a single expression with four
+    terms and no intermediate result. The expression is evaluated in a
+    single pass, reading each operand once, when it is written in a matrix
+    by `evaluate` or when its values are first needed; in the latter case
+    the result is cached and the operands are released.
+
+    The expressions built by the operators of `Matrix` hold copies of their
+    operands (see `from_operands`), so later updates of the operands don't
+    change them. Those built directly from a list of terms don't, and their
+    operands must not be modified before the expression is evaluated.
+
+    Members
+    -------
+    _terms: List[Tuple[Number, Matrix]]
+        The coefficients and the matrices of the linear combination
+    _dtype: str
+        The type of the elements of the result, one of the keys of `DTYPES`
+    _cache: Optional[Matrix]
+        The value of the expression, computed on first use
+
+    Parameters
+    ----------
+    terms: List[Tuple[Number, Matrix]]
+        The coefficients and the matrices of the linear combination, which
+        must all have the same size
+    rows: int
+        The number of rows of the matrices
+    cols: int
+        The number of columns of the matrices
+    '''
+    _cache = None
+
+    def __init__(self, terms: List[Tuple[Number, Matrix]], rows: int,
+                 cols: int):
+        self._terms = terms
+        self._rows = rows
+        self._cols = cols
+
+        dtypes = {M.dtype for coefficient, M in terms}
+        self._dtype = dtypes.pop() if len(dtypes) == 1 else 'float64'
+        if (self._dtype == 'int64' and
+                not all(isinstance(c, int) for c, M in terms)):
+            self._dtype = 'float64'
+
+    @classmethod
+    def from_operands(cls, terms: List[Tuple[Number, Matrix]], rows: int,
+                      cols: int) -> MatrixExpression:
+        ''' Build the expression of a linear combination of matrices that
+            may be modified later
+
+        Each operand that can be modified is replaced by a copy, which
+        shares its storage until one of them is modified (see
+        `Matrix.copy`). The expressions with more than
+        `MAX_EXPRESSION_TERMS` terms are evaluated at once, so that chains
+        of updates like `S = S + X` don't keep all their operands alive.
+
+        Parameters
+        ----------
+        terms: List[Tuple[Number, Matrix]]
+            The coefficients and the matrices of the linear combination,
+            which must all have the same size
+        rows: int
+            The number of rows of the matrices
+        cols: int
+            The number of columns of the matrices
+
+        Returns
+        -------
+        MatrixExpression
+            The expression of the linear combination
+        '''
+        terms = [(coefficient, M if M._read_only else M.copy())
+                 for coefficient, M in terms]
+        E = cls(terms, rows, cols)
+        if len(terms) > MAX_EXPRESSION_TERMS:
+            E._value()
+
+        return E
+
+    def _value(self) -> Matrix:
+        if self._cache is None:
+            self._cache = self.evaluate()
+            self._terms = [(1, self._cache)]
+
+        return self._cache
+
+    # The storage used by the generic algorithms is the evaluated matrix
+    _data = property(lambda self: self._value()._data)
+    _view = property(lambda self: self._value()._view)
+    _offset = property(lambda self: 0)
+    _stride = property(lambda self: self._cols)
+
+    @property
+    def dtype(self) -> str:
+        return self._dtype
+
+    def _linear_terms(self, coefficient: Number = 1
+                      ) -> List[Tuple[Number, Matrix]]:
+        if coefficient == 1:
+            return list(self._terms)
+
+        return [(coefficient*c, M) for c, M in self._terms]
+
+    def _fused_rows(self, merge: bool) -> Iterator[Iterable[Number]]:
+        ''' Yield the values of each row (or of the whole expression, if
+            `merge` is set) of the result
+        '''
+        for spans in zip(*(M._row_slices(merge) for c, M in self._terms)):
+            values = None
+            for (coefficient, M), span in zip(self._terms, spans):
+                row = M._view[span]
+                if values is None:
+                    values = (row if coefficient == 1 else
+                              map(mul, repeat(coefficient), row))
+                elif coefficient == 1:
+                    values = map(add, values, row)
+                elif coefficient == -1:
+                    values = map(sub, values, row)
+                else:
+                    values = map(add, values,
+                                 map(mul, repeat(coefficient), row))
+            yield values
+
+    def evaluate(self, out: Matrix = None) -> Matrix:
+        ''' Compute the value of the expression in a single pass
+
+        Parameters
+        ----------
+        out: Optional[Matrix]
+            A matrix, or a view, where the result is written. It may be one
+            of the operands, but must not otherwise overlap with them. If it
+            is not given a new matrix is allocated.
+
+        Returns
+        -------
+        Matrix
+            The value of the expression
+
+        Raises
+        ------
+        ValueError
+            If `out` has the wrong shape
+        '''
+        merge = all(M._is_contiguous() for c, M in self._terms)
+        if out is None:
+            data = array(typecode(self._dtype))
+            for values in self._fused_rows(merge):
+                data.extend(values)
+
+            return Matrix.from_buffer(data, self._rows, self._cols)
+
+        C = check_output(out, self._rows, self._cols)
+        code = C._data.typecode
+        merge = merge and C._is_contiguous()
+        for span, values in zip(C._row_slices(merge), self._fused_rows(merge)):
+            C._view[span] = array(code, values)
+
+        return C
+
+    def copy(self):
+        return self.evaluate()
+
+
+class StructuredMatrix(Matrix):
+    ''' Base class of the matrices with a known structure
+
+    Subclasses store only the values that their structure requires, and
+    provide fast paths for the operations that can exploit it. Whenever a
+    generic algorithm needs the dense values they are built once and
+    cached; for this reason structured matrices, and their views, are read
+    only.
+
+    Members
+    -------
+    _dtype: str
+        The type of the matrix elements, one of the keys of `DTYPES`
+    _dense_cache: Optional[Matrix]
+        The dense version of the matrix, built on first use
+    '''
+    _dense_cache = None
+    _read_only = True
+
+    def _set_shape(self, rows: int, cols: int, dtype: str):
+        typecode(dtype)
+        self._rows = rows
+        self._cols = cols
+        self._dtype = dtype
+
+    def _dense(self) -> Matrix:
+        if self._dense_cache is None:
+            self._dense_cache = self.to_dense()
+
+        return self._dense_cache
+
+    # The storage used by the generic algorithms is the dense cache
+    _data = property(lambda self: self._dense()._data)
+    _view = property(lambda self: self._dense()._view)
+    _offset = property(lambda self: 0)
+    _stride = property(lambda self: self._cols)
+
+    @property
+    def dtype(self) -> str:
+        return self._dtype
+
+    def to_dense(self) -> Matrix:
+        ''' Return the dense version of this matrix
+
+        Returns
+        -------
+        Matrix
+            A matrix with the same values of this one
+        '''
+        raise NotImplementedError
+
+    def __iadd__(self, A: Matrix) -> Matrix:
+        # Fall back to `+`, which builds a new matrix
+        return NotImplemented
+
+    def __isub__(self, A: Matrix) -> Matrix:
+        # Fall back to `-`, which builds a new matrix
+        return NotImplemented
+
+    def assign_submatrix(self, from_row: int, from_col: int, A: Matrix):
+        raise TypeError('Structured matrices are read only')
+
+    def fill(self, value: Number):
+        raise TypeError('Structured matrices are read only')
+
+    def scale(self, value: Number):
+        raise TypeError('Structured matrices are read only')
+
+    def _check_product(self, A: Matrix, left: bool):
+        ''' Raise ValueError if `A` can't multiply this matrix on the left
+            (if `left` is set) or on the right
+        '''
+        if left and A.num_of_cols != self.num_of_rows:
+            raise ValueError("The two matrices can't be multiplied")
+        if not left and self.num_of_cols != A.num_of_rows:
+            raise ValueError("The two matrices can't be multiplied")
+
+
+class DiagonalMatrix(StructuredMatrix):
+    ''' A square matrix whose values outside the diagonal are zero
+
+    Multiplying a matrix by a diagonal one on the left (right) scales its
+    rows (columns), which takes O(n^2) operations.
+
+    Members
+    -------
+    _diagonal: array
+        The values on the diagonal
+
+    Parameters
+    ----------
+    diagonal: Iterable[Number]
+        The values on the diagonal
+    dtype: Optional[str]
+        The type of the matrix elements, one of the keys of `DTYPES`
+    '''
+    def __init__(self, diagonal: Iterable[Number], dtype: str = 'float64'):
+        self._diagonal = array(typecode(dtype), diagonal)
+        self._set_shape(len(self._diagonal), len(self._diagonal), dtype)
+
+    @property
+    def diagonal(self) -> array:
+        return self._diagonal
+
+    def to_dense(self) -> Matrix:
+        size = self.num_of_rows
+        A = zero_matrix(size, size, self.dtype)
+        A._data[::size + 1] = self.diagonal
+
+        return A
+
+    def is_zero(self) -> bool:
+        return not any(self.diagonal)
+
+    def _scaled_rows(self, A: Matrix, row_values) -> Matrix:
+        ''' Return `A` with its rows scaled by `row_values`, or its columns
+            if `row_values` is None
+        '''
+        C = zero_matrix(A.num_of_rows, A.num_of_cols, result_dtype(self, A))
+        code = C._data.typecode
+        for y in range(A.num_of_rows):
+            if row_values is None:
+                C._row(y)[:] = array(code, map(mul, A._row(y), self.diagonal))
+            else:
+                C._row(y)[:] = array(code, map(mul, repeat(row_values[y]),
+                                               A._row(y)))
+
+        return C
+
+    def __mul__(self, A: Matrix) -> Matrix:
+        ''' Multiply one matrix to this matrix by scaling its rows
+
+        Parameters
+        ----------
+        A: Matrix
+            The matrix which multiplies this matrix
+
+        Returns
+        -------
+        Matrix
+            The row-column multiplication between this matrix and that passed
+            as parameter, diagonal if `A` is diagonal as well
+
+        Raises
+        ------
+        ValueError
+            If the number of columns of this matrix is different from the
+            number of rows of `A`
+        '''
+        if not isinstance(A, Matrix):
+            return super().__mul__(A)
+
+        self._check_product(A, left=False)
+        if isinstance(A, ZeroMatrix):
+            return A * self
+        if isinstance(A, DiagonalMatrix):
+            return DiagonalMatrix(map(mul, self.diagonal, A.diagonal),
+                                  result_dtype(self, A))
+
+        return self._scaled_rows(A, self.diagonal)
+
+    def __rmul__(self, value: Union[Number, Matrix]) -> Matrix:
+        ''' Multiply this matrix by a numeric value, or a matrix by this
+            matrix by scaling its columns
+
+        Parameters
+        ----------
+        value: Union[Number, Matrix]
+            The numeric value, or the matrix, which multiplies this matrix
+
+        Returns
+        -------
+        Matrix
+            The multiplication between `value` and this matrix, diagonal if
+            `value` is a number
+
+        Raises
+        ------
+        ValueError
+            If `value` is neither a number nor a matrix
+        '''
+        if isinstance(value, Matrix):
+            self._check_product(value, left=True)
+            return self._scaled_rows(value, None)
+
+        if not isinstance(value, Number):
+            raise ValueError('{} is not a number'.format(value))
+
+        dtype = self.dtype
+        if dtype == 'int64' and not isinstance(value, int):
+            dtype = 'float64'
+
+        return DiagonalMatrix(map(mul, repeat(value), self.diagonal), dtype)
+
+    def __add__(self, A: Matrix) -> Matrix:
+        ''' Sum a matrix to this matrix by updating only its diagonal
+
+        Parameters
+        ----------
+        A: Matrix
+            The matrix to be summed up
+
+        Returns
+        -------
+        Matrix
+            The matrix corresponding to the sum between this matrix and
+            that passed as parameter, diagonal if `A` is diagonal as well
+
+        Raises
+        ------
+        ValueError
+            If the two matrices have different sizes
+        '''
+        self._check_sum(A)
+        if isinstance(A, ZeroMatrix):
+            return self
+        if isinstance(A, DiagonalMatrix):
+            return DiagonalMatrix(map(add, self.diagonal, A.diagonal),
+                                  result_dtype(self, A))
+
+        # Writing the diagonal needs a contiguous buffer of its own
+        C = A.astype(result_dtype(self, A))
+        C._prepare_write()
+        C._data[::C.num_of_cols + 1] = array(
+            C._data.typecode, map(add, C._data[::C.num_of_cols + 1],
+                                  self.diagonal))
+
+        return C
+
+    __radd__ = __add__
+
+
+class ScalarMatrix(DiagonalMatrix):
+    ''' A diagonal matrix whose diagonal values are all equal
+
+    Multiplying a matrix by a scalar matrix is the same as multiplying it
+    by the scalar, and no multiplication at all if the scalar is one.
+
+    Members
+    -------
+    value: Number
+        The value on the diagonal
+
+    Parameters
+    ----------
+    size: int
+        The size of the matrix
+    value: Number
+        The value on the diagonal
+    dtype: Optional[str]
+        The type of the matrix elements, one of the keys of `DTYPES`
+    '''
+    def __init__(self, size: int, value: Number, dtype: str = 'float64'):
+        self.value = array(typecode(dtype), [value])[0]
+        self._set_shape(size, size, dtype)
+
+    @property
+    def diagonal(self) -> array:
+        return array(typecode(self.dtype), [self.value])*self.num_of_rows
+
+    def _scale(self, A: Matrix) -> Matrix:
+        # The identity returns the matrix itself, or a copy of it which
+        # shares its storage until one of them is modified
+        if self.value == 1:
+            if isinstance(A, StructuredMatrix):
+                return A
+
+            return A.copy()
+
+        return self.value * A
+
+    def __mul__(self, A: Matrix) -> Matrix:
+        if not isinstance(A, Matrix):
+            return super().__mul__(A)
+
+        self._check_product(A, left=False)
+        return self._scale(A)
+
+    def __rmul__(self, value: Union[Number, Matrix]) -> Matrix:
+        if isinstance(value, Matrix):
+            self._check_product(value, left=True)
+            return self._scale(value)
+
+        if not isinstance(value, Number):
+            raise ValueError('{} is not a number'.format(value))
+
+        dtype = self.dtype
+        if dtype == 'int64' and not isinstance(value, int):
+            dtype = 'float64'
+
+        return ScalarMatrix(self.num_of_rows, value*self.value, dtype)
+
+    def __add__(self, A: Matrix) -> Matrix:
+        if isinstance(A, ScalarMatrix):
+            self._check_sum(A)
+            return ScalarMatrix(self.num_of_rows, self.value + A.value,
+                                result_dtype(self, A))
+
+        return super().__add__(A)
+
+    __radd__ = __add__
+
+
+class IdentityMatrix(ScalarMatrix):
+    ''' A class for identity matrices
+
+    Parameters
+    ----------
+    size: int
+        The size of the identity matrix
+    dtype: Optional[str]
+        The type of the matrix elements, one of the keys of `DTYPES`
+    '''
+    def __init__(self, size: int, dtype: str = 'float64'):
+        super().__init__(size, 1, dtype)
+
+
+class ZeroMatrix(StructuredMatrix):
+    ''' A matrix whose values are all zero, it doesn't store any value
+
+    Parameters
+    ----------
+    rows: int
+        Number of rows
+    cols: int
+        Number of columns
+    dtype: Optional[str]
+        The type of the matrix elements, one of the keys of `DTYPES`
+    '''
+    def __init__(self, rows: int, cols: int, dtype: str = 'float64'):
+        self._set_shape(rows, cols, dtype)
+
+    def to_dense(self) -> Matrix:
+        return zero_matrix(self.num_of_rows, self.num_of_cols, self.dtype)
+
+    def is_zero(self) -> bool:
+        return True
+
+    def __mul__(self, A: Matrix) -> Matrix:
+        if not isinstance(A, Matrix):
+            return super().__mul__(A)
+
+        self._check_product(A, left=False)
+        return ZeroMatrix(self.num_of_rows, A.num_of_cols,
+                          result_dtype(self, A))
+
+    def __rmul__(self, value: Union[Number, Matrix]) -> Matrix:
+        if isinstance(value, Matrix):
+            self._check_product(value, left=True)
+            return ZeroMatrix(value.num_of_rows, self.num_of_cols,
+                              result_dtype(value, self))
+
+        if not isinstance(value, Number):
+            raise ValueError('{} is not a number'.format(value))
+
+        return self
+
+    def __add__(self, A: Matrix) -> Matrix:
+        self._check_sum(A)
+        if isinstance(A, StructuredMatrix):
+            return A
+
+        return A.copy()
+
+    __radd__ = __add__
+
+
+class TriangularMatrix(StructuredMatrix):
+    ''' Base class of the square matrices whose values above (lower
+        triangular) or below (upper triangular) the diagonal are zero
+
+    Only the triangle is stored, row after row, and the products skip the
+    zero half of the matrix, which halves their cost.
+
+    Members
+    -------
+    _packed: array
+        The values of the triangle, row after row
+    lower: bool
+        True for lower triangular matrices, False for upper ones
+
+    Parameters
+    ----------
+    A: Union[Matrix, List[List[Number]]]
+        The square matrix, or list of rows, whose triangle is stored; the
+        values outside the triangle are ignored
+    dtype: Optional[str]
+        The type of the matrix elements, one of the keys of `DTYPES`. If
+        `A` is a Matrix its dtype is used.
+
+    Raises
+    ------
+    ValueError
+        If `A` is not square
+    '''
+    lower = False
+
+    def __init__(self, A: Union[Matrix, List[List[Number]]],
+                 dtype: str = 'float64'):
+        if not isinstance(A, Matrix):
+            A = Matrix(A, dtype=dtype)
+        if A.num_of_rows != A.num_of_cols:
+            raise ValueError('A triangular matrix must be square')
+
+        self._set_shape(A.num_of_rows, A.num_of_cols, A.dtype)
+        self._packed = array(typecode(A.dtype))
+        for y in range(self.num_of_rows):
+            first, last = self._row_range(y)
+            self._packed.extend(A._row(y)[first:last])
+
+    @classmethod
+    def _from_packed(cls, packed: array, size: int) -> TriangularMatrix:
+        M = cls.__new__(cls)
+        M._set_shape(size, size, DTYPE_NAMES[packed.typecode])
+        M._packed = packed
+
+        return M
+
+    def _row_range(self, y: int) -> Tuple[int, int]:
+        ''' Return the first and one past the last column stored in row `y` '''
+        return (0, y + 1) if self.lower else (y, self.num_of_cols)
+
+    def _row_start(self, y: int) -> int:
+        ''' Return the position in `_packed` of the first value of row `y` '''
+        if self.lower:
+            return y*(y + 1)//2
+
+        return y*self.num_of_cols - y*(y - 1)//2
+
+    def packed_row(self, y: int) -> array:
+        ''' Return the stored values of row `y` '''
+        first, last = self._row_range(y)
+        start = self._row_start(y)
+
+        return self._packed[start:start + last - first]
+
+    def to_dense(self) -> Matrix:
+        A = zero_matrix(self.num_of_rows, self.num_of_cols, self.dtype)
+        for y in range(self.num_of_rows):
+            first, last = self._row_range(y)
+            A[y][first:last] = self.packed_row(y)
+
+        return A
+
+    def is_zero(self) -> bool:
+        return not any(self._packed)
+
+    def __mul__(self, A: Matrix) -> Matrix:
+        ''' Multiply one matrix to this matrix, skipping the zero triangle
+
+        Parameters
+        ----------
+        A: Matrix
+            The matrix which multiplies this matrix
+
+        Returns
+        -------
+        Matrix
+            The row-column multiplication between this matrix and that passed
+            as parameter, triangular if `A` is triangular of the same kind
+
+        Raises
+        ------
+        ValueError
+            If the number of columns of this matrix is different from the
+            number of rows of `A`
+        '''
+        if not isinstance(A, Matrix):
+            return super().__mul__(A)
+
+        self._check_product(A, left=False)
+        if isinstance(A, (ZeroMatrix, DiagonalMatrix)):
+            return A.__rmul__(self)
+
+        same_kind = isinstance(A, TriangularMatrix) and A.lower == self.lower
+        code = typecode(result_dtype(self, A))
+        packed = array(code)
+        C = None if same_kind else zero_matrix(self.num_of_rows, A.num_of_cols,
+                                               DTYPE_NAMES[code])
+
+        # The i-th row of the result sums the rows of A scaled by the
+        # values stored in the i-th row of this matrix
+        for y in range(self.num_of_rows):
+            first, last = self._row_range(y)
+            if same_kind:
+                c_first, c_last = first, last
+            else:
+                c_first, c_last = 0, A.num_of_cols
+
+            c_row = [0]*(c_last - c_first)
+            for k, value in zip(range(first, last), self.packed_row(y)):
+                if not value:
+                    continue
+                if same_kind:
+                    # Row k of A is stored from column first_k on
+                    first_k, last_k = A._row_range(k)
+                    lo, hi = max(first_k, c_first), min(last_k, c_last)
+                    row = A.packed_row(k)[lo - first_k:hi - first_k]
+                else:
+                    lo, hi, row = 0, c_last, A._row(k)
+                c_row[lo - c_first:hi - c_first] = map(
+                    add, c_row[lo - c_first:hi - c_first],
+                    map(mul, repeat(value), row))
+
+            if same_kind:
+                packed.extend(c_row)
+            else:
+                C[y][:] = array(code, c_row)
+
+        if same_kind:
+            return self._from_packed(packed, self.num_of_rows)
+
+        return C
+
+    def __rmul__(self, value: Union[Number, Matrix]) -> Matrix:
+        ''' Multiply this matrix by a numeric value, or a matrix by this
+            matrix skipping the zero triangle
+
+        Parameters
+        ----------
+        value: Union[Number, Matrix]
+            The numeric value, or the matrix, which multiplies this matrix
+
+        Returns
+        -------
+        Matrix
+            The multiplication between `value` and this matrix, triangular
+            if `value` is a number
+
+        Raises
+        ------
+        ValueError
+            If `value` is neither a number nor a matrix
+        '''
+        if isinstance(value, Matrix):
+            self._check_product(value, left=True)
+            A = value
+            C = zero_matrix(A.num_of_rows, self.num_of_cols,
+                            result_dtype(A, self))
+            code = C._data.typecode
+
+            # Row k of this matrix only contributes to its stored columns
+            rows = [(self._row_range(k), self.packed_row(k))
+                    for k in range(self.num_of_rows)]
+            for y in range(A.num_of_rows):
+                c_row = [0]*self.num_of_cols
+                for a_value, ((first, last), row) in zip(A._row(y), rows):
+                    if a_value:
+                        c_row[first:last] = map(add, c_row[first:last],
+                                                map(mul, repeat(a_value), row))
+                C[y][:] = array(code, c_row)
+
+            return C
+
+        if not isinstance(value, Number):
+            raise ValueError('{} is not a number'.format(value))
+
+        code = self._packed.typecode
+        if code == 'q' and not isinstance(value, int):
+            code = DTYPES['float64']
+
+        return self._from_packed(
+            array(code, map(mul, repeat(value), self._packed)),
+            self.num_of_rows)
+
+    def __add__(self, A: Matrix) -> Matrix:
+        ''' Sum a matrix to this matrix
+
+        Parameters
+        ----------
+        A: Matrix
+            The matrix to be summed up
+
+        Returns
+        -------
+        Matrix
+            The matrix corresponding to the sum between this matrix and
+            that passed as parameter, triangular if `A` is triangular of the
+            same kind
+
+        Raises
+        ------
+        ValueError
+            If the two matrices have different sizes
+        '''
+        if isinstance(A, TriangularMatrix) and A.lower == self.lower:
+            self._check_sum(A)
+            return self._from_packed(
+                array(typecode(result_dtype(self, A)),
+                      map(add, self._packed, A._packed)),
+                self.num_of_rows)
+
+        return super().__add__(A)
+
+
+class UpperTriangularMatrix(TriangularMatrix):
+    ''' A square matrix whose values below the diagonal are zero
+
+    Parameters
+    ----------
+    A: Union[Matrix, List[List[Number]]]
+        The square matrix, or list of rows, whose upper triangle is stored
+    dtype: Optional[str]
+        The type of the matrix elements, one of the keys of `DTYPES`. If
+        `A` is a Matrix its dtype is used.
+    '''
+    lower = False
+
+
+class LowerTriangularMatrix(TriangularMatrix):
+    ''' A square matrix whose values above the diagonal are zero
+
+    Parameters
+    ----------
+    A: Union[Matrix, List[List[Number]]]
+        The square matrix, or list of rows, whose lower triangle is stored
+    dtype: Optional[str]
+        The type of the matrix elements, one of the keys of `DTYPES`. If
+        `A` is a Matrix its dtype is used.
+    '''
+    lower = True
+
+
+class QuadtreeMatrix(object):
+    ''' A matrix stored as a tree of 2x2 blocks
+
+    Every node of the tree is either None, for an all-zero block, a dense
+    `Matrix` leaf of `leaf_size` x `leaf_size` values, or a tuple with the
+    four quadrants (11, 12, 21, 22) of the block. The root covers a square
+    of `side` values, where `side` is `leaf_size` times a power of two; the
+    values outside the matrix are zero and thus not stored.
+
+    Members
+    -------
+    leaf_size: int
+        The size of the leaves
+    side: int
+        The size of the square covered by the root
+    _root: Union[None, Matrix, Tuple]
+        The root of the tree
+    _rows: int
+        The number of rows of the matrix
+    _cols: int
+        The number of columns of the matrix
+    _dtype: str
+        The type of the matrix elements, one of the keys of `DTYPES`
+
+    Parameters
+    ----------
+    A: Matrix
+        The matrix to be stored
+    leaf_size: int
+        The size of the leaves, i.e. the size below which the standard
+        gauss multiplication is used
+    '''
+    def __init__(self, A: Matrix, leaf_size: int = 64):
+        self.leaf_size = leaf_size
+        self.side = leaf_size
+        while self.side < max(A.num_of_rows, A.num_of_cols):
+            self.side *= 2
+
+        self._rows = A.num_of_rows
+        self._cols = A.num_of_cols
+        self._dtype = A.dtype
+        self._root = self._build(A, 0, 0, self.side)
+
+    def _build(self, A: Matrix, from_row: int, from_col: int, side: int):
+        # Blocks entirely outside the matrix are zero
+        if from_row >= A.num_of_rows or from_col >= A.num_of_cols:
+            return None
+
+        if side == self.leaf_size:
+            block = A.view(from_row, min(side, A.num_of_rows - from_row),
+                           from_col, min(side, A.num_of_cols - from_col))
+            if block.is_zero():
+                return None
+
+            leaf = zero_matrix(side, side, A.dtype)
+            leaf.assign_submatrix(0, 0, block)
+            return leaf
+
+        half = side//2
+        node = (self._build(A, from_row, from_col, half),
+                self._build(A, from_row, from_col + half, half),
+                self._build(A, from_row + half, from_col, half),
+                self._build(A, from_row + half, from_col + half, half))
+
+        return None if node == (None, None, None, None) else node
+
+    @classmethod
+    def _from_root(cls, root, side: int, rows: int, cols: int,
+                   leaf_size: int, dtype: str) -> QuadtreeMatrix:
+        M = cls.__new__(cls)
+        M.leaf_size = leaf_size
+        M.side = side
+        M._rows = rows
+        M._cols = cols
+        M._dtype = dtype
+        M._root = root
+
+        # Drop the levels that only hold zero padding
+        while (isinstance(M._root, tuple) and M._root[1:] == (None,)*3 and
+               M.side//2 >= max(rows, cols, leaf_size)):
+            M._root = M._root[0]
+            M.side //= 2
+
+        return M
+
+    def _grow(self, side: int):
+        ''' Return the root of this tree extended to cover `side` values '''
+        root, current = self._root, self.side
+        while current < side:
+            root = None if root is None else (root, None, None, None)
+            current *= 2
+
+        return root
+
+    @property
+    def num_of_rows(self) -> int:
+        return self._rows
+
+    @property
+    def num_of_cols(self) -> int:
+        return self._cols
+
+    @property
+    def dtype(self) -> str:
+        return self._dtype
+
+    def is_zero(self) -> bool:
+        ''' Return True if all the values of the matrix are zero '''
+        return self._root is None
+
+    def to_matrix(self) -> Matrix:
+        ''' Return the dense version of this matrix
+
+        Returns
+        -------
+        Matrix
+            A matrix with the same values of this one
+        '''
+        A = zero_matrix(self._rows, self._cols, self._dtype)
+        self._fill(A, self._root, 0, 0, self.side)
+
+        return A
+
+    def _fill(self, A: Matrix, node, from_row: int, from_col: int,
+              side: int):
+        if (node is None or from_row >= A.num_of_rows or
+                from_col >= A.num_of_cols):
+            return
+
+        if isinstance(node, Matrix):
+            A.assign_submatrix(from_row, from_col, node.view(
+                0, min(side, A.num_of_rows - from_row),
+                0, min(side, A.num_of_cols - from_col)))
+            return
+
+        half = side//2
+        self._fill(A, node[0], from_row, from_col, half)
+        self._fill(A, node[1], from_row, from_col + half, half)
+        self._fill(A, node[2], from_row + half, from_col, half)
+        self._fill(A, node[3], from_row + half, from_col + half, half)
+
+    def _sum(self, A: QuadtreeMatrix, op) -> QuadtreeMatrix:
+        if (self.num_of_cols != A.num_of_cols or
+                self.num_of_rows != A.num_of_rows):
+            raise ValueError('The two matrices have different sizes')
+        if self.leaf_size != A.leaf_size:
+            raise ValueError('The two matrices have different leaf sizes')
+
+        side = max(self.side, A.side)
+        root = _quadtree_sum(self._grow(side), A._grow(side), op)
+
+        return QuadtreeMatrix._from_root(root, side, self._rows, self._cols,
+                                         self.leaf_size,
+                                         result_dtype(self, A))
+
+    def __add__(self, A: QuadtreeMatrix) -> QuadtreeMatrix:
+        ''' Sum a matrix to this matrix
+
+        Parameters
+        ----------
+        A: QuadtreeMatrix
+            The matrix to be summed up
+
+        Returns
+        -------
+        QuadtreeMatrix
+            The matrix corresponding to the sum between this matrix and
+            that passed as parameter
+
+        Raises
+        ------
+        ValueError
+            If the two matrices have different sizes or leaf sizes
+        '''
+        return self._sum(A, add)
+
+    def __sub__(self, A: QuadtreeMatrix) -> QuadtreeMatrix:
+        ''' Subtract a matrix to this matrix
+
+        Parameters
+        ----------
+        A: QuadtreeMatrix
+            The matrix to be subtracted
+
+        Returns
+        -------
+        QuadtreeMatrix
+            The matrix corresponding to the subtraction between this matrix
+            and that passed as parameter
+
+        Raises
+        ------
+        ValueError
+            If the two matrices have different sizes or leaf sizes
+        '''
+        return self._sum(A, sub)
+
+    def __mul__(self, A: QuadtreeMatrix) -> QuadtreeMatrix:
+        ''' Multiply one matrix to this matrix with the Strassen's algorithm
+
+        Parameters
+        ----------
+        A: QuadtreeMatrix
+            The matrix which multiplies this matrix
+
+        Returns
+        -------
+        QuadtreeMatrix
+            The row-column multiplication between this matrix and that passed
+            as parameter
+
+        Raises
+        ------
+        ValueError
+            If the number of columns of this matrix is different from the
+            number of rows of `A`, or if they have different leaf sizes
+        '''
+        return quadtree_strassen_matrix_mult(self, A)
+
+    def __repr__(self):
+        return repr(self.to_matrix())
+
+
+class MortonMatrix(object):
+    ''' A matrix stored in a Z-order (Morton) tiled layout
+
+    The matrix is padded with zeros to a square of `side` values, where
+    `side` is `tile_size` times a power of two, and split in tiles of
+    `tile_size` x `tile_size` values. Each tile is stored row by row, and
+    the tiles are stored in Morton order: the quadrants 11, 12, 21 and 22
+    one after the other, each of them laid out in the same way. Hence any
+    quadrant, at any level, is a contiguous span of the buffer.
+
+    Members
+    -------
+    tile_size: int
+        The size of the tiles
+    side: int
+        The size of the padded square
+    _data: array
+        The buffer storing the values
+    _rows: int
+        The number of rows of the matrix
+    _cols: int
+        The number of columns of the matrix
+
+    Parameters
+    ----------
+    A: Matrix
+        The matrix to be stored
+    tile_size: int
+        The size of the tiles, i.e. the size below which the standard
+        gauss multiplication is used
+    side: Optional[int]
+        The size of the padded square, by default the smallest one which
+        contains `A`
+
+    Raises
+    ------
+    ValueError
+        If `side` is smaller than the sizes of `A` or isn't `tile_size`
+        times a power of two
+    '''
+    def __init__(self, A: Matrix, tile_size: int = 64, side: int = None):
+        if side is None:
+            side = tile_size
+            while side < max(A.num_of_rows, A.num_of_cols):
+                side *= 2
+
+        # The number of tiles per side must be a power of two
+        tiles_per_side = side // tile_size
+        if (side < max(A.num_of_rows, A.num_of_cols) or side % tile_size or
+                tiles_per_side & (tiles_per_side - 1)):
+            raise ValueError('Invalid side for the Morton layout')
+
+        self.tile_size = tile_size
+        self.side = side
+        self._rows = A.num_of_rows
+        self._cols = A.num_of_cols
+        self._data = array(A._data.typecode, [0])*(side*side)
+
+        # Copy the tiles overlapping A, row by row
+        tiles = Matrix.from_buffer(self._data, side*side//tile_size,
+                                   tile_size)
+        for from_row in range(0, A.num_of_rows, tile_size):
+            for from_col in range(0, A.num_of_cols, tile_size):
+                index = _morton_index(from_row//tile_size,
+                                      from_col//tile_size)
+                tiles.assign_submatrix(index*tile_size, 0, A.view(
+                    from_row, min(tile_size, A.num_of_rows - from_row),
+                    from_col, min(tile_size, A.num_of_cols - from_col)))
+
+    @classmethod
+    def _from_buffer(cls, data: array, side: int, rows: int, cols: int,
+                     tile_size: int) -> MortonMatrix:
+        M = cls.__new__(cls)
+        M.tile_size = tile_size
+        M.side = side
+        M._rows = rows
+        M._cols = cols
+        M._data = data
+
+        return M
+
+    def _grow(self, side: int) -> array:
+        ''' Return the buffer of this matrix padded to cover `side` values '''
+        data, current = self._data, self.side
+        while current < side:
+            # The old square is the first quadrant of the new one
+            data = data + array(data.typecode, [0])*(3*current*current)
+            current *= 2
+
+        return data
+
+    @property
+    def num_of_rows(self) -> int:
+        return self._rows
+
+    @property
+    def num_of_cols(self) -> int:
+        return self._cols
+
+    @property
+    def dtype(self) -> str:
+        return DTYPE_NAMES[self._data.typecode]
+
+    def quadrants(self) -> Tuple[memoryview, memoryview, memoryview,
+                                 memoryview]:
+        ''' Return the buffers of the four quadrants of the padded square
+
+        Returns
+        -------
+        Tuple[memoryview, memoryview, memoryview, memoryview]
+            The spans of the buffer storing, in Morton order, the quadrants
+            11, 12, 21 and 22
+        '''
+        n = len(self._data)//4
+        data = memoryview(self._data)
+
+        return data[:n], data[n:2*n], data[2*n:3*n], data[3*n:]
+
+    def to_matrix(self) -> Matrix:
+        ''' Return the row-major version of this matrix
+
+        Returns
+        -------
+        Matrix
+            A matrix with the same values of this one
+        '''
+        A = zero_matrix(self._rows, self._cols, self.dtype)
+        tile_size = self.tile_size
+        tiles = Matrix.from_buffer(self._data,
+                                   self.side*self.side//tile_size, tile_size)
+        for from_row in range(0, self._rows, tile_size):
+            for from_col in range(0, self._cols, tile_size):
+                index = _morton_index(from_row//tile_size,
+                                      from_col//tile_size)
+                A.assign_submatrix(from_row, from_col, tiles.view(
+                    index*tile_size, min(tile_size, self._rows - from_row),
+                    0, min(tile_size, self._cols - from_col)))
+
+        return A
+
+    def __mul__(self, A: MortonMatrix) -> MortonMatrix:
+        ''' Multiply one matrix to this matrix with the Strassen's algorithm
+
+        Parameters
+        ----------
+        A: MortonMatrix
+            The matrix which multiplies this matrix
+
+        Returns
+        -------
+        MortonMatrix
+            The row-column multiplication between this matrix and that passed
+            as parameter
+
+        Raises
+        ------
+        ValueError
+            If the number of columns of this matrix is different from the
+            number of rows of `A`, or if they have different tile sizes
+        '''
+        return morton_strassen_matrix_mult(self, A)
+
+    def __repr__(self):
+        return repr(self.to_matrix())
+
+
+class StrassenWorkspace(object):
+    ''' The scratch buffers used by `workspace_strassen_matrix_mult`
+
+    The recursion depth is fixed by the operand sizes and `min_size`; each
+    level owns one buffer for the sums of `A` quadrants (S), one for the
+    sums of `B` quadrants (T) and one for the products (P). Operands whose
+    sizes aren't multiples of 2^depth are padded into dedicated buffers.
+    The whole workspace takes about a third of the memory of the operands
+    and of the result.
+
+    Members
+    -------
+    shape: Tuple[int, int, int]
+        The rows of `A`, the columns of `A` and the columns of `B`
+    depth: int
+        The number of recursive levels before switching to gauss
+    buffers: List[Tuple[Matrix, Matrix, Matrix]]
+        The S, T and P buffers of each level
+    padded_A: Optional[Matrix]
+        The buffer for the padded `A`, None if it doesn't need padding
+    padded_B: Optional[Matrix]
+        The buffer for the padded `B`, None if it doesn't need padding
+    padded_C: Optional[Matrix]
+        The buffer for the padded result, None if it doesn't need padding
+
+    Parameters
+    ----------
+    rows: int
+        The number of rows of `A`
+    inner: int
+        The number of columns of `A`, i.e. the number of rows of `B`
+    cols: int
+        The number of columns of `B`
+    min_size: int
+        Size below which the standard gauss multiplication is used
+    dtype: str
+        Type of the elements of the buffers, one of the keys of `DTYPES`
+    '''
+    def __init__(self, rows: int, inner: int, cols: int, min_size: int = 64,
+                 dtype: str = 'float64'):
+        self.shape = (rows, inner, cols)
+
+        # Same stopping rule of strassen_matrix_mult, on halved sizes
+        self.depth = 0
+        sizes = self.shape
+        while min(sizes) > 1 and max(sizes) >= min_size:
+            sizes = tuple((size + 1)//2 for size in sizes)
+            self.depth += 1
+
+        step = 2**self.depth
+        padded = tuple(((size + step - 1)//step)*step for size in self.shape)
+        m, k, n = padded
+
+        self.buffers = []
+        for level in range(self.depth):
+            m, k, n = m//2, k//2, n//2
+            self.buffers.append((zero_matrix(m, k, dtype),
+                                 zero_matrix(k, n, dtype),
+                                 zero_matrix(m, n, dtype)))
+
+        self.padded_A = None
+        self.padded_B = None
+        self.padded_C = None
+        if padded[:2] != self.shape[:2]:
+            self.padded_A = zero_matrix(padded[0], padded[1], dtype)
+        if padded[1:] != self.shape[1:]:
+            self.padded_B = zero_matrix(padded[1], padded[2], dtype)
+        if (padded[0], padded[2]) != (rows, cols):
+            self.padded_C = zero_matrix(padded[0], padded[2], dtype)
+
+
+class SparseMatrix(object):
+    ''' A matrix stored in the compressed sparse row (CSR) format
+
+    Members
+    -------
+    values: array
+        The nonzero values, row after row
+    col_indices: array
+        The column of each value in `values`
+    row_pointers: array
+        The position in `values` of the first value of each row, followed
+        by the number of values
+    _cols: int
+        The number of columns of the matrix
+
+    Parameters
+    ----------
+    A: Union[Matrix, List[List[Number]]]
+        The dense matrix, or list of rows, whose nonzero values are stored
+    dtype: Optional[str]
+        The type of the matrix elements, one of the keys of `DTYPES`. If
+        `A` is a Matrix its dtype is used.
+
+    Raises
+    ------
+    ValueError
+        If there are two lists having a different number of values or if
+        `dtype` is not supported
+    '''
+    def __init__(self, A: Union[Matrix, List[List[Number]]],
+                 dtype: str = 'float64'):
+        if not isinstance(A, Matrix):
+            A = Matrix(A, dtype=dtype)
 
-    def __iadd__(self, A: Matrix) -> Matrix:
-        ''' Sum a matrix to this matrix and update it
+        self.values = array(A._data.typecode)
+        self.col_indices = array('q')
+        self.row_pointers = array('q', [0])
+        for row in A:
+            for j, value in enumerate(row):
+                if value:
+                    self.col_indices.append(j)
+                    self.values.append(value)
+            self.row_pointers.append(len(self.values))
+
+        self._cols = A.num_of_cols
+
+    @classmethod
+    def from_csr(cls, values: array, col_indices: array, row_pointers: array,
+                 cols: int) -> SparseMatrix:
+        ''' Build a sparse matrix on top of existing CSR arrays
 
         Parameters
         ----------
-        A: Matrix
-            The matrix to be summed up
+        values: array
+            The nonzero values, row after row
+        col_indices: array
+            The column of each value in `values`
+        row_pointers: array
+            The position in `values` of the first value of each row,
+            followed by the number of values
+        cols: int
+            The number of columns of the matrix
 
         Returns
         -------
-        Matrix
-            The matrix corresponding to the sum between this matrix and
-            that passed as parameter
+        SparseMatrix
+            A sparse matrix sharing its storage with the given arrays
 
         Raises
         ------
         ValueError
-            If the two matrices have different sizes
+            If the arrays are not consistent
         '''
+        if (len(values) != len(col_indices) or len(row_pointers) == 0 or
+                row_pointers[0] != 0 or row_pointers[-1] != len(values)):
+            raise ValueError('This is not a CSR matrix')
 
-        if (self.num_of_cols != A.num_of_cols or
-                self.num_of_rows != A.num_of_rows):
-            raise ValueError('The two matrices have different sizes')
-
-        for y in range(self.num_of_rows):
-            for x in range(self.num_of_cols):
-                self[y][x] += A[y][x]
+        M = cls.__new__(cls)
+        M.values = values
+        M.col_indices = col_indices
+        M.row_pointers = row_pointers
+        M._cols = cols
 
-        return self
+        return M
 
-    def __add__(self, A: Matrix) -> Matrix:
-        ''' Sum a matrix to this matrix
+    @classmethod
+    def identity(cls, size: int, dtype: str = 'float64') -> SparseMatrix:
+        ''' Return the identity matrix of the given size
 
         Parameters
         ----------
-        A: Matrix
-            The matrix to be summed up
+        size: int
+            The size of the identity matrix
+        dtype: Optional[str]
+            The type of the matrix elements, one of the keys of `DTYPES`
+
+        Returns
+        -------
+        SparseMatrix
+            The identity matrix, storing only its diagonal
+        '''
+        return cls.from_csr(array(typecode(dtype), [1])*size,
+                            array('q', range(size)),
+                            array('q', range(size + 1)), size)
+
+    @property
+    def num_of_rows(self) -> int:
+        return len(self.row_pointers) - 1
+
+    @property
+    def num_of_cols(self) -> int:
+        return self._cols
+
+    @property
+    def dtype(self) -> str:
+        return DTYPE_NAMES[self.values.typecode]
+
+    @property
+    def nnz(self) -> int:
+        ''' The number of stored values '''
+        return len(self.values)
+
+    def to_dense(self) -> Matrix:
+        ''' Return the dense version of this matrix
 
         Returns
         -------
         Matrix
-            The matrix corresponding to the sum between this matrix and
-            that passed as parameter
+            A matrix with the same values of this one
+        '''
+        A = zero_matrix(self.num_of_rows, self.num_of_cols, self.dtype)
+        for i in range(self.num_of_rows):
+            row = A[i]
+            for p in range(self.row_pointers[i], self.row_pointers[i + 1]):
+                row[self.col_indices[p]] = self.values[p]
+
+        return A
+
+    def __mul__(self, A: Union[Matrix, SparseMatrix]
+                ) -> Union[Matrix, SparseMatrix]:
+        ''' Multiply one matrix to this matrix
+
+        Parameters
+        ----------
+        A: Union[Matrix, SparseMatrix]
+            The matrix which multiplies this matrix
+
+        Returns
+        -------
+        Union[Matrix, SparseMatrix]
+            The row-column multiplication between this matrix and that passed
+            as parameter, sparse if `A` is sparse
 
         Raises
         ------
         ValueError
-            If the two matrices have different sizes
+            If the number of columns of this matrix is different from the
+            number of rows of `A`
         '''
-        res = self.copy()
+        if isinstance(A, SparseMatrix):
+            return sparse_sparse_mult(self, A)
 
-        res += A
+        return sparse_dense_mult(self, A)
 
-        return res
-
-    def __isub__(self, A: Matrix) -> Matrix:
-        ''' Subtract a matrix to this matrix and update it
+    def __rmul__(self, value: Union[Number, Matrix]
+                 ) -> Union[Matrix, SparseMatrix]:
+        ''' Multiply this matrix by a numeric value or by a dense matrix
+            on its left
 
         Parameters
         ----------
-        A: Matrix
-            The matrix to be subtracted up
+        value: Union[Number, Matrix]
+            The numeric value, or the matrix, which multiplies this matrix
 
         Returns
         -------
-        Matrix
-            The matrix corresponding to the subtraction between this matrix and
-            that passed as parameter
+        Union[Matrix, SparseMatrix]
+            The multiplication between `value` and this matrix, dense if
+            `value` is a matrix
 
         Raises
         ------
         ValueError
-            If the two matrices have different sizes
+            If `value` is neither a number nor a matrix
         '''
+        if isinstance(value, Matrix):
+            return dense_sparse_mult(value, self)
 
-        if (self.num_of_cols != A.num_of_cols or
-                self.num_of_rows != A.num_of_rows):
-            raise ValueError('The two matrices have different sizes')
+        if not isinstance(value, Number):
+            raise ValueError('{} is not a number'.format(value))
 
-        for y in range(self.num_of_rows):
-            for x in range(self.num_of_cols):
-                self[y][x] -= A[y][x]
+        code = self.values.typecode
+        if code == 'q' and not isinstance(value, int):
+            code = DTYPES['float64']
 
-        return self
+        return SparseMatrix.from_csr(
+            array(code, map(mul, repeat(value), self.values)),
+            self.col_indices[:], self.row_pointers[:], self._cols)
 
-    def __sub__(self, A: Matrix) -> Matrix:
-        ''' Subtract a matrix to this matrix
+    def __repr__(self):
+        return repr(self.to_dense())
+
+
+class MappedMatrix(object):
+    ''' A matrix stored in a memory-mapped binary file
+
+    The file starts with a header made of the magic bytes `MTRX`, the
+    typecode of the values (padded to 4 bytes), the number of rows and the
+    number of columns (8 byte integers); the values follow, row by row. Only
+    the pages being read or written are loaded in memory, so the matrix can
+    be larger than the memory; its tiles are copied to and from in-memory
+    matrices by `read_tile` and `write_tile`.
+
+    Members
+    -------
+    path: str
+        The path of the file
+    _file: file
+        The open file
+    _map: mmap.mmap
+        The memory map of the file
+    _values: memoryview
+        The values of the matrix, as a flat memoryview of the map
+
+    Parameters
+    ----------
+    path: str
+        The path of an existing file, see `create`
+    writable: bool
+        If set the file is opened for reading and writing
+
+    Raises
+    ------
+    ValueError
+        If the file is not a matrix file
+    '''
+    _HEADER = struct.Struct('<4s4sqq')
+
+    def __init__(self, path: str, writable: bool = True):
+        self.path = path
+        self._file = open(path, 'r+b' if writable else 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=(
+            mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ))
+
+        if len(self._map) < self._HEADER.size:
+            self.close()
+            raise ValueError('{} is not a matrix file'.format(path))
+        magic, code, rows, cols = self._HEADER.unpack_from(self._map)
+        code = code.rstrip(b'\0').decode()
+        if magic != b'MTRX' or code not in DTYPE_NAMES:
+            self.close()
+            raise ValueError('{} is not a matrix file'.format(path))
+
+        self._rows = rows
+        self._cols = cols
+        self._values = memoryview(self._map)[self._HEADER.size:].cast(code)
+
+    @classmethod
+    def create(cls, path: str, rows: int, cols: int,
+               dtype: str = 'float64') -> MappedMatrix:
+        ''' Create a file storing a matrix filled with zeros, and map it
+
+        Parameters
+        ----------
+        path: str
+            The path of the file, it is overwritten if it exists
+        rows: int
+            The number of rows
+        cols: int
+            The number of columns
+        dtype: str
+            Type of the matrix elements, one of the keys of `DTYPES`
+
+        Returns
+        -------
+        MappedMatrix
+            The mapped matrix
+        '''
+        code = typecode(dtype)
+        with open(path, 'wb') as f:
+            f.write(cls._HEADER.pack(b'MTRX', code.encode(), rows, cols))
+            f.truncate(cls._HEADER.size + rows*cols*array(code).itemsize)
+
+        return cls(path)
+
+    @classmethod
+    def from_matrix(cls, path: str, A: Matrix) -> MappedMatrix:
+        ''' Store a matrix in a file, and map it
 
         Parameters
         ----------
+        path: str
+            The path of the file, it is overwritten if it exists
         A: Matrix
-            The matrix to be subtracted up
+            The matrix to be stored
+
+        Returns
+        -------
+        MappedMatrix
+            The mapped matrix
+        '''
+        M = cls.create(path, A.num_of_rows, A.num_of_cols, A.dtype)
+        M.write_tile(0, 0, A)
+        M.flush()
+
+        return M
+
+    @property
+    def num_of_rows(self) -> int:
+        return self._rows
+
+    @property
+    def num_of_cols(self) -> int:
+        return self._cols
+
+    @property
+    def dtype(self) -> str:
+        return DTYPE_NAMES[self._values.format]
+
+    def _check_tile(self, from_row: int, num_of_rows: int,
+                    from_col: int, num_of_cols: int):
+        if (min(from_row, num_of_rows, from_col, num_of_cols) < 0 or
+                from_row + num_of_rows > self._rows or
+                from_col + num_of_cols > self._cols):
+            raise ValueError('The tile exceeds the matrix boundaries')
+
+    def read_tile(self, from_row: int, num_of_rows: int, from_col: int,
+                  num_of_cols: int, out: Matrix = None) -> Matrix:
+        ''' Copy a submatrix in memory
+
+        Parameters
+        ----------
+        from_row: int
+            The first row of the tile
+        num_of_rows: int
+            The number of rows of the tile
+        from_col: int
+            The first col of the tile
+        num_of_cols: int
+            The number of cols of the tile
+        out: Optional[Matrix]
+            A matrix, or a view, where the tile is copied. If it is not
+            given a new matrix is allocated.
 
         Returns
         -------
         Matrix
-            The matrix corresponding to the subtraction between this matrix and
-            that passed as parameter
+            The values of the tile
 
         Raises
         ------
         ValueError
-            If the two matrices have different sizes
+            If the tile exceeds the matrix boundaries or if `out` has the
+            wrong shape
         '''
-        res = self.copy()
+        self._check_tile(from_row, num_of_rows, from_col, num_of_cols)
+        C = check_output(out, num_of_rows, num_of_cols, self.dtype)
 
-        res -= A
+        same_type = C._data.typecode == self._values.format
+        for y in range(num_of_rows):
+            start = (from_row + y)*self._cols + from_col
+            row = self._values[start:start + num_of_cols]
+            if not same_type:
+                row = array(C._data.typecode, row)
+            start = C._offset + y*C._stride
+            C._view[start:start + num_of_cols] = row
 
-        return res
+        return C
 
-    def __mul__(self, A: Matrix) -> Matrix:
-        ''' Multiply one matrix to this matrix
+    def write_tile(self, from_row: int, from_col: int, A: Matrix):
+        ''' Copy a matrix in a submatrix of this one
 
         Parameters
         ----------
+        from_row: int
+            The first row where `A` is copied
+        from_col: int
+            The first col where `A` is copied
         A: Matrix
-            The matrix which multiplies this matrix
-
-        Returns
-        -------
-        Matrix
-            The row-column multiplication between this matrix and that passed
-            as parameter
+            The values to be copied
 
         Raises
         ------
         ValueError
-            If the number of columns of this matrix is different from the
-            number of rows of `A`
+            If `A` exceeds the boundaries of this matrix
         '''
-        return gauss_matrix_mult(self, A)
+        self._check_tile(from_row, A.num_of_rows, from_col, A.num_of_cols)
+
+        same_type = A._data.typecode == self._values.format
+        for y in range(A.num_of_rows):
+            start = (from_row + y)*self._cols + from_col
+            row = A._row(y)
+            if not same_type:
+                row = array(self._values.format, row)
+            self._values[start:start + A.num_of_cols] = row
+
+    def __iter__(self) -> Iterator[array]:
+        ''' Iterate over the rows of the matrix, copied in memory one at a
+            time
+        '''
+        for y in range(self._rows):
+            start = y*self._cols
+            yield array(self._values.format,
+                        self._values[start:start + self._cols])
+
+    def to_matrix(self) -> Matrix:
+        ''' Return the whole matrix, copied in memory
+
+        Returns
+        -------
+        Matrix
+            A matrix with the same values of this one
+        '''
+        return self.read_tile(0, self._rows, 0, self._cols)
+
+    def flush(self):
+        ''' Write the changes to the file '''
+        self._map.flush()
+
+    def close(self):
+        ''' Unmap the matrix and close its file '''
+        if getattr(self, '_values', None) is not None:
+            self._values.release()
+            self._values = None
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> MappedMatrix:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return 'MappedMatrix({!r}, {}x{}, {})'.format(
+            self.path, self._rows, self._cols, self.dtype)
 
-    def __rmul__(self, value: Number) -> Matrix:
-        ''' Multiply one matrix by a numeric value
+
+class MatrixBatch(object):
+    ''' A batch of matrices of the same shape, stored one after the other
+        in a single buffer
+
+    Members
+    -------
+    data: array
+        The values of the matrices, each stored row by row
+
+    Parameters
+    ----------
+    data: array
+        The buffer storing the values, it is used without copying it
+    count: int
+        The number of matrices
+    rows: int
+        The number of rows of each matrix
+    cols: int
+        The number of columns of each matrix
+
+    Raises
+    ------
+    ValueError
+        If the buffer size doesn't match the requested shape
+    '''
+    def __init__(self, data: array, count: int, rows: int, cols: int):
+        if len(data) != count*rows*cols:
+            raise ValueError('The buffer size does not match the shape')
+
+        self.data = data
+        self._count = count
+        self._rows = rows
+        self._cols = cols
+
+    @classmethod
+    def from_matrices(cls, matrices: Iterable[Matrix],
+                      dtype: str = 'float64') -> MatrixBatch:
+        ''' Stack matrices of the same shape in a batch
 
         Parameters
         ----------
-        value: Number
-            The numeric value which multiplies this matrix
+        matrices: Iterable[Matrix]
+            The matrices, at least one
+        dtype: str
+            Type of the elements of the batch, one of the keys of `DTYPES`
 
         Returns
         -------
-        Matrix
-            The multiplication between `value` and this matrix
+        MatrixBatch
+            A batch with a copy of the matrices
 
         Raises
         ------
         ValueError
-            If `value` is not a number
+            If the matrices have different shapes or there are none
         '''
+        data = array(typecode(dtype))
+        count, shape = 0, None
+        for A in matrices:
+            if shape is None:
+                shape = (A.num_of_rows, A.num_of_cols)
+            elif shape != (A.num_of_rows, A.num_of_cols):
+                raise ValueError('The matrices have different sizes')
 
-        if not isinstance(value, Number):
-            raise ValueError('{} is not a number'.format(value))
+            for span in A._row_slices():
+                data.extend(A._view[span])
+            count += 1
 
-        return Matrix([[value*elem for elem in row] for row in self._A],
-                      clone_matrix=False)
+        if shape is None:
+            raise ValueError('The batch is empty')
 
-    def submatrix(self, from_row: int, num_of_rows: int,
-                  from_col: int, num_of_cols: int) -> Matrix:
-        ''' Return a submatrix of this matrix
+        return cls(data, count, *shape)
+
+    @property
+    def num_of_rows(self) -> int:
+        return self._rows
+
+    @property
+    def num_of_cols(self) -> int:
+        return self._cols
+
+    @property
+    def dtype(self) -> str:
+        return DTYPE_NAMES[self.data.typecode]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> Matrix:
+        ''' Return one of the matrices
 
         Parameters
         ----------
-        from_row: int
-            The first row to be included in the submatrix to be returned
-        num_of_rows: int
-            The number of rows to be included in the submatrix to be returned
-        from_col: int
-            The first col to be included in the submatrix to be returned
-        num_of_cols: int
-            The number of cols to be included in the submatrix to be returned
+        i: int
+            The index of the matrix to be returned
 
         Returns
         -------
         Matrix
-            A submatrix of this matrix
+            The `i`-th matrix of the batch, sharing the storage of the batch
         '''
-        A = [row[from_col:from_col+num_of_cols]
-             for row in self._A[from_row:from_row+num_of_rows]]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError('Matrix index out of range')
 
-        return Matrix(A, clone_matrix=False)
+        M = Matrix.__new__(Matrix)
+        size = self._rows*self._cols
+        M._set_buffer(self.data, self._rows, self._cols, i*size)
 
-    def assign_submatrix(self, from_row: int, from_col: int, A: Matrix):
-        for y, row in enumerate(A):
-            self_row = self[y + from_row]
-            for x, value in enumerate(row):
-                self_row[x + from_col] = value
+        return M
+
+    def __iter__(self) -> Iterator[Matrix]:
+        for i in range(self._count):
+            yield self[i]
 
     def __repr__(self):
-        return '\n'.join('{}'.format(row) for row in self._A)
+        return 'MatrixBatch({} x {}x{}, {})'.format(
+            self._count, self._rows, self._cols, self.dtype)
 
 
-class IdentityMatrix(Matrix):
-    ''' A class for identity matrices
+class PreparedMatrix(object):
+    ''' A matrix whose operands of the Strassen's algorithm are
+        precomputed, to multiply it by many matrices
+
+    At each level of the recursion the seven operands taken from the
+    quadrants of the left matrix (e.g. A11 + A22) are computed once and
+    kept in a tree, down to the leaves where gauss is used; multiplying by
+    a matrix `B` only computes the sums of the quadrants of `B`, the
+    products and the combine steps. All-zero operands are stored as None
+    and their products are skipped. The depth of the tree depends only on
+    the size of `A`, and the tree takes about (7/4)^depth times the memory
+    of `A`. The tree is built from a copy of `A`, so later updates of `A`
+    don't change the prepared matrix.
+
+    Members
+    -------
+    min_size: int
+        Size below which the standard gauss multiplication is used
+    _root: Union[Matrix, Tuple[int, int, List], None]
+        The tree of the operands: a leaf is a matrix (or None if it is
+        all-zero), an inner node is made of the unpadded size of its
+        matrix and of the subtrees of its seven operands
 
     Parameters
     ----------
-    size: int
-        The size of the identity matrix
+    A: Matrix
+        The first matrix of the products
+    min_size: int
+        Size below which the standard gauss multiplication is used
     '''
-    def __init__(self, size: int):
-        A = [[1 if x == y else 0 for x in range(size)]
-             for y in range(size)]
+    def __init__(self, A: Matrix, min_size: int = 64):
+        self.min_size = min_size
+        self._rows = A.num_of_rows
+        self._cols = A.num_of_cols
+        self._dtype = A.dtype
+        self._root = self._build(self._operand(A.copy()))
+
+    @staticmethod
+    def _operand(X: Matrix) -> Matrix:
+        ''' Return the operand `X` evaluated, or None if it is all-zero '''
+        if isinstance(X, MatrixExpression):
+            X = X.evaluate()
+
+        return None if X is None or X.is_zero() else X
+
+    def _build(self, A: Matrix):
+        if A is None or max(A.num_of_rows, A.num_of_cols) < self.min_size:
+            return A
+
+        rows, inner = A.num_of_rows, A.num_of_cols
+        A = pad_matrix(A, rows % 2, inner % 2)
+        A11, A12, A21, A22 = map(self._operand, get_matrix_quadrants(A))
+
+        # The factors of A in the products of `_strassen_operands`
+        operands = [A11, _zero_aware_sum(A11, A12, add),
+                    _zero_aware_sum(A21, A22, add), A22,
+                    _zero_aware_sum(A11, A22, add),
+                    _zero_aware_sum(A12, A22, sub),
+                    _zero_aware_sum(A11, A21, sub)]
+
+        return rows, inner, [self._build(self._operand(X)) for X in operands]
 
-        super().__init__(A)
\ No newline at end of file
+    @property
+    def num_of_rows(self) -> int:
+        return self._rows
+
+    @property
+    def num_of_cols(self) -> int:
+        return self._cols
+
+    @property
+    def dtype(self) -> str:
+        return self._dtype
+
+    def multiply(self, B: Matrix) -> Matrix:
+        ''' Multiply the prepared matrix by a matrix
+
+        Parameters
+        ----------
+        B: Matrix
+            The matrix which multiplies the prepared matrix
+
+        Returns
+        -------
+        Matrix
+            The row-column multiplication between the prepared matrix and
+            `B`
+
+        Raises
+        ------
+        ValueError
+            If the number of columns of the prepared matrix is different
+            from the number of rows of `B`
+        '''
+        if self._cols != B.num_of_rows:
+            raise ValueError("The two matrices can't be multiplied")
+
+        C = self._multiply(self._root, None if B.is_zero() else B)
+        if C is None:
+            return zero_matrix(self._rows, B.num_of_cols,
+                               result_dtype(self, B))
+
+        return C
+
+    __mul__ = multiply
+
+    def _multiply(self, node, B: Matrix) -> Matrix:
+        ''' Return the product of the matrix of `node` and `B`, None if it
+            is all-zero
+        '''
+        if node is None or B is None:
+            return None
+        if isinstance(node, Matrix):
+            return strassen_matrix_mult(node, B, self.min_size)
+
+        rows, inner, children = node
+        padded_rows, padded_cols = rows % 2, B.num_of_cols % 2
+        B = pad_matrix(B, inner % 2, padded_cols)
+        B11, B12, B21, B22 = (None if X.is_zero() else X
+                              for X in get_matrix_quadrants(B))
+
+        # The factors of B in the products of `_strassen_operands`
+        operands = [_zero_aware_sum(B12, B22, sub), B22, B11,
+                    _zero_aware_sum(B21, B11, sub),
+                    _zero_aware_sum(B11, B22, add),
+                    _zero_aware_sum(B21, B22, add),
+                    _zero_aware_sum(B11, B12, add)]
+
+        P = [self._multiply(X, Y) for X, Y in zip(children, operands)]
+        if all(product is None for product in P):
+            return None
+
+        layout = (rows + padded_rows, B.num_of_cols, padded_rows, padded_cols,
+                  result_dtype(self, B), None)
+
+        return _strassen_combine(P, layout)
+
+    def __repr__(self):
+        return 'PreparedMatrix({}x{}, {})'.format(self._rows, self._cols,
+                                                  self._dtype)
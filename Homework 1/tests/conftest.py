@@ -0,0 +1,36 @@
+import os
+import random
+import sys
+
+# The tests import matrix.py from the parent folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matrix import Matrix  # noqa: E402
+
+
+def random_matrix(rows, cols, dtype='float64'):
+    ''' Return a matrix of random values drawn from the `random` module
+
+    Integer matrices hold small values, so that their products are exact
+    '''
+    if dtype == 'int64':
+        return Matrix([[random.randint(-5, 5) for _ in range(cols)]
+                       for _ in range(rows)], dtype=dtype)
+
+    return Matrix([[random.random() for _ in range(cols)]
+                   for _ in range(rows)], dtype=dtype)
+
+
+def assert_close(C, expected, tolerance=None):
+    ''' Assert that two matrices have the same shape, dtype and values
+
+    The default tolerance is relative and depends on the dtype of `C`
+    '''
+    assert C.dtype == expected.dtype
+    assert (C.num_of_rows, C.num_of_cols) == (expected.num_of_rows,
+                                              expected.num_of_cols)
+    if tolerance is None:
+        tolerance = 1e-4 if C.dtype == 'float32' else 1e-9
+    for c, e in zip(C, expected):
+        for x, y in zip(c, e):
+            assert abs(x - y) <= tolerance*max(1, abs(y))
@@ -0,0 +1,67 @@
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from conftest import assert_close, random_matrix
+
+from matrix import MatrixBatch, batch_matmul, gauss_matrix_mult
+
+
+def random_batch(count, rows, cols, dtype='float64'):
+    matrices = [random_matrix(rows, cols, dtype) for _ in range(count)]
+
+    return matrices, MatrixBatch.from_matrices(matrices, dtype)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+@pytest.mark.parametrize('dtype', ['float64', 'int64'])
+@pytest.mark.parametrize('shape', [(1, 1, 1), (4, 4, 4), (3, 7, 2)])
+def test_batch_matmul(shape, dtype, workers):
+    random.seed(sum(shape))
+    m, k, n = shape
+    As, BA = random_batch(9, m, k, dtype)
+    Bs, BB = random_batch(9, k, n, dtype)
+    C = batch_matmul(BA, BB, workers=workers)
+
+    assert len(C) == 9 and C.dtype == dtype
+    for X, Y, Z in zip(As, Bs, C):
+        assert_close(Z, gauss_matrix_mult(X, Y))
+
+
+def test_broadcasting():
+    random.seed(1)
+    As, BA = random_batch(6, 3, 4)
+    Bs, BB = random_batch(6, 4, 2)
+    _, A1 = random_batch(1, 3, 4)
+    _, B1 = random_batch(1, 4, 2)
+
+    for X, Z in zip(As, batch_matmul(BA, B1)):
+        assert_close(Z, gauss_matrix_mult(X, B1[0]))
+    for Y, Z in zip(Bs, batch_matmul(A1, BB, workers=2)):
+        assert_close(Z, gauss_matrix_mult(A1[0], Y))
+
+
+def test_out_and_executor():
+    random.seed(2)
+    _, BA = random_batch(5, 3, 3, 'int64')
+    _, BB = random_batch(5, 3, 3)
+    out = MatrixBatch(array('d', [0])*45, 5, 3, 3)
+
+    with ProcessPoolExecutor(2) as executor:
+        C = batch_matmul(BA, BB, out=out, executor=executor)
+
+    assert C is out
+    for i in range(5):
+        assert_close(out[i], gauss_matrix_mult(BA[i], BB[i]))
+
+
+def test_wrong_sizes():
+    _, BA = random_batch(3, 2, 3)
+    _, BB = random_batch(3, 2, 3)
+    _, BC = random_batch(2, 3, 2)
+
+    with pytest.raises(ValueError):
+        batch_matmul(BA, BB)
+    with pytest.raises(ValueError):
+        batch_matmul(BA, BC)
@@ -0,0 +1,142 @@
+import pytest
+
+import matrix
+from matrix import Matrix, gauss_matrix_mult, gemm, np, strassen_matrix_mult
+
+
+def values(A):
+    return [list(row) for row in A]
+
+
+def sample():
+    return Matrix([[1, 2, 3], [4, 5, 6], [7, 8, 9]])
+
+
+def test_copy_shares_storage_until_written():
+    A = sample()
+    C = A.copy()
+    assert C._data is A._data
+
+    gauss_matrix_mult(C, C)
+    strassen_matrix_mult(C, C, 2)
+    assert C._data is A._data
+
+    C += A
+    assert C._data is not A._data
+    assert values(A) == values(sample())
+    assert values(C) == [[2*x for x in row] for row in values(sample())]
+
+
+@pytest.mark.parametrize('write', [
+    lambda M: M.fill(0),
+    lambda M: M.scale(2),
+    lambda M: M.assign_submatrix(1, 1, [[0, 0], [0, 0]]),
+    lambda M: M.view(0, 2, 0, 2).fill(7),
+    lambda M: M[0].__setitem__(0, 0),
+    lambda M: gemm(1, sample(), sample(), 0, M),
+])
+def test_writes_to_either_side_detach_the_copy(write):
+    A = sample()
+    C = A.copy()
+    write(A)
+    assert values(C) == values(sample())
+
+    A = sample()
+    C = A.copy()
+    write(C)
+    assert values(A) == values(sample())
+
+
+def test_copy_of_view():
+    P = sample()
+    C = P.view(1, 2, 1, 2).copy()
+    P.fill(0)
+
+    assert values(C) == [[5, 6], [8, 9]]
+
+
+def test_views_of_copy_follow_it():
+    A = sample()
+    C = A.copy()
+    V = C.view(1, 2, 1, 2)
+    A.fill(0)
+    V.fill(3)
+
+    assert values(C) == [[1, 2, 3], [4, 3, 3], [7, 3, 3]]
+    assert values(A) == [[0, 0, 0]]*3
+
+
+def test_row_taken_before_copy():
+    A = sample()
+    row = A[0]
+    C = A.copy()
+    row[0] = 42
+
+    assert A[0][0] == 42
+    assert values(C) == values(sample())
+
+
+def test_row_of_view_taken_before_copy():
+    A = sample()
+    row = A.view(1, 1, 0, 3)[0]
+    C = A.copy()
+    row[2] = 42
+
+    assert A[1][2] == 42
+    assert values(C) == values(sample())
+
+
+def test_copy_is_shared_again_once_rows_are_released():
+    A = sample()
+    A[0][0] = 5
+    C = A.copy()
+
+    assert C._data is A._data
+
+
+@pytest.mark.skipif(np is None, reason='numpy is not installed')
+def test_array_taken_before_copy():
+    A = sample()
+    a = A.to_numpy()
+    C = A.copy()
+    a[1, 1] = 42
+
+    assert A[1][1] == 42
+    assert values(C) == values(sample())
+
+
+def test_value_reads_do_not_clone():
+    A = sample()
+    C = A.copy()
+
+    assert [C[y, x] for y in range(3) for x in range(3)] == list(range(1, 10))
+    assert C[-1, -2] == 8 and C.view(1, 2, 1, 2)[1, 0] == 8
+    assert C._data is A._data and not matrix._exported_views.get(id(A._data))
+
+
+def test_value_writes_detach_the_copy():
+    A = sample()
+    C = A.copy()
+    C[1, 2] = 42
+    A[0, 0] = -1
+
+    assert values(C) == [[1, 2, 3], [4, 5, 42], [7, 8, 9]]
+    assert values(A) == [[-1, 2, 3], [4, 5, 6], [7, 8, 9]]
+
+
+@pytest.mark.parametrize('index', [(3, 0), (0, 3), (-4, 0), (0, -4)])
+def test_value_out_of_range(index):
+    A = sample()
+    with pytest.raises(IndexError):
+        A[index]
+    with pytest.raises(IndexError):
+        A[index] = 0
+
+
+def test_rows_are_memoryviews():
+    A = sample()
+    row = A[1]
+
+    assert isinstance(row, memoryview) and row.tolist() == [4, 5, 6]
+    with pytest.raises(TypeError):
+        A[1] = [0, 0, 0]
@@ -0,0 +1,284 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from conftest import assert_close, random_matrix
+
+from matrix import (Matrix, StrassenWorkspace, better_strassen_matrix_mult,
+                    gauss_matrix_mult, matmul, np, numpy_strassen_matrix_mult,
+                    parallel_strassen_matrix_mult,
+                    peeling_strassen_matrix_mult, rectangular_matrix_mult,
+                    recursive_matrix_mult, strassen_matrix_mult,
+                    winograd_strassen_matrix_mult,
+                    workspace_strassen_matrix_mult, zero_matrix)
+
+
+ENGINES = {
+    'gauss_ikj': lambda A, B: gauss_matrix_mult(A, B, block_size=3,
+                                                transpose_b=False),
+    'strassen': lambda A, B: strassen_matrix_mult(A, B, 4),
+    'better_strassen': lambda A, B: better_strassen_matrix_mult(A, B, 4),
+    'peeling': lambda A, B: peeling_strassen_matrix_mult(A, B, 4),
+    'rectangular': lambda A, B: rectangular_matrix_mult(A, B, 4),
+    'recursive': lambda A, B: recursive_matrix_mult(A, B, 4),
+    'winograd': lambda A, B: winograd_strassen_matrix_mult(A, B, 4),
+    'workspace': lambda A, B: workspace_strassen_matrix_mult(A, B, 4),
+    'matmul': matmul,
+}
+if np is not None:
+    ENGINES['numpy'] = lambda A, B: numpy_strassen_matrix_mult(A, B, 4)
+
+SHAPES = [(1, 1, 1), (7, 7, 7), (16, 16, 16), (13, 5, 9), (3, 20, 2),
+          (20, 3, 17)]
+
+OUT_ENGINES = [gauss_matrix_mult, strassen_matrix_mult,
+               better_strassen_matrix_mult, peeling_strassen_matrix_mult,
+               rectangular_matrix_mult, recursive_matrix_mult,
+               workspace_strassen_matrix_mult]
+if np is not None:
+    OUT_ENGINES.append(numpy_strassen_matrix_mult)
+
+
+@pytest.mark.parametrize('dtype', ['float64', 'float32', 'int64'])
+@pytest.mark.parametrize('shape', SHAPES)
+@pytest.mark.parametrize('engine', ENGINES)
+def test_engine(engine, shape, dtype):
+    random.seed(sum(shape))
+    rows, inner, cols = shape
+    A, B = random_matrix(rows, inner, dtype), random_matrix(inner, cols, dtype)
+
+    assert_close(ENGINES[engine](A, B), gauss_matrix_mult(A, B))
+
+
+@pytest.mark.parametrize('dtype', ['float64', 'int64'])
+def test_winograd_down_to_single_values(dtype):
+    random.seed(7)
+    A, B = random_matrix(9, 10, dtype), random_matrix(10, 11, dtype)
+
+    assert_close(winograd_strassen_matrix_mult(A, B, 2),
+                 gauss_matrix_mult(A, B))
+
+
+@pytest.mark.parametrize('dtype', ['float64', 'int64'])
+@pytest.mark.parametrize('shape', [(9, 9, 9), (15, 7, 11), (2, 33, 5)])
+def test_peeling_odd_sizes_at_every_level(shape, dtype):
+    random.seed(sum(shape))
+    rows, inner, cols = shape
+    A, B = random_matrix(rows, inner, dtype), random_matrix(inner, cols, dtype)
+
+    assert_close(peeling_strassen_matrix_mult(A, B, 2),
+                 gauss_matrix_mult(A, B))
+
+
+@pytest.mark.parametrize('max_aspect', [1., 2., 8.])
+@pytest.mark.parametrize('dtype', ['float64', 'int64'])
+@pytest.mark.parametrize('shape', [(64, 3, 5), (2, 70, 3), (4, 5, 80),
+                                   (33, 9, 40)])
+def test_rectangular_tall_and_skinny(shape, dtype, max_aspect):
+    random.seed(sum(shape))
+    rows, inner, cols = shape
+    A, B = random_matrix(rows, inner, dtype), random_matrix(inner, cols, dtype)
+    C = rectangular_matrix_mult(A, B, 2, max_aspect=max_aspect)
+
+    assert_close(C, gauss_matrix_mult(A, B))
+
+
+@pytest.mark.parametrize('dtype', ['float64', 'int64'])
+@pytest.mark.parametrize('shape', [(9, 9, 9), (15, 7, 11), (2, 33, 5)])
+def test_recursive_accumulates_in_place(shape, dtype):
+    random.seed(sum(shape))
+    rows, inner, cols = shape
+    A, B = random_matrix(rows, inner, dtype), random_matrix(inner, cols, dtype)
+    C = random_matrix(rows, cols, dtype)
+    expected = gauss_matrix_mult(A, B) + C
+
+    assert recursive_matrix_mult(A, B, 2, out=C, accumulate=True) is C
+    assert_close(C, expected)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_mixed_dtypes(engine):
+    random.seed(1)
+    A, B = random_matrix(9, 6, 'int64'), random_matrix(6, 5, 'float32')
+    C = ENGINES[engine](A, B)
+
+    # The sums of the quadrants of B may be computed in float32
+    assert C.dtype == 'float64'
+    assert_close(C, gauss_matrix_mult(A, B), 1e-5)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_views(engine):
+    random.seed(2)
+    P, Q = random_matrix(20, 20), random_matrix(20, 20)
+    A, B = P.view(3, 11, 2, 9), Q.view(5, 9, 1, 13)
+
+    assert_close(ENGINES[engine](A, B), gauss_matrix_mult(A, B))
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_wrong_sizes(engine):
+    with pytest.raises(ValueError):
+        ENGINES[engine](random_matrix(4, 5), random_matrix(4, 5))
+
+
+@pytest.mark.parametrize('multiply', OUT_ENGINES)
+def test_out(multiply):
+    random.seed(3)
+    A, B = random_matrix(11, 7), random_matrix(7, 10)
+    P = random_matrix(15, 15)
+    out = P.view(2, 11, 3, 10)
+    before = [list(row) for row in P]
+
+    kwargs = {} if multiply is gauss_matrix_mult else {'min_size': 4}
+    C = multiply(A, B, out=out, **kwargs)
+
+    assert C is out
+    assert_close(out, gauss_matrix_mult(A, B))
+    for y, row in enumerate(P):
+        for x, value in enumerate(row):
+            if not (2 <= y < 13 and 3 <= x < 13):
+                assert value == before[y][x]
+
+
+@pytest.mark.parametrize('multiply', OUT_ENGINES)
+def test_out_wrong_shape(multiply):
+    with pytest.raises(ValueError):
+        multiply(random_matrix(4, 4), random_matrix(4, 4),
+                 out=zero_matrix(4, 5))
+
+
+@pytest.mark.parametrize('multiply', [gauss_matrix_mult, strassen_matrix_mult,
+                                      better_strassen_matrix_mult])
+@pytest.mark.parametrize('dtype', ['int64', 'float64'])
+def test_scaled_product(multiply, dtype):
+    random.seed(6)
+    A, B = random_matrix(9, 6, dtype), random_matrix(6, 7, dtype)
+    out = random_matrix(9, 7, dtype)
+    P = gauss_matrix_mult(A, B)
+    scaled = Matrix([[3*p for p in row] for row in P], dtype=dtype)
+    expected = Matrix([[3*p - 2*c for p, c in zip(p_row, c_row)]
+                       for p_row, c_row in zip(P, out)], dtype=dtype)
+
+    kwargs = {} if multiply is gauss_matrix_mult else {'min_size': 4}
+    assert_close(multiply(A, B, alpha=3, **kwargs), scaled)
+    assert_close(multiply(A, B, out=out, alpha=3, beta=-2, **kwargs), expected)
+
+
+@pytest.mark.parametrize('multiply', [gauss_matrix_mult, strassen_matrix_mult,
+                                      better_strassen_matrix_mult])
+@pytest.mark.parametrize('scalars', [{'alpha': 0.5}, {'alpha': '2'},
+                                     {'beta': 0.5}, {'beta': None}])
+def test_invalid_scalars(multiply, scalars):
+    A = Matrix([[1, 2], [3, 4]], dtype='int64')
+    out = Matrix([[1, 1], [1, 1]], dtype='int64')
+
+    kwargs = {} if multiply is gauss_matrix_mult else {'min_size': 2}
+    with pytest.raises(ValueError):
+        multiply(A, A, out=out, **scalars, **kwargs)
+    assert [list(row) for row in out] == [[1, 1], [1, 1]]
+    if 'alpha' in scalars:
+        with pytest.raises(ValueError):
+            multiply(A, A, **scalars, **kwargs)
+
+
+@pytest.mark.parametrize('multiply', [gauss_matrix_mult, strassen_matrix_mult,
+                                      better_strassen_matrix_mult])
+def test_float_output_of_integer_operands(multiply):
+    A = Matrix([[1, 2], [3, 4]], dtype='int64')
+
+    kwargs = {} if multiply is gauss_matrix_mult else {'min_size': 2}
+    C = multiply(A, A, out=zero_matrix(2, 2), alpha=0.5, **kwargs)
+
+    assert [list(row) for row in C] == [[3.5, 5], [7.5, 11]]
+
+
+def test_workspace_reuse():
+    random.seed(5)
+    workspace = StrassenWorkspace(12, 12, 12, min_size=4)
+    for _ in range(2):
+        A, B = random_matrix(12, 12), random_matrix(12, 12)
+        C = workspace_strassen_matrix_mult(A, B, 4, workspace=workspace)
+        assert_close(C, gauss_matrix_mult(A, B))
+
+    with pytest.raises(ValueError):
+        workspace_strassen_matrix_mult(random_matrix(8, 8),
+                                       random_matrix(8, 8), 4,
+                                       workspace=workspace)
+
+
+@pytest.mark.parametrize('dtype', ['float64', 'float32', 'int64'])
+@pytest.mark.parametrize('parallel_depth', [1, 2])
+def test_parallel(parallel_depth, dtype):
+    random.seed(6)
+    A, B = random_matrix(21, 18, dtype), random_matrix(18, 19, dtype)
+
+    C = parallel_strassen_matrix_mult(A, B, min_size=4, workers=2,
+                                      parallel_depth=parallel_depth)
+    assert_close(C, gauss_matrix_mult(A, B))
+
+
+def test_parallel_executor():
+    random.seed(7)
+    with ProcessPoolExecutor(2) as executor:
+        for shape in [(1, 1, 1), (13, 5, 9), (16, 16, 16)]:
+            rows, inner, cols = shape
+            A, B = random_matrix(rows, inner), random_matrix(inner, cols)
+            C = parallel_strassen_matrix_mult(A, B, min_size=4,
+                                              executor=executor)
+            assert_close(C, gauss_matrix_mult(A, B))
+
+    with pytest.raises(ValueError):
+        parallel_strassen_matrix_mult(random_matrix(4, 5),
+                                      random_matrix(4, 5), workers=1)
+
+
+@pytest.mark.parametrize('multiply', [strassen_matrix_mult,
+                                      parallel_strassen_matrix_mult])
+def test_block_diagonal_operands(multiply):
+    random.seed(4)
+    A, B = zero_matrix(32, 32), zero_matrix(32, 32)
+    A.assign_submatrix(0, 0, random_matrix(16, 16))
+    A.assign_submatrix(16, 16, random_matrix(16, 16))
+    B.assign_submatrix(0, 0, random_matrix(16, 16))
+    B.assign_submatrix(16, 16, random_matrix(16, 16))
+
+    assert_close(multiply(A, B, 4), gauss_matrix_mult(A, B))
+    assert multiply(A, zero_matrix(32, 8), 4).is_zero()
+
+
+@pytest.mark.parametrize('dtype', ['float64', 'int64'])
+@pytest.mark.parametrize('shape', [(13, 9, 11), (20, 20, 20)])
+def test_zero_rows_and_columns(shape, dtype):
+    random.seed(sum(shape))
+    rows, inner, cols = shape
+    A, B = random_matrix(rows, inner, dtype), random_matrix(inner, cols, dtype)
+    # A zero bottom half of A and a zero right half of B skip some products
+    A.assign_submatrix(rows//2, 0, zero_matrix(rows - rows//2, inner, dtype))
+    B.assign_submatrix(0, cols//2, zero_matrix(inner, cols - cols//2, dtype))
+
+    assert_close(strassen_matrix_mult(A, B, 2), gauss_matrix_mult(A, B))
+
+
+@pytest.mark.skipif(np is None, reason='numpy is not installed')
+@pytest.mark.parametrize('dtype', ['float64', 'float32', 'int64'])
+def test_numpy_arrays_share_storage(dtype):
+    random.seed(13)
+    P = random_matrix(9, 8, dtype)
+    V = P.view(2, 5, 1, 6)
+    a = V.to_numpy()
+
+    assert a.shape == (5, 6)
+    assert a.tolist() == [list(row) for row in V]
+    a[0, 0] = 3
+    assert P[2][1] == 3
+
+
+@pytest.mark.skipif(np is None, reason='numpy is not installed')
+@pytest.mark.parametrize('min_size', [1, 2, 64])
+def test_numpy_odd_sizes(min_size):
+    random.seed(min_size)
+    A, B = random_matrix(13, 7, 'int64'), random_matrix(7, 11, 'int64')
+
+    assert_close(numpy_strassen_matrix_mult(A, B, min_size),
+                 gauss_matrix_mult(A, B))
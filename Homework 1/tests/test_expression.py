@@ -0,0 +1,97 @@
+from matrix import (MAX_EXPRESSION_TERMS, DiagonalMatrix, Matrix,
+                    MatrixExpression, gauss_matrix_mult, zero_matrix)
+
+
+def values(A):
+    return [list(row) for row in A]
+
+
+def test_sum_is_not_changed_by_inplace_update():
+    A = Matrix([[1, 2], [3, 4]])
+    B = 10*A
+    C = A + B
+    A += B
+
+    assert values(C) == [[11, 22], [33, 44]]
+    assert values(A) == [[11, 22], [33, 44]]
+
+
+def test_scaled_matrix_is_not_changed_by_row_write():
+    A = Matrix([[1, 2], [3, 4]])
+    D = 2*A
+    A[0][0] = 100
+
+    assert values(D) == [[2, 4], [6, 8]]
+
+
+def test_difference_is_not_changed_by_product_into_operand():
+    A = Matrix([[1, 2], [3, 4]])
+    B = 10*A
+    X = B - A
+    gauss_matrix_mult(B, B, out=A)
+
+    assert values(X) == [[9, 18], [27, 36]]
+
+
+def test_expression_of_views_is_not_changed_by_parent_update():
+    M = Matrix([[1, 2], [3, 4]])
+    V = M.view(0, 1, 0, 2)
+    E = V + V
+    M[0][1] = 50
+    M.assign_submatrix(0, 0, [[7, 7]])
+
+    assert values(E) == [[2, 4]]
+
+
+def test_operands_are_not_changed_by_evaluated_expression():
+    A = Matrix([[1, 2], [3, 4]])
+    E = A + A
+    E[0][0] = 7
+
+    assert values(A) == [[1, 2], [3, 4]]
+    assert values(E) == [[7, 4], [6, 8]]
+
+
+def test_expression_of_structured_matrix():
+    A = Matrix([[1, 2], [3, 4]])
+    E = A - DiagonalMatrix([1, 1], dtype='int64')
+    A.fill(0)
+
+    assert values(E) == [[0, 2], [3, 3]]
+
+
+def test_chain_of_sums_is_collapsed():
+    X = Matrix([[1.0, 2.0], [3.0, 4.0]])
+    S = zero_matrix(2, 2)
+    for _ in range(400):
+        S = S + X
+        assert len(S._terms) <= MAX_EXPRESSION_TERMS
+
+    assert values(S) == [[400, 800], [1200, 1600]]
+
+
+def test_chain_of_sums_with_updated_operand():
+    X = Matrix([[1, 2], [3, 4]], dtype='int64')
+    S = zero_matrix(2, 2, 'int64')
+    for _ in range(20):
+        S = S + X
+        X += X
+
+    assert values(S) == [[2**20 - 1, 2*(2**20 - 1)],
+                         [3*(2**20 - 1), 4*(2**20 - 1)]]
+
+
+def test_evaluate_into_operand():
+    A = Matrix([[1, 2], [3, 4]])
+    B = Matrix([[1, 1], [1, 1]])
+    MatrixExpression([(1, A), (-2, B)], 2, 2).evaluate(out=A)
+
+    assert values(A) == [[-1, 0], [1, 2]]
+
+
+def test_dtype():
+    A = Matrix([[1, 2]], dtype='int64')
+
+    assert (A + A).dtype == 'int64'
+    assert (0.5*A).dtype == 'float64'
+    assert (A - A.astype('float32')).dtype == 'float64'
@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+from conftest import assert_close, random_matrix
+from matrix import (Matrix, better_strassen_matrix_mult, gauss_matrix_mult,
+                    gemm, strassen_matrix_mult)
+
+
+def reference(alpha, A, B, beta, C):
+    P = gauss_matrix_mult(A, B)
+    return Matrix([[alpha*p + beta*c for p, c in zip(p_row, c_row)]
+                   for p_row, c_row in zip(P, C)], dtype=C.dtype)
+
+
+MULTIPLY = [
+    (gauss_matrix_mult, {}),
+    (gauss_matrix_mult, {'transpose_b': False, 'block_size': 3}),
+    (strassen_matrix_mult, {'min_size': 4}),
+    (better_strassen_matrix_mult, {'min_size': 4}),
+]
+
+
+@pytest.mark.parametrize('alpha,beta', [(1, 0), (1, 1), (2.5, 0),
+                                        (-1, 1), (0.5, -3), (0, 2)])
+@pytest.mark.parametrize('multiply,kwargs', MULTIPLY)
+def test_gemm(multiply, kwargs, alpha, beta):
+    random.seed(7)
+    A, B, C = random_matrix(13, 9), random_matrix(9, 11), random_matrix(13, 11)
+    expected = reference(alpha, A, B, beta, C)
+
+    result = gemm(alpha, A, B, beta, C, multiply, **kwargs)
+
+    assert result is C
+    assert_close(C, expected)
+
+
+@pytest.mark.parametrize('multiply,kwargs', MULTIPLY)
+def test_gemm_into_view(multiply, kwargs):
+    random.seed(8)
+    A, B, P = random_matrix(6, 5), random_matrix(5, 7), random_matrix(10, 10)
+    C = P.view(2, 6, 1, 7)
+    expected = reference(2, A, B, 3, C)
+    before = [list(row) for row in P]
+
+    gemm(2, A, B, 3, C, multiply, **kwargs)
+
+    assert_close(C, expected)
+    assert list(P[0]) == before[0] and P[2][0] == before[2][0]
+
+
+@pytest.mark.parametrize('multiply,kwargs', MULTIPLY)
+def test_beta_zero_ignores_former_values(multiply, kwargs):
+    random.seed(9)
+    A, B = random_matrix(6, 6), random_matrix(6, 6)
+    C = Matrix([[float('nan')]*6 for _ in range(6)])
+
+    gemm(1, A, B, 0, C, multiply, **kwargs)
+
+    assert_close(C, gauss_matrix_mult(A, B))
+
+
+def test_repeated_updates():
+    random.seed(10)
+    A, B = random_matrix(5, 5), random_matrix(5, 5)
+    C = random_matrix(5, 5)
+    expected = reference(3, A, B, 1, C)
+
+    for _ in range(3):
+        gemm(1, A, B, 1, C)
+
+    assert_close(C, expected)
+
+
+def test_int64():
+    A = Matrix([[1, 2], [3, 4]], dtype='int64')
+    C = Matrix([[1, 1], [1, 1]], dtype='int64')
+
+    gemm(2, A, A, -1, C)
+
+    assert [list(row) for row in C] == [[13, 19], [29, 43]]
+    assert C.dtype == 'int64'
+
+
+@pytest.mark.parametrize('alpha,beta', [(0.5, 1), (1, 0.5), ('2', 1),
+                                        (1, None)])
+def test_invalid_scalars(alpha, beta):
+    A = Matrix([[1, 2], [3, 4]], dtype='int64')
+    C = Matrix([[1, 1], [1, 1]], dtype='int64')
+
+    with pytest.raises(ValueError):
+        gemm(alpha, A, A, beta, C)
+    assert [list(row) for row in C] == [[1, 1], [1, 1]]
+
+
+def test_wrong_shapes():
+    A = random_matrix(3, 4)
+    with pytest.raises(ValueError):
+        gemm(1, A, A, 0, random_matrix(3, 3))
+    with pytest.raises(ValueError):
+        gemm(1, A, random_matrix(4, 2), 0, random_matrix(3, 3))
+    with pytest.raises(ValueError):
+        gemm(1, A, random_matrix(4, 2), 0, None)
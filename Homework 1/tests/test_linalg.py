@@ -0,0 +1,141 @@
+import random
+
+import pytest
+from conftest import assert_close, random_matrix
+
+from matrix import (IdentityMatrix, Matrix, gauss_matrix_mult, inverse,
+                    lu_decomposition, solve, solve_triangular, zero_matrix)
+
+
+def well_conditioned(size, dtype='float64'):
+    ''' Return a random matrix with a dominant diagonal '''
+    A = random_matrix(size, size, dtype)
+    for i in range(size):
+        A[i][i] += 300 if dtype == 'int64' else size
+
+    return A
+
+
+SIZES = [1, 2, 7, 16, 33]
+
+
+@pytest.mark.parametrize('dtype', ['float64', 'float32', 'int64'])
+@pytest.mark.parametrize('min_size', [1, 4, 64])
+@pytest.mark.parametrize('size', SIZES)
+def test_lu_decomposition(size, min_size, dtype):
+    random.seed(size*min_size)
+    A = random_matrix(size, size, dtype)
+    perm, L, U = lu_decomposition(A, min_size)
+
+    assert L.dtype == U.dtype == ('float32' if dtype == 'float32'
+                                  else 'float64')
+    assert sorted(perm) == list(range(size))
+    for i in range(size):
+        assert L[i][i] == 1
+        assert not any(L[i][i + 1:]) and not any(U[i][:i])
+        # Partial pivoting bounds the multipliers
+        assert all(abs(x) <= 1 + 1e-6 for x in L[i][:i])
+
+    permuted = Matrix([list(A[p]) for p in perm], dtype=dtype)
+    tolerance = 1e-4 if dtype == 'float32' else 1e-8
+    assert_close(gauss_matrix_mult(L, U), permuted.astype(L.dtype), tolerance)
+
+
+@pytest.mark.parametrize('min_size', [1, 4, 64])
+@pytest.mark.parametrize('size', SIZES)
+def test_solve(size, min_size):
+    random.seed(size + min_size)
+    A = well_conditioned(size)
+    B = random_matrix(size, 3)
+    X = solve(A, B, min_size)
+
+    assert_close(gauss_matrix_mult(A, X), B)
+
+
+@pytest.mark.parametrize('min_size', [1, 4, 64])
+@pytest.mark.parametrize('size', SIZES)
+def test_inverse(size, min_size):
+    random.seed(size*3 + min_size)
+    A = well_conditioned(size)
+    A_inverse = inverse(A, min_size)
+
+    assert_close(gauss_matrix_mult(A, A_inverse),
+                 IdentityMatrix(size).to_dense())
+    assert_close(gauss_matrix_mult(A_inverse, A),
+                 IdentityMatrix(size).to_dense())
+
+
+def test_integer_inverse():
+    A = Matrix([[2, 1], [1, 1]], dtype='int64')
+
+    assert [list(row) for row in inverse(A)] == [[1, -1], [-1, 2]]
+
+
+def test_pivoting_is_required():
+    A = Matrix([[0, 1], [1, 0]])
+    X = solve(A, Matrix([[2], [3]]), 1)
+
+    assert [list(row) for row in X] == [[3], [2]]
+
+
+@pytest.mark.parametrize('unit', [False, True])
+@pytest.mark.parametrize('lower', [False, True])
+@pytest.mark.parametrize('min_size', [1, 4, 64])
+def test_solve_triangular(lower, unit, min_size):
+    random.seed(11)
+    size = 19
+    T = well_conditioned(size)
+    B = random_matrix(size, 4)
+
+    # Only the requested triangle (and the diagonal, if not unit) is read
+    dense = zero_matrix(size, size)
+    for i in range(size):
+        for j in range(size):
+            if (j < i) if lower else (j > i):
+                dense[i][j] = T[i][j]
+        dense[i][i] = 1 if unit else T[i][i]
+
+    X = solve_triangular(T, B, lower, unit, min_size)
+    assert_close(gauss_matrix_mult(dense, X), B)
+
+
+def test_views_are_not_modified():
+    random.seed(12)
+    P = random_matrix(30, 30)
+    for i in range(30):
+        P[i][i] += 30
+    before = [list(row) for row in P]
+    A, B = P.view(3, 20, 3, 20), P.view(3, 20, 25, 4)
+
+    X = solve(A, B, 4)
+    A_inverse = inverse(A, 4)
+    lu_decomposition(A, 4)
+    solve_triangular(A, B, min_size=4)
+
+    assert [list(row) for row in P] == before
+    assert_close(gauss_matrix_mult(A, X), B)
+    assert_close(gauss_matrix_mult(A, A_inverse),
+                 IdentityMatrix(20).to_dense())
+
+
+@pytest.mark.parametrize('A', [
+    Matrix([[1, 2], [2, 4]]),
+    Matrix([[0, 0], [0, 0]]),
+    Matrix([[1, 2, 3], [2, 4, 6], [1, 1, 1]]),
+])
+def test_singular(A):
+    with pytest.raises(ValueError):
+        inverse(A)
+    with pytest.raises(ValueError):
+        lu_decomposition(A)
+
+
+def test_wrong_sizes():
+    with pytest.raises(ValueError):
+        lu_decomposition(random_matrix(2, 3))
+    with pytest.raises(ValueError):
+        solve(well_conditioned(3), random_matrix(2, 1))
+    with pytest.raises(ValueError):
+        solve_triangular(random_matrix(3, 2), random_matrix(3, 1))
+    with pytest.raises(ValueError):
+        solve_triangular(well_conditioned(3), random_matrix(2, 1))
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+from conftest import assert_close, random_matrix
+
+from matrix import (MappedMatrix, better_strassen_matrix_mult,
+                    gauss_matrix_mult, out_of_core_matrix_mult,
+                    strassen_matrix_mult)
+
+
+MULTIPLY = [
+    (gauss_matrix_mult, {}),
+    (strassen_matrix_mult, {'min_size': 2}),
+    (better_strassen_matrix_mult, {'min_size': 3}),
+]
+
+
+def test_round_trip(tmp_path):
+    random.seed(1)
+    A = random_matrix(7, 5, 'int64')
+    path = str(tmp_path/'a')
+    MappedMatrix.from_matrix(path, A).close()
+
+    with MappedMatrix(path, writable=False) as M:
+        assert (M.num_of_rows, M.num_of_cols, M.dtype) == (7, 5, 'int64')
+        assert [list(row) for row in M.to_matrix()] == [list(row)
+                                                       for row in A]
+        assert [list(row) for row in M.read_tile(2, 3, 1, 2)] == [
+            list(row) for row in A.view(2, 3, 1, 2)]
+        with pytest.raises(ValueError):
+            M.read_tile(5, 3, 0, 1)
+
+
+@pytest.mark.parametrize('budget', [24, 200, 10**6])
+@pytest.mark.parametrize('dtype', ['float64', 'float32', 'int64'])
+@pytest.mark.parametrize('shape', [(1, 1, 1), (13, 5, 9), (20, 20, 20)])
+def test_out_of_core(tmp_path, shape, dtype, budget):
+    random.seed(sum(shape) + budget)
+    m, k, n = shape
+    A, B = random_matrix(m, k, dtype), random_matrix(k, n, dtype)
+    expected = gauss_matrix_mult(A, B)
+    MA = MappedMatrix.from_matrix(str(tmp_path/'a'), A)
+    MB = MappedMatrix.from_matrix(str(tmp_path/'b'), B)
+
+    for multiply, kwargs in MULTIPLY:
+        C = out_of_core_matrix_mult(MA, MB, str(tmp_path/'c'), budget,
+                                    multiply, **kwargs)
+        assert_close(C.to_matrix(), expected)
+        C.close()
+
+    # In-memory operands are accepted too
+    C = out_of_core_matrix_mult(A, MB, str(tmp_path/'c'), budget)
+    assert_close(C.to_matrix(), expected)
+    C.close()
+    MA.close()
+    MB.close()
+
+
+def test_not_a_matrix_file(tmp_path):
+    path = tmp_path/'a'
+    path.write_bytes(b'not a matrix at all, just some bytes')
+
+    with pytest.raises(ValueError):
+        MappedMatrix(str(path))
+
+
+def test_wrong_sizes(tmp_path):
+    MA = MappedMatrix.from_matrix(str(tmp_path/'a'), random_matrix(3, 4))
+    with pytest.raises(ValueError):
+        out_of_core_matrix_mult(MA, MA, str(tmp_path/'c'), 1000)
+    MA.close()
@@ -0,0 +1,142 @@
+import json
+import random
+
+import pytest
+from conftest import assert_close, random_matrix
+
+import matrix
+from matrix import (calibrate, crossover_size, gauss_matrix_mult,
+                    load_crossover_table, matmul)
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    ''' Record the engines called by `matmul` '''
+    names = []
+    for name in ('gauss_matrix_mult', 'strassen_matrix_mult',
+                 'rectangular_matrix_mult', 'workspace_strassen_matrix_mult',
+                 'numpy_strassen_matrix_mult'):
+        def engine(*args, _engine=getattr(matrix, name), _name=name,
+                   **kwargs):
+            names.append(_name)
+            return _engine(*args, **kwargs)
+        monkeypatch.setattr(matrix, name, engine)
+
+    return names
+
+
+@pytest.fixture
+def table(monkeypatch):
+    ''' Use a known crossover table '''
+    crossover = {'float64': {'1': 8, '4': 4}}
+    monkeypatch.setattr(matrix, '_crossover_table', crossover)
+
+    return crossover
+
+
+def test_calibrate(tmp_path, monkeypatch):
+    monkeypatch.setattr(matrix, '_crossover_table', None)
+    path = str(tmp_path/'crossover.json')
+    table = calibrate(sizes=(4, 8), aspects=(1, 2),
+                      dtypes=('float64', 'int64'), path=path, repetitions=1,
+                      numpy_sizes=(8,), numpy_dispatch_sizes=(2, 4))
+
+    assert set(table) == {'float64', 'int64'}
+    for crossovers in table.values():
+        assert set(crossovers) == {'1', '2'}
+        assert all(size in (4, 8, 16) for size in crossovers.values())
+    assert load_crossover_table(path) == table
+    with open(path) as f:
+        assert json.load(f)['crossover'] == table
+
+    # The new table is used right away
+    assert matrix._crossover_table == table
+
+    if matrix.np is not None:
+        dispatch = load_crossover_table(path, key='numpy_dispatch')
+        assert set(dispatch) == {'float64', 'int64'}
+        assert all(size in (2, 4, 8) for size in dispatch.values())
+        assert matrix._numpy_dispatch_table == dispatch
+
+
+def test_missing_table(tmp_path, monkeypatch):
+    assert load_crossover_table(str(tmp_path/'missing.json')) == {}
+
+    monkeypatch.setattr(matrix, '_crossover_table', {})
+    assert crossover_size(random_matrix(4, 4),
+                          random_matrix(4, 4)) == matrix.DEFAULT_MIN_SIZE
+
+
+def test_crossover_size(table):
+    square = random_matrix(4, 4)
+    assert crossover_size(square, square) == 8
+    assert crossover_size(random_matrix(16, 2), random_matrix(2, 16)) == 4
+    # Aspect ratios between the calibrated ones use the closest below
+    assert crossover_size(random_matrix(6, 3), random_matrix(3, 6)) == 8
+    # Dtypes that weren't calibrated use the default
+    int_square = random_matrix(4, 4, 'int64')
+    assert crossover_size(int_square, int_square) == matrix.DEFAULT_MIN_SIZE
+
+
+def test_dispatch(table, calls, monkeypatch):
+    # The pure Python engines are used when numpy isn't installed
+    monkeypatch.setattr(matrix, 'np', None)
+    random.seed(1)
+    A, B = random_matrix(7, 7), random_matrix(7, 7)
+    assert_close(matmul(A, B), gauss_matrix_mult(A, B))
+    assert calls[0] == 'gauss_matrix_mult'
+
+    del calls[:]
+    A, B = random_matrix(12, 10), random_matrix(10, 9)
+    assert_close(matmul(A, B), gauss_matrix_mult(A, B))
+    assert calls[0] == 'strassen_matrix_mult'
+
+    del calls[:]
+    monkeypatch.setattr(matrix, 'MEMORY_EFFICIENT_SIZE', 100)
+    assert_close(matmul(A, B), gauss_matrix_mult(A, B))
+    assert calls[0] == 'workspace_strassen_matrix_mult'
+
+    # Products far from square are split along their largest size
+    del calls[:]
+    A, B = random_matrix(40, 3), random_matrix(3, 5)
+    assert_close(matmul(A, B), gauss_matrix_mult(A, B))
+    assert calls[0] == 'rectangular_matrix_mult'
+
+
+@pytest.mark.skipif(matrix.np is None, reason='numpy is not installed')
+def test_dispatch_to_numpy(calls, monkeypatch):
+    monkeypatch.setattr(matrix, '_numpy_dispatch_table', {'int64': 10})
+    random.seed(2)
+    A, B = random_matrix(12, 10, 'int64'), random_matrix(10, 9, 'int64')
+    assert_close(matmul(A, B), gauss_matrix_mult(A, B))
+    assert calls[0] == 'numpy_strassen_matrix_mult'
+
+    # Products below the calibrated size don't pay for the numpy arrays
+    del calls[:]
+    A, B = random_matrix(9, 9, 'int64'), random_matrix(9, 3, 'int64')
+    assert_close(matmul(A, B), gauss_matrix_mult(A, B))
+    assert calls[0] == 'gauss_matrix_mult'
+
+    # The default is used for the dtypes that weren't calibrated
+    assert matrix.numpy_dispatch_size(A, B) == 10
+    assert (matrix.numpy_dispatch_size(A.astype('float32'),
+                                       B.astype('float32')) ==
+            matrix.NUMPY_DISPATCH_SIZE)
+
+
+@pytest.mark.parametrize('dtype', ['float64', 'float32', 'int64'])
+@pytest.mark.parametrize('shape', [(1, 1, 1), (13, 5, 9), (20, 3, 17),
+                                   (17, 17, 17)])
+def test_matmul(table, shape, dtype):
+    random.seed(sum(shape))
+    rows, inner, cols = shape
+    A, B = random_matrix(rows, inner, dtype), random_matrix(inner, cols, dtype)
+
+    assert_close(matmul(A, B), gauss_matrix_mult(A, B))
+
+
+def test_wrong_sizes(table):
+    with pytest.raises(ValueError):
+        matmul(random_matrix(4, 5), random_matrix(4, 5))
+    with pytest.raises(ValueError):
+        matmul(random_matrix(20, 20), random_matrix(10, 20))
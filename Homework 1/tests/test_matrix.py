@@ -0,0 +1,152 @@
+import random
+from array import array
+
+import pytest
+from conftest import assert_close, random_matrix
+
+import matrix
+from matrix import (DTYPES, IdentityMatrix, Matrix, better_strassen_matrix_mult,
+                    gauss_matrix_mult, strassen_matrix_mult, zero_matrix)
+
+
+def naive_product(A, B):
+    return [[sum(a*b for a, b in zip(row, col)) for col in zip(*B)]
+            for row in A]
+
+
+SHAPES = [(1, 1, 1), (7, 7, 7), (13, 5, 9), (3, 20, 2), (20, 3, 17)]
+
+
+@pytest.mark.parametrize('dtype', ['float64', 'float32', 'int64'])
+def test_storage(dtype):
+    A = Matrix([[1, 2, 3], [4, 5, 6]], dtype=dtype)
+
+    assert A.dtype == dtype and A._data.typecode == DTYPES[dtype]
+    assert len(A._data) == 6
+    assert (A.num_of_rows, A.num_of_cols) == (2, 3)
+    assert [list(row) for row in A] == [[1, 2, 3], [4, 5, 6]]
+    assert list(A[-1]) == [4, 5, 6]
+
+    # Rows are views over the buffer
+    A[1][2] = 9
+    assert A._data[5] == 9
+    with pytest.raises(IndexError):
+        A[2]
+
+
+def test_from_buffer():
+    data = array('d', range(6))
+    A = Matrix.from_buffer(data, 3, 2)
+
+    assert A._data is data
+    assert [list(row) for row in A] == [[0, 1], [2, 3], [4, 5]]
+    with pytest.raises(ValueError):
+        Matrix.from_buffer(data, 4, 2)
+
+
+def test_invalid_matrices():
+    with pytest.raises(ValueError):
+        Matrix([[1, 2], [3]])
+    with pytest.raises(ValueError):
+        Matrix([[1]], dtype='complex')
+
+
+def test_arithmetic():
+    A = Matrix([[1, 2], [3, 4]], dtype='int64')
+    B = Matrix([[5, 6], [7, 8]], dtype='int64')
+
+    assert [list(row) for row in A + B] == [[6, 8], [10, 12]]
+    assert [list(row) for row in B - A] == [[4, 4], [4, 4]]
+    assert [list(row) for row in A*B] == [[19, 22], [43, 50]]
+    assert (2*A).dtype == 'int64' and (0.5*A).dtype == 'float64'
+    assert [list(row) for row in 0.5*A] == [[0.5, 1], [1.5, 2]]
+
+    C = A.copy()
+    C += B
+    C -= A
+    assert [list(row) for row in C] == [list(row) for row in B]
+    assert [list(row) for row in A] == [[1, 2], [3, 4]]
+
+
+def test_submatrices():
+    A = Matrix([[y*4 + x for x in range(4)] for y in range(3)])
+
+    assert [list(row) for row in A.submatrix(1, 2, 1, 5)] == [[5, 6, 7],
+                                                             [9, 10, 11]]
+
+    A.assign_submatrix(1, 2, Matrix([[0, 0]], dtype='int64'))
+    assert list(A[1]) == [4, 5, 0, 0]
+
+
+def test_identity_and_zero():
+    assert [list(row) for row in IdentityMatrix(3, 'int64')] == [
+        [1, 0, 0], [0, 1, 0], [0, 0, 1]]
+    assert not any(zero_matrix(3, 4)._data)
+    assert zero_matrix(3, 4, 'float32').dtype == 'float32'
+
+
+@pytest.mark.parametrize('dtype', ['float64', 'float32', 'int64'])
+@pytest.mark.parametrize('shape', SHAPES)
+def test_gauss(shape, dtype):
+    random.seed(sum(shape))
+    rows, inner, cols = shape
+    A, B = random_matrix(rows, inner, dtype), random_matrix(inner, cols, dtype)
+    C = gauss_matrix_mult(A, B)
+
+    assert C.dtype == dtype
+    assert_close(C, Matrix(naive_product(A, B), dtype=dtype))
+
+
+@pytest.mark.parametrize('transpose_b', [True, False])
+@pytest.mark.parametrize('block_size', [1, 3, 64])
+@pytest.mark.parametrize('dtype', ['float64', 'int64'])
+@pytest.mark.parametrize('shape', SHAPES)
+def test_gauss_kernels(shape, dtype, block_size, transpose_b):
+    random.seed(sum(shape) + block_size)
+    rows, inner, cols = shape
+    A, B = random_matrix(rows, inner, dtype), random_matrix(inner, cols, dtype)
+
+    # Zero rows of A are skipped by the i-k-j kernel
+    A.assign_submatrix(0, 0, zero_matrix(1, inner, dtype))
+    C = gauss_matrix_mult(A, B, block_size=block_size,
+                          transpose_b=transpose_b)
+
+    assert_close(C, Matrix(naive_product(A, B), dtype=dtype))
+
+
+def test_mixed_dtypes():
+    A = Matrix([[1, 2]], dtype='int64')
+    B = Matrix([[0.5], [0.25]], dtype='float32')
+
+    assert gauss_matrix_mult(A, B).dtype == 'float64'
+    assert list(gauss_matrix_mult(A, B)[0]) == [1]
+
+
+@pytest.mark.parametrize('multiply', [strassen_matrix_mult,
+                                      better_strassen_matrix_mult])
+@pytest.mark.parametrize('dtype', ['float64', 'int64'])
+@pytest.mark.parametrize('shape', SHAPES)
+def test_strassen(multiply, shape, dtype):
+    random.seed(sum(shape) + 1)
+    rows, inner, cols = shape
+    A, B = random_matrix(rows, inner, dtype), random_matrix(inner, cols, dtype)
+
+    assert_close(multiply(A, B, 2), gauss_matrix_mult(A, B))
+
+
+def test_wrong_sizes():
+    with pytest.raises(ValueError):
+        gauss_matrix_mult(zero_matrix(2, 3), zero_matrix(2, 3))
+    with pytest.raises(ValueError):
+        strassen_matrix_mult(zero_matrix(2, 3), zero_matrix(2, 3))
+
+
+def test_public_api():
+    namespace = {}
+    exec('from matrix import *', namespace)
+
+    assert 'Matrix' in namespace and 'matmul' in namespace
+    # Neither the imported modules nor the private helpers are exported
+    for name in ('random', 'randint', 'np', 'array', '_strassen_combine'):
+        assert name not in namespace
+    assert all(hasattr(matrix, name) for name in matrix.__all__)
@@ -0,0 +1,126 @@
+import random
+
+import pytest
+from conftest import assert_close, random_matrix
+
+import matrix
+from matrix import (DiagonalMatrix, Matrix, gauss_matrix_mult, matrix_power,
+                    zero_matrix)
+
+
+def naive_power(A, k):
+    C = zero_matrix(A.num_of_rows, A.num_of_rows, A.dtype)
+    for i in range(A.num_of_rows):
+        C[i][i] = 1
+    for _ in range(k):
+        C = gauss_matrix_mult(C, A)
+
+    return C
+
+
+def transition_matrix(size):
+    ''' Return a random row-stochastic matrix '''
+    A = random_matrix(size, size)
+    for i in range(size):
+        total = sum(A[i])
+        A[i][:] = matrix.array('d', [x/total for x in A[i]])
+
+    return A
+
+
+@pytest.mark.parametrize('k', [0, 1, 2, 3, 5, 8, 13, 31, 64])
+@pytest.mark.parametrize('size', [1, 4, 9])
+def test_power(size, k):
+    random.seed(size + k)
+    A = transition_matrix(size)
+
+    assert_close(matrix_power(A, k), naive_power(A, k))
+    assert_close(matrix_power(A, k, cache=False), naive_power(A, k))
+
+
+def test_int64():
+    A = Matrix([[1, 1], [1, 0]], dtype='int64')
+    F = matrix_power(A, 40)
+
+    assert F.dtype == 'int64'
+    assert [list(row) for row in F] == [[165580141, 102334155],
+                                        [102334155, 63245986]]
+
+
+def test_large_exponent():
+    random.seed(13)
+    A = transition_matrix(6)
+    P = matrix_power(A, 10**6)
+
+    # The rows of a power of a stochastic matrix still sum to one
+    for row in P:
+        assert abs(sum(row) - 1) < 1e-9
+
+
+def test_squares_are_cached_and_reused():
+    random.seed(14)
+    A = transition_matrix(5)
+    matrix_power(A, 100)
+    snapshot, squares = matrix._power_cache[id(A)]
+    count = len(squares)
+
+    matrix_power(A, 37)
+    assert matrix._power_cache[id(A)][1] is squares
+    assert len(squares) == count
+    assert next(reversed(matrix._power_cache)) == id(A)
+
+
+def test_updates_invalidate_the_cache():
+    random.seed(15)
+    A = transition_matrix(5)
+    matrix_power(A, 9)
+
+    A[0][0] = 5.0
+    assert_close(matrix_power(A, 9), naive_power(A, 9))
+
+    A.view(1, 2, 1, 2).fill(0.5)
+    assert_close(matrix_power(A, 9), naive_power(A, 9))
+
+
+def test_results_do_not_alias_the_cache():
+    random.seed(16)
+    A = transition_matrix(4)
+    expected = naive_power(A, 4)
+
+    for k in (1, 4):
+        P = matrix_power(A, k)
+        P[0][0] = 99
+    assert_close(matrix_power(A, 4), expected)
+    assert A[0][0] != 99
+
+
+def test_least_recently_used_are_evicted(monkeypatch):
+    monkeypatch.setattr(matrix, 'POWER_CACHE_SIZE', 6)
+    random.seed(17)
+    matrices = [transition_matrix(3) for _ in range(4)]
+    for A in matrices:
+        matrix_power(A, 9)
+
+    assert sum(len(squares)
+               for _, squares in matrix._power_cache.values()) <= 6
+    assert id(matrices[-1]) in matrix._power_cache
+    assert id(matrices[0]) not in matrix._power_cache
+
+
+def test_views_and_structured_matrices():
+    random.seed(18)
+    P = transition_matrix(8)
+    V = P.view(2, 5, 2, 5)
+    assert_close(matrix_power(V, 6), naive_power(V, 6))
+
+    D = DiagonalMatrix([1, 2, 3], dtype='int64')
+    assert [list(row) for row in matrix_power(D, 3)] == [[1, 0, 0],
+                                                         [0, 8, 0],
+                                                         [0, 0, 27]]
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        matrix_power(random_matrix(2, 3), 2)
+    with pytest.raises(ValueError):
+        matrix_power(random_matrix(2, 2), -1)
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+from conftest import assert_close, random_matrix
+
+from matrix import (Matrix, MatrixExpression, gauss_matrix_mult, prepare,
+                    zero_matrix)
+
+
+def leaves(node):
+    if node is None or isinstance(node, Matrix):
+        return [node]
+
+    return [leaf for child in node[2] for leaf in leaves(child)]
+
+
+@pytest.mark.parametrize('dtype', ['float64', 'int64'])
+@pytest.mark.parametrize('rows,inner,cols', [(16, 16, 16), (17, 9, 5),
+                                             (5, 20, 11), (1, 1, 1)])
+def test_products(rows, inner, cols, dtype):
+    random.seed(rows*inner*cols)
+    A = random_matrix(rows, inner, dtype)
+    prepared = prepare(A, min_size=4)
+
+    for _ in range(3):
+        B = random_matrix(inner, cols, dtype)
+        C = prepared.multiply(B)
+        expected = gauss_matrix_mult(A, B)
+
+        assert C.dtype == expected.dtype
+        assert (C.num_of_rows, C.num_of_cols) == (rows, cols)
+        assert_close(C, expected)
+        assert_close(prepared*B, expected)
+
+
+def test_operands_are_evaluated():
+    random.seed(0)
+    prepared = prepare(random_matrix(16, 16), min_size=4)
+
+    operands = leaves(prepared._root)
+    assert len(operands) == 7**3
+    assert not any(isinstance(X, MatrixExpression) for X in operands)
+
+
+def test_updates_of_the_matrix_are_ignored():
+    random.seed(1)
+    A, B = random_matrix(16, 16), random_matrix(16, 4)
+    expected = gauss_matrix_mult(A, B)
+    prepared = prepare(A, min_size=4)
+    prepared.multiply(B)
+
+    A[0][0] = 1000
+    A.view(8, 8, 8, 8).fill(3)
+
+    assert_close(prepared.multiply(B), expected)
+
+
+def test_zero_blocks():
+    A = zero_matrix(16, 16)
+    A.view(0, 8, 0, 8).fill(1)
+    prepared = prepare(A, min_size=4)
+    B = random_matrix(16, 3)
+
+    assert None in leaves(prepared._root)
+    assert_close(prepared.multiply(B), gauss_matrix_mult(A, B))
+    assert prepared.multiply(zero_matrix(16, 2)).is_zero()
+    assert prepare(zero_matrix(9, 9), 2).multiply(B.view(0, 9, 0, 3)
+                                                  ).is_zero()
+
+
+def test_wrong_size():
+    with pytest.raises(ValueError):
+        prepare(random_matrix(4, 5)).multiply(random_matrix(4, 5))
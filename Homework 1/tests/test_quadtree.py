@@ -0,0 +1,98 @@
+import random
+
+import pytest
+from conftest import assert_close, random_matrix
+
+from matrix import (Matrix, MortonMatrix, QuadtreeMatrix, gauss_matrix_mult,
+                    zero_matrix)
+
+
+def leaves(node):
+    if node is None or isinstance(node, Matrix):
+        return [node]
+
+    return [leaf for child in node for leaf in leaves(child)]
+
+
+SHAPES = [(1, 1, 1), (8, 8, 8), (13, 5, 9), (3, 20, 2), (33, 17, 40)]
+
+
+@pytest.mark.parametrize('dtype', ['float64', 'int64'])
+@pytest.mark.parametrize('leaf_size', [4, 8])
+@pytest.mark.parametrize('shape', SHAPES)
+def test_quadtree(shape, leaf_size, dtype):
+    random.seed(sum(shape) + leaf_size)
+    m, k, n = shape
+    A, B = random_matrix(m, k, dtype), random_matrix(k, n, dtype)
+    QA, QB = QuadtreeMatrix(A, leaf_size), QuadtreeMatrix(B, leaf_size)
+
+    assert_close(QA.to_matrix(), A)
+    assert_close((QA*QB).to_matrix(), gauss_matrix_mult(A, B))
+
+
+@pytest.mark.parametrize('leaf_size', [2, 4])
+def test_quadtree_sums(leaf_size):
+    random.seed(leaf_size)
+    A, B = random_matrix(11, 11), random_matrix(11, 11)
+    QA, QB = QuadtreeMatrix(A, leaf_size), QuadtreeMatrix(B, leaf_size)
+
+    assert_close((QA + QB).to_matrix(), A + B)
+    assert_close((QA - QB).to_matrix(), A - B)
+
+
+def test_leaves_are_evaluated():
+    random.seed(3)
+    QA = QuadtreeMatrix(random_matrix(16, 16), 4)
+    QB = QuadtreeMatrix(random_matrix(16, 16), 4)
+
+    for Q in (QA + QB, QA - QB, QA*QB):
+        assert all(type(leaf) is Matrix for leaf in leaves(Q._root))
+
+
+def test_zero_blocks_are_pruned():
+    random.seed(4)
+    A = random_matrix(16, 16)
+    QA = QuadtreeMatrix(A, 4)
+
+    assert (QA - QA)._root is None and (QA - QA).is_zero()
+
+    # Only the top-left quadrant of the product is non-zero
+    B = zero_matrix(16, 16)
+    B.assign_submatrix(0, 0, A.view(0, 8, 0, 8))
+    QB = QuadtreeMatrix(B, 4)
+    P = QB*QB
+    assert P._root[1] is None and P._root[2] is None and P._root[3] is None
+    assert_close(P.to_matrix(), gauss_matrix_mult(B, B))
+
+
+def test_quadtree_wrong_sizes():
+    with pytest.raises(ValueError):
+        QuadtreeMatrix(random_matrix(3, 4), 2)*QuadtreeMatrix(
+            random_matrix(3, 4), 2)
+
+
+@pytest.mark.parametrize('dtype', ['float64', 'int64'])
+@pytest.mark.parametrize('tile_size', [4, 8, 16])
+@pytest.mark.parametrize('shape', SHAPES)
+def test_morton(shape, tile_size, dtype):
+    random.seed(sum(shape)*tile_size)
+    m, k, n = shape
+    A, B = random_matrix(m, k, dtype), random_matrix(k, n, dtype)
+    MA, MB = MortonMatrix(A, tile_size), MortonMatrix(B, tile_size)
+
+    assert_close(MA.to_matrix(), A)
+    assert_close((MA*MB).to_matrix(), gauss_matrix_mult(A, B))
+
+
+def test_morton_layout():
+    M = Matrix([[i*4 + j for j in range(4)] for i in range(4)])
+    quadrants = MortonMatrix(M, 2).quadrants()
+
+    assert [list(q) for q in quadrants] == [[0, 1, 4, 5], [2, 3, 6, 7],
+                                            [8, 9, 12, 13],
+                                            [10, 11, 14, 15]]
+
+
+def test_morton_invalid_side():
+    with pytest.raises(ValueError):
+        MortonMatrix(random_matrix(20, 20), 4, side=24)
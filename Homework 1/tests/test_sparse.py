@@ -0,0 +1,88 @@
+import random
+
+import pytest
+from conftest import assert_close, random_matrix
+
+from matrix import SparseMatrix, gauss_matrix_mult, zero_matrix
+
+
+def random_sparse(rows, cols, density, dtype='float64'):
+    M = zero_matrix(rows, cols, dtype)
+    for i in range(rows):
+        for j in range(cols):
+            if random.random() < density:
+                M[i][j] = (random.randint(-5, 5) if dtype == 'int64'
+                           else random.random())
+
+    return M
+
+
+SHAPES = [(1, 1, 1), (9, 9, 9), (13, 5, 9), (3, 40, 2), (40, 17, 31)]
+
+
+@pytest.mark.parametrize('dtype', ['float64', 'int64'])
+@pytest.mark.parametrize('shape', SHAPES)
+def test_products(shape, dtype):
+    random.seed(sum(shape))
+    m, k, n = shape
+    A = random_sparse(m, k, 0.1, dtype)
+    B = random_sparse(k, n, 0.2, dtype)
+    SA, SB = SparseMatrix(A), SparseMatrix(list(B), dtype=dtype)
+    expected = gauss_matrix_mult(A, B)
+
+    assert_close(SA.to_dense(), A)
+    assert_close(SA*B, expected)
+    assert_close(A*SB, expected)
+
+    P = SA*SB
+    assert isinstance(P, SparseMatrix)
+    assert_close(P.to_dense(), expected)
+
+
+def test_only_nonzero_values_are_stored():
+    random.seed(1)
+    A = random_sparse(20, 20, 0.1)
+    S = SparseMatrix(A)
+
+    assert S.nnz == sum(1 for row in A for value in row if value)
+    assert list(S.row_pointers) == sorted(S.row_pointers)
+
+
+def test_scale():
+    random.seed(2)
+    A = random_sparse(6, 7, 0.3, 'int64')
+    S = SparseMatrix(A)
+
+    assert (2*S).dtype == 'int64'
+    assert_close((2*S).to_dense(), 2*A)
+    assert_close((0.5*S).to_dense(), 0.5*A.astype('float64'))
+    with pytest.raises(ValueError):
+        'a'*S
+
+
+def test_identity():
+    B = random_matrix(5, 3)
+    I = SparseMatrix.identity(5)
+
+    assert I.nnz == 5
+    assert_close(I*B, B)
+
+
+def test_from_csr():
+    S = SparseMatrix.from_csr(SparseMatrix.identity(2).values,
+                              SparseMatrix.identity(2).col_indices,
+                              SparseMatrix.identity(2).row_pointers, 2)
+    assert [list(row) for row in S.to_dense()] == [[1, 0], [0, 1]]
+
+    with pytest.raises(ValueError):
+        SparseMatrix.from_csr(S.values, S.col_indices[:1], S.row_pointers, 2)
+
+
+def test_wrong_sizes():
+    S = SparseMatrix(random_matrix(3, 4))
+    with pytest.raises(ValueError):
+        S*random_matrix(3, 4)
+    with pytest.raises(ValueError):
+        random_matrix(3, 4)*S
+    with pytest.raises(ValueError):
+        S*S
@@ -0,0 +1,73 @@
+import io
+import random
+from array import array
+
+import pytest
+from conftest import random_matrix
+
+from matrix import (Matrix, gauss_matrix_mult, stream_matrix_mult,
+                    stream_matrix_mult_to)
+
+
+A = Matrix([[1, 2, 3], [4, 5, 6], [7, 8, 9], [1, 0, 1]])
+B = Matrix([[1, 2], [3, 4], [5, 6]])
+
+
+def expected():
+    return [list(row) for row in gauss_matrix_mult(A, B)]
+
+
+def test_rows_as_sequences():
+    rows = stream_matrix_mult(([x for x in row] for row in A), B)
+
+    assert [list(row) for row in rows] == expected()
+
+
+def test_rows_as_iterators():
+    lines = ['\t'.join(map(str, row)) for row in A]
+    rows = stream_matrix_mult((map(float, line.split('\t'))
+                               for line in lines), B)
+
+    assert [list(row) for row in rows] == expected()
+
+
+def test_rows_are_computed_lazily():
+    read = []
+
+    def rows():
+        for row in A:
+            read.append(row)
+            yield row
+
+    result = stream_matrix_mult(rows(), B)
+    next(result)
+
+    assert len(read) == 1
+
+
+@pytest.mark.parametrize('row', [[1, 2], iter([1, 2, 3, 4])])
+def test_wrong_row_length(row):
+    with pytest.raises(ValueError):
+        list(stream_matrix_mult([row], B))
+
+
+def test_sinks():
+    rows = []
+    assert stream_matrix_mult_to(A, B, rows.append) == 4
+    assert [list(row) for row in rows] == expected()
+
+    f = io.BytesIO()
+    stream_matrix_mult_to(A, B, f)
+    values = array('d', f.getvalue())
+
+    assert values.tolist() == [x for row in expected() for x in row]
+
+
+@pytest.mark.parametrize('dtype', ['float64', 'int64'])
+def test_random_rows(dtype):
+    random.seed(4)
+    X, Y = random_matrix(9, 7, dtype), random_matrix(7, 5, dtype)
+    rows = stream_matrix_mult(iter(X), Y)
+
+    assert [list(row) for row in rows] == [list(row)
+                                           for row in gauss_matrix_mult(X, Y)]
@@ -0,0 +1,128 @@
+import random
+
+import pytest
+from conftest import assert_close, random_matrix
+
+from matrix import (DiagonalMatrix, IdentityMatrix, LowerTriangularMatrix,
+                    Matrix, ScalarMatrix, UpperTriangularMatrix, ZeroMatrix,
+                    gauss_matrix_mult, strassen_matrix_mult)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def structured(size):
+    random.seed(size)
+    A = random_matrix(size, size)
+
+    return [
+        DiagonalMatrix([random.random() for _ in range(size)]),
+        ScalarMatrix(size, 3.0),
+        IdentityMatrix(size),
+        UpperTriangularMatrix(A),
+        LowerTriangularMatrix(A),
+    ]
+
+
+@pytest.mark.parametrize('size', [1, 6, 11])
+def test_products(size):
+    A = random_matrix(size, 4)
+    B = random_matrix(4, size)
+    for S in structured(size):
+        D = S.to_dense()
+        assert_close(S*A, gauss_matrix_mult(D, A))
+        assert_close(B*S, gauss_matrix_mult(B, D))
+        assert_close(S*S, gauss_matrix_mult(D, D))
+        assert_close(strassen_matrix_mult(S, A, 2), gauss_matrix_mult(D, A))
+        assert_close(S + S, D + D)
+        assert_close(2*S, 2*D)
+
+
+def test_int64():
+    random.seed(2)
+    A, B = random_matrix(7, 7, 'int64'), random_matrix(7, 3, 'int64')
+    for S in (UpperTriangularMatrix(A), LowerTriangularMatrix(A),
+              DiagonalMatrix([random.randint(-5, 5) for _ in range(7)],
+                             dtype='int64')):
+        D = S.to_dense()
+        assert S.dtype == 'int64'
+        assert_close(S*B, gauss_matrix_mult(D, B))
+        assert_close(S*S, gauss_matrix_mult(D, D))
+
+
+def test_structure_is_preserved():
+    D, _, _, U, L = structured(5)
+    assert isinstance(D*D, DiagonalMatrix) and isinstance(D + D, DiagonalMatrix)
+    assert isinstance(2*D, DiagonalMatrix)
+    for T in (U, L):
+        assert isinstance(T*T, type(T)) and isinstance(T + T, type(T))
+    assert isinstance(ScalarMatrix(5, 2) + IdentityMatrix(5), ScalarMatrix)
+
+    Z = ZeroMatrix(5, 3)
+    assert isinstance(Z*random_matrix(3, 2), ZeroMatrix)
+    assert (random_matrix(2, 5)*Z).is_zero()
+
+
+@pytest.mark.parametrize('product', [lambda I, A: I*A, lambda I, A: A*I])
+def test_identity_product_does_not_alias(product):
+    random.seed(1)
+    A = random_matrix(4, 4)
+    before = [list(row) for row in A]
+    R = product(IdentityMatrix(4), A)
+
+    R[0][0] = 1000
+    R.fill(7)
+    assert [list(row) for row in A] == before
+
+    A[1][1] = -1000
+    assert R[1][1] == 7
+
+
+@pytest.mark.parametrize('index', range(5))
+def test_read_only(index):
+    S = structured(6)[index]
+    for M in (S, S.view(1, 3, 2, 3), S.view(1, 3, 2, 3).view(0, 2, 0, 2)):
+        with pytest.raises(TypeError):
+            M[0][0] = 1
+        with pytest.raises(TypeError):
+            M[0, 0] = 1
+        assert M[0, 0] == M[0][0]
+        with pytest.raises(TypeError):
+            M.fill(0)
+        with pytest.raises(TypeError):
+            M.scale(2)
+        with pytest.raises(TypeError):
+            M.assign_submatrix(0, 0, Matrix([[1]]))
+        if M is S:
+            # In-place sums fall back to building a new matrix
+            N = M
+            N += Matrix(list(M))
+            assert N is not M
+        else:
+            with pytest.raises(TypeError):
+                M += Matrix(list(M))
+        if numpy is not None:
+            with pytest.raises(TypeError):
+                M.to_numpy()
+
+    # None of the writes reached the values
+    assert_close(S, S.to_dense())
+
+
+def test_views_of_identity_keep_values():
+    I = IdentityMatrix(5)
+    V = I.view(1, 3, 1, 3)
+
+    assert [list(row) for row in V] == [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
+    with pytest.raises(TypeError):
+        V.fill(2)
+    assert I.to_dense()[2][2] == 1
+
+
+def test_wrong_sizes():
+    with pytest.raises(ValueError):
+        IdentityMatrix(3)*random_matrix(4, 2)
+    with pytest.raises(ValueError):
+        random_matrix(2, 4)*DiagonalMatrix([1, 2, 3])
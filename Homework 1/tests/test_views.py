@@ -0,0 +1,79 @@
+import random
+
+import pytest
+from conftest import assert_close, random_matrix
+
+from matrix import (MatrixView, better_strassen_matrix_mult,
+                    gauss_matrix_mult, get_matrix_quadrants,
+                    strassen_matrix_mult)
+
+
+def values(A):
+    return [list(row) for row in A]
+
+
+def test_view_shares_storage():
+    A = random_matrix(6, 7)
+    V = A.view(1, 3, 2, 4)
+
+    assert isinstance(V, MatrixView) and V._data is A._data
+    assert values(V) == [list(A[y])[2:6] for y in range(1, 4)]
+
+    V[0][0] = 100
+    V.assign_submatrix(2, 3, random_matrix(1, 1))
+    assert A[1][2] == 100 and A[3][5] == V[2][3]
+
+    V += V
+    assert A[1][2] == 200
+
+
+def test_view_of_view():
+    A = random_matrix(8, 8)
+    W = A.view(1, 6, 1, 6).view(2, 3, 1, 2)
+
+    assert values(W) == [list(A[y])[2:4] for y in range(3, 6)]
+
+
+def test_operators_return_contiguous_matrices():
+    A = random_matrix(6, 6)
+    V = A.view(0, 3, 0, 3)
+
+    assert not isinstance(V + V, MatrixView)
+    assert not isinstance(2*V, MatrixView)
+    C = V.copy()
+    assert not isinstance(C, MatrixView) and values(C) == values(V)
+
+    # Copies share the storage until they are written
+    C[0][0] = -1
+    assert A[0][0] != -1
+
+
+@pytest.mark.parametrize('region', [(-1, 2, 0, 2), (5, 2, 0, 2),
+                                    (0, 2, 4, 3)])
+def test_view_out_of_bounds(region):
+    with pytest.raises(ValueError):
+        random_matrix(6, 6).view(*region)
+
+
+def test_quadrants_are_views():
+    A = random_matrix(6, 6)
+    A11, A12, A21, A22 = get_matrix_quadrants(A)
+
+    for Q in (A11, A12, A21, A22):
+        assert isinstance(Q, MatrixView) and Q._data is A._data
+    assert values(A22) == [list(A[y])[3:] for y in range(3, 6)]
+
+
+@pytest.mark.parametrize('multiply', [gauss_matrix_mult, strassen_matrix_mult,
+                                      better_strassen_matrix_mult])
+@pytest.mark.parametrize('dtype', ['float64', 'int64'])
+def test_products_of_views(multiply, dtype):
+    random.seed(1)
+    P, Q = random_matrix(20, 20, dtype), random_matrix(20, 20, dtype)
+    A, B = P.view(3, 11, 2, 9), Q.view(5, 9, 1, 13)
+    before = values(P), values(Q)
+
+    expected = gauss_matrix_mult(A.copy(), B.copy())
+    kwargs = {} if multiply is gauss_matrix_mult else {'min_size': 2}
+    assert_close(multiply(A, B, **kwargs), expected)
+    assert (values(P), values(Q)) == before